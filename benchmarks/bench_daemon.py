@@ -0,0 +1,121 @@
+"""
+Latency benchmark for the daemon.
+
+Writes a synthetic corpus of Python files, starts a daemon on it and measures the latency
+of re-checking a single file through the client protocol, both when the file is unchanged
+and right after it was modified, and of a `docraise client` process (which includes the
+interpreter startup). For comparison, it also times a cold `docraise` process checking the
+same file.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_daemon.py [number_of_files] [repetitions]
+"""
+
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from docraise.daemon import Daemon, request
+from docraise.main import process_paths
+
+TEMPLATE = '''
+def function_{i}(a, b):
+    """
+    Divide a by b.
+
+    Raises:
+        ValueError: if b is zero
+    """
+    try:
+        return a / b
+    except ZeroDivisionError as e:
+        raise ValueError() from e
+'''
+
+
+def write_corpus(directory: Path, files: int, functions_per_file: int = 50):
+    source = "".join(TEMPLATE.format(i=i) for i in range(functions_per_file))
+    paths = []
+    for i in range(files):
+        path = directory / f"module_{i}.py"
+        path.write_text(source)
+        paths.append(path)
+    return paths
+
+
+def measure(socket_path: Path, path: Path, repetitions: int, modify: bool):
+    timings = []
+    for i in range(repetitions):
+        if modify:
+            path.write_text(path.read_text() + f"\n# edit {i}\n")
+        start = time.perf_counter()
+        request(socket_path, {"command": "check", "paths": [str(path)]})
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(label: str, timings):
+    print(
+        f"{label:<28} median {statistics.median(timings):8.2f} ms"
+        f"   max {max(timings):8.2f} ms"
+    )
+
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    repetitions = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_corpus(Path(directory), files)
+        socket_path = Path(directory) / "daemon.sock"
+
+        daemon = Daemon([directory], discover=process_paths)
+        ready = threading.Event()
+        thread = threading.Thread(target=daemon.serve, args=(socket_path, 0, ready))
+        start = time.perf_counter()
+        thread.start()
+        ready.wait()
+        print(f"daemon warm-up ({files} files): {time.perf_counter() - start:.2f}s")
+
+        target = paths[len(paths) // 2]
+        report("warm, unchanged file", measure(socket_path, target, repetitions, False))
+        report("warm, modified file", measure(socket_path, target, repetitions, True))
+
+        client = []
+        for _ in range(min(repetitions, 5)):
+            start = time.perf_counter()
+            command = ["client", "--socket", str(socket_path), str(target)]
+            subprocess.run(
+                [sys.executable, "-m", "docraise.main", *command],
+                stdout=subprocess.DEVNULL,
+            )
+            client.append((time.perf_counter() - start) * 1000)
+        report("client process, one file", client)
+
+        cold = []
+        for _ in range(min(repetitions, 5)):
+            start = time.perf_counter()
+            subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "docraise.main",
+                    "--no-cache",
+                    "-j1",
+                    str(target),
+                ],
+                stdout=subprocess.DEVNULL,
+            )
+            cold.append((time.perf_counter() - start) * 1000)
+        report("cold process, one file", cold)
+
+        request(socket_path, {"command": "shutdown"})
+        thread.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark of the duplicate file deduplication and of the function memoization.
+
+Writes a synthetic monorepo in which a few vendored modules are copied into many
+directories and the other modules share copy-pasted functions, and times a serial run of
+iter_results with both optimizations, with the function memoization only and with
+neither. None of the runs uses the result cache.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_dedup.py [number_of_copies] [number_of_modules]
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from docraise import memo, runner
+from docraise.runner import iter_results
+from docraise.stats import Stats
+
+FUNCTION = '''
+def function_{i}(a, b):
+    """
+    Divide a by b.
+
+    Raises:
+        ValueError: if b is zero
+    """
+    if not b:
+        raise ValueError()
+    try:
+        return a / b
+    except TypeError as e:
+        raise e
+'''
+
+UNIQUE = '''
+def unique_{i}_{j}(value):
+    """Check the value."""
+    if value is None:
+        raise KeyError({j})
+    return value
+'''
+
+
+def write_corpus(
+    directory: Path, copies: int, modules: int, functions_per_file: int = 40
+):
+    vendored = "".join(FUNCTION.format(i=i) for i in range(functions_per_file))
+    paths = []
+    for copy in range(copies):
+        path = directory / f"vendor_{copy}" / "six_like.py"
+        path.parent.mkdir()
+        path.write_text(vendored)
+        paths.append(path)
+    for i in range(modules):
+        # Half of every module is copy-pasted from the vendored one
+        source = "".join(FUNCTION.format(i=j) for j in range(functions_per_file // 2))
+        source += "".join(
+            UNIQUE.format(i=i, j=j) for j in range(functions_per_file // 2)
+        )
+        path = directory / f"module_{i}.py"
+        path.write_text(source)
+        paths.append(path)
+    return paths
+
+
+def run(paths):
+    stats = Stats()
+    start = time.perf_counter()
+    for _ in iter_results(paths, jobs=1, stats=stats):
+        pass
+    return time.perf_counter() - start, stats
+
+
+def main():
+    copies = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    modules = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_corpus(Path(directory), copies, modules)
+
+        both, stats = run(paths)
+        print(f"deduplication and memoization: {both:6.2f}s")
+        print("   " + stats.format().splitlines()[-1])
+
+        runner._map_deduplicated = runner._map_files
+        memoized, _ = run(paths)
+        print(
+            f"memoization only:              {memoized:6.2f}s  ({memoized / both:.1f}x)"
+        )
+
+        memo.shared_cache.maxsize = 0
+        memo.shared_cache._entries.clear()
+        neither, _ = run(paths)
+        print(
+            f"neither:                       {neither:6.2f}s  ({neither / both:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark of the file discovery.
+
+Writes a synthetic project: a source tree next to a virtual environment, a node_modules
+directory and a build directory that are much larger than the sources, as in most real
+repositories. It then times the previous discovery, Path.rglob over the whole tree, and
+iter_python_files, which prunes the unwanted directories before entering them.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_discovery.py [number_of_source_files] [repetitions]
+"""
+
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from docraise.discovery import iter_python_files
+
+
+def write_tree(
+    root: Path, directories: int, files_per_directory: int, suffix: str = ".py"
+):
+    for d in range(directories):
+        directory = root / f"package_{d}"
+        directory.mkdir(parents=True)
+        for f in range(files_per_directory):
+            (directory / f"module_{f}{suffix}").write_text("")
+
+
+def write_project(root: Path, source_files: int):
+    write_tree(root / "src", max(source_files // 20, 1), 20)
+    write_tree(
+        root / ".venv" / "lib" / "python3.11" / "site-packages", source_files // 4, 40
+    )
+    write_tree(root / "node_modules", source_files // 4, 40, suffix=".js")
+    write_tree(root / "build" / "lib", max(source_files // 20, 1), 20)
+    (root / ".git" / "objects").mkdir(parents=True)
+
+
+def rglob(root: Path):
+    return list(root.resolve().rglob("*.py"))
+
+
+def scandir(root: Path):
+    return list(iter_python_files([str(root)]))
+
+
+def report(label: str, timings, files: int):
+    print(f"{label:<28} median {statistics.median(timings):8.2f} ms   {files} files")
+
+
+def main():
+    source_files = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    repetitions = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    with tempfile.TemporaryDirectory() as directory:
+        root = Path(directory)
+        write_project(root, source_files)
+        for label, discover in (("Path.rglob", rglob), ("iter_python_files", scandir)):
+            timings = []
+            for _ in range(repetitions):
+                start = time.perf_counter()
+                files = discover(root)
+                timings.append((time.perf_counter() - start) * 1000)
+            report(label, timings, len(files))
+
+
+if __name__ == "__main__":
+    main()
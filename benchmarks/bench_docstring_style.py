@@ -0,0 +1,67 @@
+"""
+Benchmark of the docstring style detection on a Google-style corpus.
+
+Validates a module of Google-style functions with distinct docstrings (so the docstring
+cache cannot help) three times: with the AUTO style and no per-module detection, with the
+AUTO style and per-module detection, and with the style fixed to Google.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_docstring_style.py [number_of_functions]
+"""
+
+import ast
+import sys
+import time
+
+from docstring_parser import DocstringStyle
+
+from docraise import analyzer
+from docraise.analyzer import Analyzer
+from docraise.docstrings import DocstringCache
+
+TEMPLATE = '''
+def function_{i}(a, b):
+    """
+    Divide a by b, variant {i}.
+
+    Args:
+        a (float): The dividend.
+        b (float): The divisor.
+
+    Returns:
+        float: The quotient.
+
+    Raises:
+        ValueError: If b is zero.
+    """
+    if b == 0:
+        raise ValueError()
+    return a / b
+'''
+
+
+def run(tree, style):
+    start = time.perf_counter()
+    Analyzer(docstring_style=style, docstring_cache=DocstringCache()).validate(tree)
+    return time.perf_counter() - start
+
+
+def main():
+    functions = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    tree = ast.parse("".join(TEMPLATE.format(i=i) for i in range(functions)))
+
+    detection_samples = analyzer.STYLE_DETECTION_SAMPLES
+    analyzer.STYLE_DETECTION_SAMPLES = functions + 1
+    auto = run(tree, DocstringStyle.AUTO)
+    analyzer.STYLE_DETECTION_SAMPLES = detection_samples
+
+    detected = run(tree, DocstringStyle.AUTO)
+    fixed = run(tree, DocstringStyle.GOOGLE)
+
+    print(f"auto, no detection: {auto * 1000:8.1f} ms ({functions} docstrings)")
+    print(f"auto, per module:   {detected * 1000:8.1f} ms ({auto / detected:.1f}x)")
+    print(f"google:             {fixed * 1000:8.1f} ms ({auto / fixed:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark of the flake8 plugin against a separate docraise run.
+
+flake8 reads and parses every file once for its own checks. Without the plugin, docraise
+reads and parses the files a second time; with it, docraise validates the tree flake8
+already built. This script times both combined runs in a single process on a synthetic
+corpus: flake8's part is stood in for by reading and parsing every file, so flake8 does
+not have to be installed, and its own checks (the same in both runs) are left out.
+
+With flake8 installed, the same comparison on a real project is:
+
+    time (flake8 --extend-ignore DR src && docraise -j 1 --no-cache src)
+    time flake8 src
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_flake8_plugin.py [number_of_files] [raising_percent]
+"""
+
+import ast
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from docraise.flake8_plugin import Plugin
+from docraise.runner import iter_results
+
+PLAIN = '''
+def function_{i}(a, b):
+    """Add a and b."""
+    return a + b
+'''
+
+RAISING = '''
+def function_{i}(a, b):
+    """
+    Divide a by b.
+
+    Raises:
+        ValueError: if b is zero
+    """
+    if not b:
+        raise ValueError()
+    return a / b
+'''
+
+
+def write_corpus(
+    directory: Path, files: int, raising_percent: int, functions_per_file: int = 50
+):
+    plain = "".join(PLAIN.format(i=i) for i in range(functions_per_file))
+    raising = "".join(RAISING.format(i=i) for i in range(functions_per_file))
+    paths = []
+    for i in range(files):
+        path = directory / f"module_{i}.py"
+        path.write_text(raising if i % 100 < raising_percent else plain)
+        paths.append(path)
+    return paths
+
+
+def flake8_pass(paths, plugin):
+    # What flake8 does for every file before running its AST plugins
+    errors = 0
+    for path in paths:
+        content = path.read_bytes()
+        tree = ast.parse(content, str(path))
+        if plugin:
+            lines = content.decode().splitlines(keepends=True)
+            errors += sum(1 for _ in Plugin(tree, str(path), lines).run())
+    return errors
+
+
+def separate(paths):
+    start = time.perf_counter()
+    flake8_pass(paths, plugin=False)
+    errors = sum(len(violations) for _, violations in iter_results(paths, jobs=1))
+    return time.perf_counter() - start, errors
+
+
+def combined(paths):
+    start = time.perf_counter()
+    errors = flake8_pass(paths, plugin=True)
+    return time.perf_counter() - start, errors
+
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    raising_percent = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_corpus(Path(directory), files, raising_percent)
+
+        before, errors_before = separate(paths)
+        print(f"flake8, then docraise: {before:6.2f}s")
+        after, errors_after = combined(paths)
+        print(f"flake8 with plugin:    {after:6.2f}s  ({before / after:.1f}x)")
+        assert errors_before == errors_after
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Overhead benchmark of the run statistics.
+
+Times serial runs of iter_results over a directory (by default the standard library)
+without statistics, and with statistics that track the slowest files and call a hook per
+file, as --stats and an exporter of metrics do. The phase timers themselves always run:
+their cost is estimated from the number of clock readings of the run and the cost of one.
+Files that do not parse are skipped, and the function memoization is disabled so every
+run does the same work.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_instrumentation.py [directory] [repeats]
+"""
+
+import ast
+import os
+import sys
+import time
+from pathlib import Path
+
+from docraise import memo
+from docraise.runner import iter_results
+from docraise.stats import Stats
+
+
+def python_files(directory: str):
+    files = []
+    for path in sorted(Path(directory).rglob("*.py")):
+        try:
+            ast.parse(path.read_bytes())
+        except (SyntaxError, ValueError):
+            continue
+        files.append(path)
+    return files
+
+
+def run(files, stats):
+    start = time.perf_counter()
+    for _ in iter_results(files, stats=stats):
+        pass
+    return time.perf_counter() - start
+
+
+def main():
+    directory = sys.argv[1] if len(sys.argv) > 1 else os.path.dirname(os.__file__)
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    files = python_files(directory)
+    memo.shared_cache.maxsize = 0
+
+    # The analyzer and docstring_parser raise on some files of the standard library
+    checked = []
+    for path in files:
+        try:
+            list(iter_results([path]))
+            checked.append(path)
+        except Exception:
+            pass
+
+    off = min(run(checked, None) for _ in range(repeats))
+    hooked = []
+    on = min(
+        run(
+            checked,
+            Stats(
+                slowest=10, hooks=[lambda counters, filename: hooked.append(filename)]
+            ),
+        )
+        for _ in range(repeats)
+    )
+    stats = Stats()
+    run(checked, stats)
+
+    clock = time.perf_counter_ns
+    start = clock()
+    for _ in range(100_000):
+        clock()
+    reading = (clock() - start) / 100_000
+    # Reading, parsing and the analyzer are timed once per file, the docstring parsing once per parse
+    readings = 6 * stats.counters["files"] + 2 * stats.counters["docstrings_parsed"]
+
+    print(f"{len(checked)} files")
+    print(f"without statistics:        {off:6.3f}s")
+    print(f"with statistics and hooks: {on:6.3f}s  ({100 * (on - off) / off:+.1f}%)")
+    print(
+        f"phase timers: {readings} clock readings, about {readings * reading / 1e6:.2f} ms "
+        f"({100 * readings * reading / 1e9 / off:.2f}% of the run)"
+    )
+
+
+if __name__ == "__main__":
+    main()
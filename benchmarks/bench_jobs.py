@@ -0,0 +1,58 @@
+"""
+Scaling benchmark for the process-pool backend.
+
+Writes a synthetic corpus of Python files to a temporary directory and reports how many
+files per second iter_results validates with 1, 2, 4 and 8 worker processes.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_jobs.py [number_of_files]
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from docraise.runner import iter_results
+
+TEMPLATE = '''
+def function_{i}(a, b):
+    """
+    Divide a by b.
+
+    Raises:
+        ValueError: if b is zero
+    """
+    try:
+        return a / b
+    except ZeroDivisionError as e:
+        raise ValueError() from e
+'''
+
+
+def write_corpus(directory: Path, files: int, functions_per_file: int = 50):
+    source = "".join(TEMPLATE.format(i=i) for i in range(functions_per_file))
+    paths = []
+    for i in range(files):
+        path = directory / f"module_{i}.py"
+        path.write_text(source)
+        paths.append(path)
+    return paths
+
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_corpus(Path(directory), files)
+
+        for jobs in (1, 2, 4, 8):
+            start = time.perf_counter()
+            for _ in iter_results(paths, jobs=jobs):
+                pass
+            elapsed = time.perf_counter() - start
+            print(f"jobs={jobs}: {files / elapsed:10.1f} files/sec ({elapsed:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
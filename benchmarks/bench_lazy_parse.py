@@ -0,0 +1,103 @@
+"""
+Benchmark of the lazy parsing mode on a large generated module.
+
+Generates a module of about 100000 lines made of classes and functions with dictionary
+literals, of which only one function in a thousand raises (and documents) an exception,
+like the generated and vendored modules the mode is meant for. It then times the analysis
+of the module, parsing included, with a full parse and with --lazy-parse, and reports the
+peak memory of both with tracemalloc. The violations are the same in both modes.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_lazy_parse.py [number_of_lines] [repetitions]
+"""
+
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from docraise.runner import AnalysisOptions, analyze_file
+
+PLAIN = '''
+def function_{i}(a, b):
+    """Combine a and b (variant {i})."""
+    values = {{"a": a, "b": b, "key_{i}": [1, 2, 3]}}
+    return a + b + len(values)
+'''
+
+METHOD = '''
+class Model{i}:
+    """Generated model {i}."""
+
+    fields = ("a", "b", "c")
+
+    def get(self, key):
+        """Return a field."""
+        return getattr(self, key, None)
+'''
+
+RAISING = '''
+def function_{i}(a, b):
+    """
+    Divide a by b.
+
+    Raises:
+        ValueError: if b is zero
+    """
+    if not b:
+        raise ValueError()
+    return a / b
+'''
+
+
+def generate(lines: int) -> str:
+    parts = ["import math\n"]
+    written = 1
+    i = 0
+    while written < lines:
+        template = RAISING if i % 1000 == 999 else METHOD if i % 10 == 0 else PLAIN
+        parts.append(template.format(i=i))
+        written += parts[-1].count("\n")
+        i += 1
+    return "".join(parts)
+
+
+def measure(path: Path, options: AnalysisOptions, repetitions: int):
+    timings = []
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        violations = analyze_file(path, options)
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    analyze_file(path, options)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings), peak, violations
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    repetitions = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "generated.py"
+        source = generate(lines)
+        path.write_text(source)
+        print(f"module: {source.count(chr(10))} lines")
+
+        full, full_peak, full_violations = measure(path, AnalysisOptions(), repetitions)
+        lazy, lazy_peak, lazy_violations = measure(
+            path, AnalysisOptions(lazy_parse=True), repetitions
+        )
+        assert lazy_violations == full_violations
+
+        print(f"full parse:  {full * 1000:8.1f} ms   peak {full_peak / 2**20:7.1f} MiB")
+        print(
+            f"lazy parse:  {lazy * 1000:8.1f} ms   peak {lazy_peak / 2**20:7.1f} MiB   ({full / lazy:.1f}x faster)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Latency benchmark for the Language Server Protocol server.
+
+Generates a module of about 5000 lines, opens it in a LanguageServer and measures the
+latency of a didChange notification that edits a single function (only that function is
+checked again) and of one that edits an import (every function is checked again), next to
+a full Analyzer.validate of the module with a warm and a cold docstring cache. Parsing the
+module is included in every timing.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_lsp.py [number_of_lines] [repetitions]
+"""
+
+import ast
+import io
+import statistics
+import sys
+import time
+
+from docraise.analyzer import Analyzer
+from docraise.docstrings import DocstringCache
+from docraise.lsp import LanguageServer
+
+URI = "file:///bench/module.py"
+
+TEMPLATE = '''
+def function_{i}(a, b):
+    """
+    Divide a by b (variant {i}).
+
+    Raises:
+        ValueError: if b is zero
+    """
+    try:
+        return a / b
+    except ZeroDivisionError as e:
+        raise ValueError() from e
+'''
+
+
+def generate(lines: int) -> str:
+    functions = lines // TEMPLATE.count("\n")
+    return "import math\n" + "".join(TEMPLATE.format(i=i) for i in range(functions))
+
+
+def change(text: str, version: int):
+    return {
+        "jsonrpc": "2.0",
+        "method": "textDocument/didChange",
+        "params": {
+            "textDocument": {"uri": URI, "version": version},
+            "contentChanges": [{"text": text}],
+        },
+    }
+
+
+def report(label: str, timings):
+    print(
+        f"{label:<32} median {statistics.median(timings):8.2f} ms   max {max(timings):8.2f} ms"
+    )
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    repetitions = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    source = generate(lines)
+    print(f"module: {source.count(chr(10))} lines")
+
+    server = LanguageServer(debounce=0)
+    server.serve(io.BytesIO(), io.BytesIO())  # Only sets up the output stream
+    server.handle(
+        {
+            "jsonrpc": "2.0",
+            "method": "textDocument/didOpen",
+            "params": {
+                "textDocument": {
+                    "uri": URI,
+                    "languageId": "python",
+                    "version": 1,
+                    "text": source,
+                }
+            },
+        }
+    )
+
+    function_edits = []
+    import_edits = []
+    full = []
+    cold = []
+    for i in range(repetitions):
+        edited = source.replace("return a / b", f"return a / b + {i}", 1)
+        start = time.perf_counter()
+        server.handle(change(edited, 2 * i + 2))
+        function_edits.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        body = edited.split("\n", 1)[1]
+        server.handle(change(f"import math  # {i}\n" + body, 2 * i + 3))
+        import_edits.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        Analyzer().validate(ast.parse(edited))
+        full.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        Analyzer(docstring_cache=DocstringCache()).validate(ast.parse(edited))
+        cold.append((time.perf_counter() - start) * 1000)
+
+    report("didChange, one function edited", function_edits)
+    report("didChange, import edited", import_edits)
+    report("full parse and validate", full)
+    report("same, cold docstring cache", cold)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark of the lexical prefilter.
+
+Writes a synthetic corpus in which most files neither raise nor document exceptions, as in
+most code bases, and times a run of iter_results with the prefilter and with the prefilter
+disabled (every file parsed and analyzed). Both runs are serial and do not use the cache.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_prefilter.py [number_of_files] [raising_percent]
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from docraise import prefilter
+from docraise.runner import iter_results
+from docraise.stats import Stats
+
+PLAIN = '''
+def function_{i}(a, b):
+    """Add a and b."""
+    try:
+        return a + b
+    except TypeError:
+        return None
+'''
+
+RAISING = '''
+def function_{i}(a, b):
+    """
+    Divide a by b.
+
+    Raises:
+        ValueError: if b is zero
+    """
+    if not b:
+        raise ValueError()
+    return a / b
+'''
+
+
+def write_corpus(
+    directory: Path, files: int, raising_percent: int, functions_per_file: int = 50
+):
+    plain = "".join(PLAIN.format(i=i) for i in range(functions_per_file))
+    raising = "".join(RAISING.format(i=i) for i in range(functions_per_file))
+    paths = []
+    for i in range(files):
+        path = directory / f"module_{i}.py"
+        path.write_text(raising if i % 100 < raising_percent else plain)
+        paths.append(path)
+    return paths
+
+
+def run(paths):
+    stats = Stats()
+    start = time.perf_counter()
+    for _ in iter_results(paths, jobs=1, stats=stats):
+        pass
+    return time.perf_counter() - start, stats
+
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    raising_percent = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_corpus(Path(directory), files, raising_percent)
+
+        filtered, stats = run(paths)
+        print(f"with prefilter:    {filtered:6.2f}s")
+        print("   " + stats.format().splitlines()[-1])
+
+        prefilter.may_have_violations = lambda content: True
+        unfiltered, _ = run(paths)
+        print(f"without prefilter: {unfiltered:6.2f}s  ({unfiltered / filtered:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Scaling benchmark of the interprocedural exception propagation.
+
+Writes packages of N modules to a temporary directory. Every module calls functions of
+the previous module through an import, uses self calls and contains a small recursive
+cycle, so the call graph spans the whole package. The summary pass and the propagation
+are timed separately; the time per module should stay roughly constant as N grows.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_propagation.py [largest_number_of_modules]
+"""
+
+import ast
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from docraise.propagation import propagate, summarize_module
+
+TEMPLATE = '''
+from pkg import module_{previous} as previous
+
+
+class Worker_{i}:
+    def run(self, value):
+        """Run."""
+        try:
+            return self.step(value)
+        except KeyError:
+            return previous.entry(value)
+
+    def step(self, value):
+        """Step."""
+        if value is None:
+            raise KeyError(value)
+        return previous.entry(value)
+
+
+def entry(value):
+    """Entry."""
+    if value < 0:
+        raise ValueError(value)
+    return ping(value)
+
+
+def ping(value):
+    """Ping."""
+    return pong(value - 1) if value else previous.entry(value)
+
+
+def pong(value):
+    """Pong."""
+    if value > 1000:
+        raise OverflowError(value)
+    return ping(value)
+'''
+
+
+def write_package(directory: Path, modules: int):
+    package = directory / "pkg"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    paths = []
+    for i in range(modules):
+        path = package / f"module_{i}.py"
+        path.write_text(TEMPLATE.format(i=i, previous=max(i - 1, 0)))
+        paths.append(path)
+    return paths
+
+
+def main():
+    largest = int(sys.argv[1]) if len(sys.argv) > 1 else 8000
+
+    modules = 1000
+    while modules <= largest:
+        with tempfile.TemporaryDirectory() as directory:
+            paths = write_package(Path(directory), modules)
+
+            start = time.perf_counter()
+            summaries = {
+                path: summarize_module(ast.parse(path.read_bytes())) for path in paths
+            }
+            summarized = time.perf_counter()
+            propagate(summaries)
+            propagated = time.perf_counter()
+
+        summary_us = (summarized - start) / modules * 1e6
+        propagate_us = (propagated - summarized) / modules * 1e6
+        print(
+            f"{modules:6} modules: summaries {summary_us:7.1f} us/module, propagation {propagate_us:7.1f} us/module"
+        )
+        modules *= 2
+
+
+if __name__ == "__main__":
+    main()
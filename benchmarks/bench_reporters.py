@@ -0,0 +1,89 @@
+"""
+Output benchmark of a million violations.
+
+Simulates the output of a run that reports a million violations, file by file: once with
+a print per violation, as docraise did before the reporters, and once with every
+reporter. The output is written to a file, where print is buffered by the file object,
+and to a line buffered stream, which behaves like a terminal and flushes every line
+that print writes; the reporters write the violations of a file at once.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_reporters.py [number_of_violations] [violations_per_file]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from docraise.reporters import REPORTERS
+from docraise.violation import Violation
+
+NAMES = [
+    "ValueError",
+    "KeyError",
+    "TypeError",
+    "requests.exceptions.HTTPError",
+    "app.errors.NotFound",
+]
+
+
+def files(violations: int, per_file: int):
+    for i in range(violations // per_file):
+        filename = f"src/package_{i % 100}/module_{i}.py"
+        yield [
+            Violation(
+                filename,
+                10 + j,
+                "DR001" if j % 3 else "DR002",
+                NAMES[(i + j) % len(NAMES)],
+            )
+            for j in range(per_file)
+        ]
+
+
+def with_print(stream, results):
+    for violations in results:
+        for violation in violations:
+            print(violation, file=stream)
+
+
+def with_reporter(output_format):
+    def run(stream, results):
+        with REPORTERS[output_format](stream) as reporter:
+            for violations in results:
+                reporter.report(violations)
+
+    return run
+
+
+def measure(run, results, line_buffering: bool):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "output")
+        with open(path, "w", buffering=1 if line_buffering else -1) as stream:
+            start = time.perf_counter()
+            run(stream, results)
+            elapsed = time.perf_counter() - start
+        return elapsed, os.path.getsize(path)
+
+
+def main():
+    violations = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    per_file = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    results = list(files(violations, per_file))
+
+    for line_buffering in (False, True):
+        print("line buffered (terminal):" if line_buffering else "file:")
+        baseline, _ = measure(with_print, results, line_buffering)
+        print(f"  print per violation: {baseline:5.2f}s")
+        for output_format in REPORTERS:
+            elapsed, size = measure(
+                with_reporter(output_format), results, line_buffering
+            )
+            print(
+                f"  --format {output_format:<7} {elapsed:5.2f}s  ({baseline / elapsed:.1f}x, {size / 2**20:.0f} MiB)"
+            )
+
+
+if __name__ == "__main__":
+    main()
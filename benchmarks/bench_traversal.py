@@ -0,0 +1,69 @@
+"""
+Micro-benchmark of the Analyzer traversal against the previous ast.NodeVisitor dispatch.
+
+VisitorAnalyzer drives the same handlers through ast.NodeVisitor, which looks up a
+visit method for every node and recurses into every expression. Both analyzers are
+run over the same pre-parsed module, so only the traversal and the checks are timed.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_traversal.py [number_of_functions]
+"""
+
+import ast
+import sys
+import timeit
+
+from docraise.analyzer import Analyzer
+
+# Expression-heavy functions without docstrings, so the traversal dominates
+TEMPLATE = """
+def function_{i}(items, mapping):
+    result = [mapping.get(item, {{"key": [x * 2 for x in range(10)]}}) for item in items]
+    total = sum(value["key"][0] + len(str(value)) for value in result if value)
+    if total > 100 and items or not mapping:
+        try:
+            return {{k: v for k, v in mapping.items() if k not in items}}
+        except KeyError as e:
+            raise e
+    raise ValueError(f"{{total}} {{len(items)}} {{mapping!r}}")
+"""
+
+
+class VisitorAnalyzer(Analyzer, ast.NodeVisitor):
+    """The Analyzer driven by ast.NodeVisitor, as it was before the iterative traversal."""
+
+    def _walk(self, tree):
+        self.visit(tree)
+
+    def visit_FunctionDef(self, node):
+        if self._enter_FunctionDef(node):
+            self.generic_visit(node)
+            self._leave_FunctionDef(node)
+
+    def visit_Raise(self, node):
+        self._enter_Raise(node)
+        self.generic_visit(node)
+
+    def visit_ExceptHandler(self, node):
+        self.generic_visit(node)
+        self._leave_ExceptHandler(node)
+
+
+def main():
+    functions = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    tree = ast.parse("".join(TEMPLATE.format(i=i) for i in range(functions)))
+
+    assert Analyzer().validate(tree) == VisitorAnalyzer().validate(tree)
+
+    for name, analyzer_class in (
+        ("NodeVisitor", VisitorAnalyzer),
+        ("iterative", Analyzer),
+    ):
+        timer = timeit.Timer(lambda: analyzer_class().validate(tree))
+        number, _ = timer.autorange()
+        best = min(timer.repeat(repeat=5, number=number)) / number
+        print(f"{name:>12}: {best * 1000:8.2f} ms per module ({functions} functions)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Memory benchmark of a million violations.
+
+Simulates a run on a legacy code base that reports a million violations: the violation
+records of every file are pickled as a worker process sends them, unpickled in the
+parent process and turned into violations, and all the violations are kept, as a
+reporter that sorts or groups them would. The memory held by the violations is measured
+with tracemalloc, for Violation and for the dataclass it replaced, which stored the
+rendered description and a copy of the strings of every record.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_violation_memory.py [number_of_violations] [violations_per_file]
+"""
+
+import gc
+import pickle
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+
+from docraise.runner import _to_violations
+from docraise.violation import ViolationCodes
+
+NAMES = [
+    "ValueError",
+    "KeyError",
+    "TypeError",
+    "requests.exceptions.HTTPError",
+    "app.errors.NotFound",
+]
+
+
+@dataclass
+class LegacyViolation:
+    """The violation as it was: a dataclass with a per-instance filename and formatted text."""
+
+    filename: str
+    lineno: int
+    code: str
+    text: str
+
+
+def legacy_violations(filename, records):
+    return [
+        LegacyViolation(
+            filename, lineno, code, ViolationCodes[code].value.format(name=name)
+        )
+        for lineno, code, name in records
+    ]
+
+
+def worker_results(violations: int, per_file: int):
+    # One pickled chunk per file, like the results of a worker process
+    for i in range(violations // per_file):
+        records = [
+            (10 + j, "DR001" if j % 3 else "DR002", NAMES[(i + j) % len(NAMES)])
+            for j in range(per_file)
+        ]
+        yield f"src/package_{i % 100}/module_{i}.py", pickle.dumps(records)
+
+
+def measure(make, violations: int, per_file: int):
+    results = list(worker_results(violations, per_file))
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    kept = []
+    for filename, payload in results:
+        # The filename also arrives in its own string, e.g. from str(path)
+        kept.extend(make("".join(filename), pickle.loads(payload)))
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, elapsed, kept
+
+
+def main():
+    violations = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    per_file = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    legacy, legacy_time, _ = measure(legacy_violations, violations, per_file)
+    print(f"dataclass:   {legacy / 2**20:7.1f} MiB  {legacy_time:5.2f}s")
+    compact, compact_time, kept = measure(_to_violations, violations, per_file)
+    print(
+        f"Violation:   {compact / 2**20:7.1f} MiB  {compact_time:5.2f}s  ({legacy / compact:.1f}x less memory)"
+    )
+
+    start = time.perf_counter()
+    for violation in kept:
+        str(violation)
+    print(f"rendering every violation: {time.perf_counter() - start:5.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Regression gate: compares the results of benchmarks/suite.py with a stored baseline.
+
+Every metric of the baseline is compared with the same metric of the current results:
+throughputs (ending in _per_sec) regress when they drop, peak memory (ending in _rss_mib)
+when it grows. The script prints the change of every metric and exits with status 1 if
+one regressed by more than the threshold, or if the two results were not measured on the
+same corpus. Results from different machines are compared with a warning only.
+
+Usage:
+    PYTHONPATH=. python benchmarks/suite.py --output baseline.json   # once, on the reference commit
+    PYTHONPATH=. python benchmarks/suite.py --output current.json
+    python benchmarks/compare.py baseline.json current.json [--threshold 0.1] [--metric NAME ...]
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+DEFAULT_THRESHOLD = 0.1
+
+
+def regression(name: str, baseline: float, current: float) -> float:
+    """
+    Return how much a metric regressed, as a fraction of the baseline.
+
+    Args:
+        name (str): The name of the metric, whose suffix tells whether higher is better.
+        baseline (float): The value of the baseline.
+        current (float): The current value.
+
+    Returns:
+        float: The regression, negative if the metric improved.
+    """
+    if not baseline:
+        return 0.0
+    change = (current - baseline) / baseline
+    return -change if name.endswith("_per_sec") else change
+
+
+def compare(
+    baseline: Dict,
+    current: Dict,
+    threshold: float = DEFAULT_THRESHOLD,
+    metrics: Optional[Sequence[str]] = None,
+) -> List[str]:
+    """
+    Compare two results of suite.py and print the change of every tracked metric.
+
+    Args:
+        baseline (Dict): The stored baseline.
+        current (Dict): The current results.
+        threshold (float): The largest accepted regression, as a fraction of the baseline.
+        metrics (Optional[Sequence[str]]): The tracked metrics, all the metrics of the baseline if None.
+
+    Returns:
+        List[str]: The failures: the regressed metrics and the differences of corpus.
+    """
+    failures = []
+    if baseline["corpus"] != current["corpus"]:
+        failures.append(
+            f"the corpus differs: {baseline['corpus']} != {current['corpus']}"
+        )
+    if baseline["machine"] != current["machine"]:
+        print(
+            f"warning: the machine differs: {baseline['machine']} != {current['machine']}"
+        )
+
+    for name in metrics if metrics is not None else baseline["metrics"]:
+        if name not in baseline["metrics"] or name not in current["metrics"]:
+            failures.append(f"{name}: missing")
+            continue
+        before, after = baseline["metrics"][name], current["metrics"][name]
+        regressed = regression(name, before, after)
+        status = "REGRESSED" if regressed > threshold else "ok"
+        change = (after - before) / before if before else 0.0
+        print(f"{name:32} {before:12.1f} -> {after:12.1f}  {change:+7.1%}  {status}")
+        if regressed > threshold:
+            failures.append(
+                f"{name}: {regressed:.1%} worse than the baseline (threshold {threshold:.0%})"
+            )
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("baseline", type=Path, help="The stored results of suite.py.")
+    parser.add_argument("current", type=Path, help="The results of suite.py to check.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="(default: %(default)s)",
+    )
+    parser.add_argument(
+        "--metric", action="append", help="A tracked metric (default: every metric)"
+    )
+    arguments = parser.parse_args()
+
+    failures = compare(
+        json.loads(arguments.baseline.read_text()),
+        json.loads(arguments.current.read_text()),
+        arguments.threshold,
+        arguments.metric,
+    )
+    for failure in failures:
+        print(f"error: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+"""
+Deterministic generator of synthetic Python packages to benchmark docraise on.
+
+The corpus is a tree of packages, each with an errors module that defines its exceptions
+and modules of functions (and methods) that raise, catch, re-raise and document them.
+Everything is drawn from a random.Random seeded with --seed, so the same options always
+write the same files, byte for byte, on every machine. The knobs are the number of
+files, the number of functions per file and of statements per function, the densities of
+raise and try statements, the nesting depth and density of loops and nested functions, the docstring
+style and the share of raised exceptions left undocumented (the violations).
+
+Usage:
+    PYTHONPATH=. python benchmarks/corpus.py OUTPUT_DIRECTORY [--files N] [--style google] ...
+"""
+
+import argparse
+import random
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import Any, List, Sequence, Set
+
+STYLES = ["google", "numpy", "rest", "epydoc"]
+
+BUILTIN_EXCEPTIONS = ["ValueError", "KeyError", "TypeError", "RuntimeError", "OSError"]
+
+
+@dataclass(frozen=True)
+class CorpusConfig:
+    """The shape of a synthetic corpus; the defaults write a medium-sized code base."""
+
+    files: int = 500
+    files_per_package: int = 25
+    functions: int = 20
+    statements: int = 8
+    raise_density: float = 0.15
+    try_density: float = 0.1
+    depth: int = 3
+    nested_density: float = 0.05
+    loop_density: float = 0.1
+    class_density: float = 0.3
+    docstring_density: float = 0.8
+    undocumented: float = 0.1
+    style: str = "google"
+    seed: int = 0
+
+
+def _section(style: str, raised: Sequence[str]) -> List[str]:
+    if not raised:
+        return []
+    if style == "google":
+        return [
+            "",
+            "Raises:",
+            *(f"    {name}: If the value is invalid." for name in raised),
+        ]
+    if style == "numpy":
+        return [
+            "",
+            "Raises",
+            "------",
+            *(f"{name}\n    If the value is invalid." for name in raised),
+        ]
+    if style == "rest":
+        return ["", *(f":raises {name}: If the value is invalid." for name in raised)]
+    return ["", *(f"@raise {name}: If the value is invalid." for name in raised)]
+
+
+def _arguments(style: str) -> List[str]:
+    if style == "google":
+        return [
+            "",
+            "Args:",
+            "    value: The value to check.",
+            "    limit: The upper bound.",
+        ]
+    if style == "numpy":
+        return [
+            "",
+            "Parameters",
+            "----------",
+            "value : int\n    The value to check.",
+            "limit : int\n    The upper bound.",
+        ]
+    if style == "rest":
+        return [
+            "",
+            ":param value: The value to check.",
+            ":param limit: The upper bound.",
+        ]
+    return ["", "@param value: The value to check.", "@param limit: The upper bound."]
+
+
+class _ModuleWriter:
+    """Writes the functions of one module, keeping track of the exceptions they raise."""
+
+    def __init__(
+        self,
+        rng: random.Random,
+        config: CorpusConfig,
+        style: str,
+        exceptions: Sequence[str],
+    ):
+        self.rng = rng
+        self.config = config
+        self.style = style
+        self.exceptions = exceptions
+        self.lines: List[str] = []
+        self._counter = 0
+
+    def _name(self, prefix: str) -> str:
+        self._counter += 1
+        return f"{prefix}_{self._counter}"
+
+    def function(self, indent: str, depth: int, method: bool = False) -> None:
+        rng = self.rng
+        name = self._name("check")
+        arguments = "self, value, limit" if method else "value, limit"
+        header = f"{indent}def {name}({arguments}):"
+        body: List[str] = []
+        raised: Set[str] = set()
+        self._block(body, indent + "    ", depth, raised, self.config.statements)
+        body.append(f"{indent}    return value")
+
+        self.lines.append(header)
+        if rng.random() < self.config.docstring_density:
+            # Sorted before drawing, the iteration order of a set of strings changes from run to run
+            documented = [
+                name
+                for name in sorted(raised)
+                if rng.random() >= self.config.undocumented
+            ]
+            docstring = [
+                f"Check the value with {name}.",
+                *_arguments(self.style),
+                *_section(self.style, documented),
+            ]
+            inner = indent + "    "
+            text = "\n".join(
+                inner + line if line else ""
+                for line in "\n".join(docstring).split("\n")
+            )
+            self.lines.append(f'{inner}"""\n{text}\n{inner}"""')
+        self.lines.extend(body)
+        self.lines.append("")
+
+    def _block(
+        self,
+        lines: List[str],
+        indent: str,
+        depth: int,
+        raised: Set[str],
+        statements: int,
+    ) -> None:
+        rng = self.rng
+        config = self.config
+        # The statements of nested blocks count towards the size of the function
+        inner = max(1, statements // 3)
+        try_below = config.raise_density + config.try_density
+        nested_below = try_below + config.nested_density
+        loop_below = nested_below + config.loop_density
+        for i in range(statements):
+            roll = rng.random()
+            if roll < config.raise_density:
+                exception = rng.choice(self.exceptions)
+                raised.add(exception)
+                lines.append(f"{indent}if value > {rng.randrange(1000)}:")
+                lines.append(f'{indent}    raise {exception}("value {i} is too large")')
+            elif roll < try_below and depth > 0:
+                caught = rng.choice(BUILTIN_EXCEPTIONS)
+                lines.append(f"{indent}try:")
+                self._block(lines, indent + "    ", depth - 1, raised, inner)
+                lines.append(f"{indent}except {caught} as error:")
+                if rng.random() < 0.5:
+                    exception = rng.choice(self.exceptions)
+                    raised.add(exception)
+                    lines.append(f"{indent}    raise {exception}() from error")
+                else:
+                    lines.append(f"{indent}    value = limit")
+            elif roll < nested_below and depth > 0:
+                # A nested function is checked on its own and does not raise for its parent
+                writer_lines, self.lines = self.lines, []
+                self.function(indent, depth - 1)
+                lines.extend(self.lines)
+                self.lines = writer_lines
+            elif roll < loop_below and depth > 0:
+                lines.append(f"{indent}for item in range(limit):")
+                self._block(lines, indent + "    ", depth - 1, raised, inner)
+                lines.append(f"{indent}    value += item")
+            else:
+                lines.append(f"{indent}value = value * {rng.randrange(1, 10)} + limit")
+
+
+def _module(
+    rng: random.Random, config: CorpusConfig, package: str, exceptions: Sequence[str]
+) -> str:
+    style = config.style if config.style != "mixed" else rng.choice(STYLES)
+    writer = _ModuleWriter(rng, config, style, [*BUILTIN_EXCEPTIONS, *exceptions])
+    writer.lines.extend(
+        [f"from {package}.errors import {', '.join(exceptions)}", "", ""]
+    )
+    functions = 0
+    while functions < config.functions:
+        if rng.random() < config.class_density:
+            methods = min(rng.randrange(2, 6), config.functions - functions)
+            writer.lines.extend(
+                [f"class {writer._name('Checker')}:", '    """A checker."""', ""]
+            )
+            for _ in range(methods):
+                writer.function("    ", config.depth, method=True)
+            functions += methods
+        else:
+            writer.function("", config.depth)
+            functions += 1
+        writer.lines.append("")
+    return "\n".join(writer.lines).rstrip() + "\n"
+
+
+def _errors(exceptions: Sequence[str]) -> str:
+    lines = ['"""The exceptions of the package."""', "", ""]
+    lines.append("class PackageError(Exception):\n    pass\n\n")
+    for name in exceptions:
+        lines.append(f"class {name}(PackageError):\n    pass\n\n")
+    return "\n".join(lines).rstrip() + "\n"
+
+
+def generate(directory: Path, config: CorpusConfig = CorpusConfig()) -> List[Path]:
+    """
+    Write a synthetic corpus.
+
+    Args:
+        directory (Path): The directory the packages are written to; it is created if needed.
+        config (CorpusConfig): The shape of the corpus.
+
+    Returns:
+        List[Path]: The modules of functions, in the order they were written.
+    """
+    if config.style not in (*STYLES, "mixed"):
+        raise ValueError(f"unknown docstring style {config.style!r}")
+    rng = random.Random(config.seed)
+    paths = []
+    packages = max(1, -(-config.files // config.files_per_package))
+    for p in range(packages):
+        package = f"package_{p}"
+        root = directory / package
+        root.mkdir(parents=True, exist_ok=True)
+        (root / "__init__.py").write_text("")
+        exceptions = [f"Package{p}Error{i}" for i in range(3)]
+        (root / "errors.py").write_text(_errors(exceptions))
+        for m in range(
+            min(config.files_per_package, config.files - p * config.files_per_package)
+        ):
+            path = root / f"module_{m}.py"
+            path.write_text(_module(rng, config, package, exceptions))
+            paths.append(path)
+    return paths
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Add an option for every field of CorpusConfig to a parser.
+
+    Args:
+        parser (argparse.ArgumentParser): The parser of a benchmark script.
+    """
+    for field in fields(CorpusConfig):
+        default: Any = field.default
+        parser.add_argument(
+            f"--{field.name.replace('_', '-')}",
+            type=type(default),
+            default=default,
+            choices=[*STYLES, "mixed"] if field.name == "style" else None,
+            help=f"(default: {default})",
+        )
+
+
+def config_from_arguments(arguments: argparse.Namespace) -> CorpusConfig:
+    """
+    Build the corpus configuration from the parsed options of add_arguments.
+
+    Args:
+        arguments (argparse.Namespace): The parsed options.
+
+    Returns:
+        CorpusConfig: The shape of the corpus.
+    """
+    return CorpusConfig(
+        **{field.name: getattr(arguments, field.name) for field in fields(CorpusConfig)}
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "output", type=Path, help="The directory the corpus is written to."
+    )
+    add_arguments(parser)
+    arguments = parser.parse_args()
+    config = config_from_arguments(arguments)
+    paths = generate(arguments.output, config)
+    size = sum(path.stat().st_size for path in paths)
+    print(f"{len(paths)} modules, {size / 2**20:.1f} MiB: {asdict(config)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+Throughput benchmark suite on a synthetic corpus, for the regression gate of compare.py.
+
+Generates a corpus with benchmarks/corpus.py (the same options write the same corpus) and
+times every phase of docraise on it separately, then end to end:
+1. discovery: iter_python_files over the corpus.
+2. parse: reading and ast.parse of every module.
+3. docstrings: docstring_parser on the docstrings with a raises section, without the cache.
+4. analysis: Analyzer.validate on the parsed trees, without the docstring and function caches.
+5. cli: `python -m docraise check --no-cache` in a subprocess, once per --jobs value
+   (its peak RSS is the one of the parent process only, not of the workers).
+
+Each phase runs --repeats times and the fastest run is kept. The results are written as
+JSON: throughputs (the metrics ending in _per_sec, higher is better) and peak resident
+set sizes (ending in _rss_mib, lower is better), together with the corpus options and
+the machine, so a baseline is only compared with runs of the same corpus.
+
+Usage:
+    PYTHONPATH=. python benchmarks/suite.py [--output results.json] [--jobs 1 4] [--files N] ...
+"""
+
+import argparse
+import ast
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import docstring_parser
+
+import docraise
+from docraise.analyzer import Analyzer
+from docraise.discovery import iter_python_files
+from docraise.docstrings import RAISES_MARKER, DocstringCache
+from docraise.memo import FunctionCache
+from docraise.symbols import SymbolTable, module_name
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from corpus import add_arguments, config_from_arguments, generate  # noqa: E402
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _mib(maxrss: int) -> float:
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    return maxrss / (2**20 if sys.platform == "darwin" else 2**10)
+
+
+def best_of(repeats: int, run: Callable[[], object]) -> float:
+    """Return the shortest wall time of a few runs of a function, in seconds."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def run_cli(directory: Path, jobs: int) -> Dict[str, float]:
+    """Run docraise on a directory in a subprocess and return its wall time and peak RSS."""
+    command = [
+        sys.executable,
+        "-m",
+        "docraise",
+        "check",
+        "--no-cache",
+        f"-j{jobs}",
+        "--format",
+        "jsonl",
+        ".",
+    ]
+    env = dict(
+        os.environ,
+        PYTHONPATH=os.pathsep.join(
+            filter(None, [str(ROOT), os.environ.get("PYTHONPATH")])
+        ),
+    )
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        command, cwd=directory, env=env, stdout=subprocess.DEVNULL
+    )
+    # wait4 reports the resources of this child only, RUSAGE_CHILDREN would add up all of them
+    _, status, usage = os.wait4(process.pid, 0)
+    elapsed = time.perf_counter() - start
+    # os.waitstatus_to_exitcode needs Python 3.9
+    if os.WIFEXITED(status):
+        process.returncode = os.WEXITSTATUS(status)
+    else:
+        process.returncode = -os.WTERMSIG(status)
+    if process.returncode not in (0, 1):
+        raise RuntimeError(
+            f"{' '.join(command)} failed with exit code {process.returncode}"
+        )
+    return {"seconds": elapsed, "rss_mib": _mib(usage.ru_maxrss)}
+
+
+def measure(directory: Path, repeats: int, jobs: List[int]) -> Dict[str, float]:
+    """
+    Time every phase on the corpus in a directory.
+
+    Args:
+        directory (Path): The root of the corpus.
+        repeats (int): The number of runs of every phase; the fastest one is kept.
+        jobs (List[int]): The numbers of worker processes of the end-to-end runs.
+
+    Returns:
+        Dict[str, float]: The metrics by name.
+    """
+    metrics: Dict[str, float] = {}
+    paths = list(iter_python_files([str(directory)]))
+
+    # First, while this process is small: on Linux, a child starts with the peak RSS of its parent
+    for job_count in jobs:
+        runs = [run_cli(directory, job_count) for _ in range(repeats)]
+        metrics[f"cli_j{job_count}_files_per_sec"] = len(paths) / min(
+            run["seconds"] for run in runs
+        )
+        metrics[f"cli_j{job_count}_peak_rss_mib"] = max(run["rss_mib"] for run in runs)
+
+    elapsed = best_of(repeats, lambda: list(iter_python_files([str(directory)])))
+    metrics["discovery_files_per_sec"] = len(paths) / elapsed
+
+    sources = {path: path.read_bytes() for path in paths}
+    elapsed = best_of(repeats, lambda: [ast.parse(path.read_bytes()) for path in paths])
+    metrics["parse_files_per_sec"] = len(paths) / elapsed
+    metrics["parse_mib_per_sec"] = sum(map(len, sources.values())) / 2**20 / elapsed
+
+    trees = {path: ast.parse(source) for path, source in sources.items()}
+    docstrings = [
+        docstring
+        for tree in trees.values()
+        for node in ast.walk(tree)
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+        for docstring in [ast.get_docstring(node)]
+        if docstring and RAISES_MARKER.search(docstring)
+    ]
+    if docstrings:
+        elapsed = best_of(
+            repeats,
+            lambda: [docstring_parser.parse(docstring) for docstring in docstrings],
+        )
+        metrics["docstrings_per_sec"] = len(docstrings) / elapsed
+
+    symbols = {
+        path: SymbolTable.from_tree(tree, *module_name(path))
+        for path, tree in trees.items()
+    }
+
+    def analyze() -> None:
+        # Fresh caches, so every repeat does the same work as the first run of a process
+        analyzer = Analyzer(
+            docstring_cache=DocstringCache(), function_cache=FunctionCache(maxsize=0)
+        )
+        for path, tree in trees.items():
+            analyzer.validate(
+                tree, str(path), symbols=symbols[path], source=sources[path]
+            )
+
+    elapsed = best_of(repeats, analyze)
+    metrics["analysis_files_per_sec"] = len(paths) / elapsed
+
+    # The phases above hold every source and tree of the corpus at once
+    metrics["phases_peak_rss_mib"] = _mib(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    )
+    return metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--output", type=Path, help="The JSON file the results are written to."
+    )
+    parser.add_argument("--repeats", type=int, default=3, help="(default: 3)")
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1], help="(default: 1)")
+    add_arguments(parser)
+    arguments = parser.parse_args()
+    config = config_from_arguments(arguments)
+
+    with tempfile.TemporaryDirectory() as directory:
+        generate(Path(directory), config)
+        metrics = measure(Path(directory), arguments.repeats, arguments.jobs)
+
+    for name, value in metrics.items():
+        print(f"{name:32} {value:12.1f}")
+
+    if arguments.output is not None:
+        results = {
+            "corpus": asdict(config),
+            "machine": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpus": os.cpu_count(),
+            },
+            "docraise": docraise.__version__,
+            "metrics": metrics,
+        }
+        arguments.output.write_text(json.dumps(results, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,30 @@
+from importlib import import_module
+from typing import Any
+
 from docraise._version import __version__
+
+# The public names by module. They are imported on first access, so that importing docraise (and
+# running docraise --version) does not load the analyzer, docstring_parser and asyncio.
+_EXPORTS = {
+    "analyze_many": "docraise.api",
+    "analyze_source": "docraise.api",
+    "iter_analyze_paths": "docraise.api",
+    "AnalysisOptions": "docraise.runner",
+    "RunLimits": "docraise.limits",
+    "Stats": "docraise.stats",
+    "Violation": "docraise.violation",
+    "ViolationCodes": "docraise.violation",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted([*globals(), *_EXPORTS])
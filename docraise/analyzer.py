@@ -1,12 +1,27 @@
 """
-This module contains the Analyzer class, a custom AST node visitor that
+This module contains the Analyzer class, a custom AST traversal that
 tracks exceptions in Python code. It checks for two types of violations:
 1. Exceptions that are raised but not documented in the function's docstring.
 2. Exceptions that are documented in the function's docstring but are not actually raised.
 
+The traversal uses an explicit stack instead of recursion, so very deeply nested code
+cannot hit RecursionError, and a per-node-type dispatch table instead of a method lookup
+for every node. Only statements are visited: a raise statement can never appear inside
+an expression, so expression subtrees (and lambdas) are never descended into.
+
+Functions, async functions and methods, including the ones nested in other functions or
+classes, are all checked in the same traversal. Entering a function pushes a frame, so
+every exception is attributed to the innermost function that raises it; exceptions raised
+outside of any function are not attributed to a function at all.
+
+Given the source of the module, the violations of every function are memoized by its
+normalized source (see docraise.memo), so a function repeated in the same or another
+module is neither traversed nor has its docstring looked up again. The styles of its
+parsed docstrings are memoized as well and replayed to the AUTO style detection.
+
 Example:
     To use this module, import it and create an instance of the Analyzer class.
-    Then pass a Python AST to the Analyzer's visit method.
+    Then pass a Python AST to the Analyzer's validate method.
 
         from analyzer import Analyzer
         import ast
@@ -14,191 +29,548 @@ Example:
         analyzer = Analyzer()
         with open('file_to_analyze.py') as f:
             tree = ast.parse(f.read())
-        violations = analyzer.check(tree)
+        violations = analyzer.validate(tree)
 
-    The method check returns a list of violations (instances of Violation class).
+    The method validate returns a list of violations (instances of Violation class).
 """
 
 import ast
-from ast import NodeVisitor
-from typing import Any, List, Optional
+import time
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+)
+
+from docstring_parser import DocstringStyle
+
+from docraise import docstrings, memo
+from docraise.docstrings import DocstringCache
+from docraise.memo import FunctionCache, MemoizedFunction, function_key
+from docraise.symbols import FunctionNode, SymbolTable, statement_fields
+from docraise.violation import Violation, ViolationCodes
 
-from docstring_parser import parse
+if TYPE_CHECKING:
+    from docraise.hierarchy import ExceptionHierarchy
 
-from docraise.violation import Violation, ViolationCodes
+# Parsed docstrings after which the style detected in AUTO mode is used for the rest of the module
+STYLE_DETECTION_SAMPLES = 3
 
 
-class Analyzer(NodeVisitor):
+class Analyzer:
     """
-    A custom AST node visitor class that tracks exceptions in Python code.
+    A custom AST traversal class that tracks exceptions in Python code.
 
     Attributes:
         violations: A list of detected violations.
-        curr_func: The current function being visited.
+        curr_func: The innermost function being visited, None outside of functions.
         curr_filename: The current file being visited.
-        exceptions: A list of exceptions detected in the current function.
+        exceptions: A list of exceptions detected in the innermost function (or outside of functions).
+        docstring_style: The style of the docstrings, AUTO to detect it per module.
+        docstring_cache: The cache of the exceptions documented in docstrings.
+        function_cache: The cache of the violations of whole functions.
+        counters: The counters of the last validated tree, for the run statistics.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        docstring_style: DocstringStyle = DocstringStyle.AUTO,
+        docstring_cache: Optional[DocstringCache] = None,
+        function_cache: Optional[FunctionCache] = None,
+    ):
         """Initialize the analyzer with empty violations, curr_func, and exceptions."""
 
         # If the violation is None that means that the user called just raise within the catch block
         # TODO: Ignore violations?
         self.violations: List[Violation] = []
 
-        self.curr_func: Optional[ast.FunctionDef] = None
+        self.curr_func: Optional[FunctionNode] = None
         self.curr_filename: Optional[str] = None
 
         # Exception names or None if exception is not named (e.g., just raise within an except block)
         self.exceptions: List[Optional[str]] = []
+        # The function and exceptions of every enclosing scope of the innermost function
+        self._frames: List[Tuple[Optional[FunctionNode], List[Optional[str]]]] = []
+
+        self.docstring_style = docstring_style
+        self.docstring_cache = (
+            docstring_cache if docstring_cache is not None else docstrings.shared_cache
+        )
+        self.function_cache = (
+            function_cache if function_cache is not None else memo.shared_cache
+        )
+        # The style used for the current module and the styles detected so far in AUTO mode
+        self._module_style = docstring_style
+        self._detected_styles: Optional[List[DocstringStyle]] = None
+        self.counters: Dict[str, int] = {}
+        self._functions = 0
+        self._unchanged_functions = 0
+        self._raises = 0
+        # Inclusive line ranges; functions outside of them are not checked
+        self._changed_lines: Optional[Sequence[Tuple[int, int]]] = None
+        # Exceptions propagated from called functions, by the line number of the function
+        self._propagated: Optional[Mapping[int, Iterable[str]]] = None
+        # If given, a raised exception is documented by any of its base classes
+        self._hierarchy: Optional["ExceptionHierarchy"] = None
+        # Resolves the exception names of the current module to qualified names
+        self._symbols = SymbolTable({})
+        # The lines of the module if its functions can be memoized, the context of their keys (None
+        # when it must be computed again)
+        self._lines: Optional[List[bytes]] = None
+        self._memo_context: Optional[bytes] = None
+        # The key, first violation index, function count, parsed style index and raise count of every
+        # function being checked
+        self._memoizing: List[Tuple[Optional[bytes], int, int, int, int]] = []
+        # The styles of the docstrings parsed in the current module
+        self._parsed_styles: List[DocstringStyle] = []
+        self._memoized_functions = 0
+
+        # Called when a node is reached; returning False skips the node's children
+        self._enter: Dict[Type[ast.AST], Callable[[Any], bool]] = {
+            ast.FunctionDef: self._enter_FunctionDef,
+            ast.AsyncFunctionDef: self._enter_FunctionDef,
+            ast.Raise: self._enter_Raise,
+        }
+        # Called after all children of a node have been traversed
+        self._leave: Dict[Type[ast.AST], Callable[[Any], None]] = {
+            ast.FunctionDef: self._leave_FunctionDef,
+            ast.AsyncFunctionDef: self._leave_FunctionDef,
+            ast.ExceptHandler: self._leave_ExceptHandler,
+        }
 
     def validate(
-        self, tree: ast.AST, filename: str = "Unknown file"
+        self,
+        tree: ast.AST,
+        filename: str = "Unknown file",
+        changed_lines: Optional[Sequence[Tuple[int, int]]] = None,
+        propagated: Optional[Mapping[int, Iterable[str]]] = None,
+        hierarchy: Optional["ExceptionHierarchy"] = None,
+        symbols: Optional[SymbolTable] = None,
+        source: Optional[bytes] = None,
     ) -> List[Violation]:
-        self.curr_filename = filename
-        self.violations = []
+        """
+        Traverse the tree and return the violations detected in it.
 
-        self.visit(tree)
+        Args:
+            tree (AST): The tree to validate, usually an ast.Module.
+            filename (str): The name of the file the tree was parsed from.
+            changed_lines (Optional[Sequence[Tuple[int, int]]]): Inclusive line ranges. If given,
+                only the functions that overlap one of them are checked.
+            propagated (Optional[Mapping[int, Iterable[str]]]): Exceptions that escape from the functions
+                called by each function, keyed by the line number of the function (see docraise.propagation).
+            hierarchy (Optional[ExceptionHierarchy]): If given, documenting a base class of a raised
+                exception documents the exception as well (see docraise.hierarchy).
+            symbols (Optional[SymbolTable]): The symbol table of the module. Defaults to a table
+                built from the tree, without the module name.
+            source (Optional[bytes]): The raw content the tree was parsed from. If given, the
+                violations of functions are memoized by their source (see docraise.memo), unless
+                changed_lines, propagated or hierarchy make them depend on more than their source.
+
+        Returns:
+            List[Violation]: The detected violations.
+        """
+        start = time.perf_counter_ns()
+        self.reset()
+        self.curr_filename = filename
+        self._changed_lines = changed_lines
+        self._propagated = propagated
+        self._hierarchy = hierarchy
+        self._symbols = symbols if symbols is not None else SymbolTable.from_tree(tree)
+        if (
+            source is not None
+            and changed_lines is None
+            and propagated is None
+            and hierarchy is None
+        ):
+            self._lines = source.splitlines(keepends=True)
+
+        cache = self.docstring_cache
+        hits, misses, skipped, parse_ns = (
+            cache.hits,
+            cache.misses,
+            cache.skipped,
+            cache.parse_ns,
+        )
+
+        self._walk(tree)
 
         self.curr_filename = None
+        self._changed_lines = None
+        self._propagated = None
+        self._hierarchy = None
+        self._lines = None
+        self.counters = {
+            "functions": self._functions,
+            "functions_unchanged": self._unchanged_functions,
+            "functions_memoized": self._memoized_functions,
+            "raises": self._raises,
+            "docstrings_skipped": cache.skipped - skipped,
+            "docstring_cache_hits": cache.hits - hits,
+            "docstrings_parsed": cache.misses - misses,
+            # The time spent in validate, which includes the time spent parsing docstrings
+            "analyzer_ns": time.perf_counter_ns() - start,
+            "docstring_parse_ns": cache.parse_ns - parse_ns,
+        }
 
         return self.violations
 
-    def visit_FunctionDef(self, node: ast.FunctionDef) -> Any:
+    def reset(self) -> None:
         """
-        Visit a function definition in the AST and checks for violations.
+        Clear the state left by the previous tree, so the same analyzer can validate the next one.
 
-        This method is automatically called by NodeVisitor.generic_visit.
+        validate calls it before every tree. The docstring style and the docstring cache are
+        kept, which is what makes reusing an analyzer cheaper than creating one per file.
+        """
+        self.violations = []
+        self.curr_func = None
+        self.curr_filename = None
+        self.exceptions = []
+        self._frames = []
+        self._functions = 0
+        self._unchanged_functions = 0
+        self._raises = 0
+        self._changed_lines = None
+        self._propagated = None
+        self._hierarchy = None
+        self._symbols = SymbolTable({})
+        self._lines = None
+        self._memo_context = None
+        self._memoizing = []
+        self._parsed_styles = []
+        self._memoized_functions = 0
+        self._module_style = self.docstring_style
+        self._detected_styles = (
+            [] if self.docstring_style is DocstringStyle.AUTO else None
+        )
+        self.counters = {}
+
+    def _walk(self, tree: ast.AST) -> None:
+        """
+        Traverse the statements of the tree in source order without recursion.
 
         Args:
-            node (FunctionDef): The function definition node in the AST.
+            tree (AST): The root of the traversal.
         """
-        if self.curr_func is None:
-            self.curr_func = node
-        else:
-            print(
-                f"Error: Nested functions are not supported. Skipping '{self.curr_filename}:{node.lineno} {node.name}'"
+        enter = self._enter
+        leave = self._leave
+        # (node, True) marks a node whose children have all been traversed
+        stack: List[Tuple[Any, bool]] = [(tree, False)]
+        push = stack.append
+        pop = stack.pop
+
+        while stack:
+            node, leaving = pop()
+            node_type = type(node)
+
+            if leaving:
+                leave[node_type](node)
+                continue
+
+            handler = enter.get(node_type)
+            if handler is not None and not handler(node):
+                continue
+
+            if node_type in leave:
+                push((node, True))
+
+            for field in reversed(statement_fields(node_type)):
+                children = getattr(node, field)
+                if isinstance(children, list):
+                    for child in reversed(children):
+                        push((child, False))
+
+    def _enter_FunctionDef(self, node: FunctionNode) -> bool:
+        """
+        Start tracking the exceptions of a function definition, possibly nested in another one.
+
+        Args:
+            node (FunctionNode): The (async) function definition node in the AST.
+
+        Returns:
+            bool: Whether the body of the function should be traversed.
+        """
+        if self._changed_lines is not None and not self._is_changed(node):
+            self._unchanged_functions += 1
+            return False
+
+        key = self._function_key(node)
+        if key is not None:
+            memoized = self.function_cache.get(key)
+            if memoized is not None:
+                self._replay(node, memoized)
+                return False
+        self._memoizing.append(
+            (
+                key,
+                len(self.violations),
+                self._functions,
+                len(self._parsed_styles),
+                self._raises,
             )
-            return
+        )
+        self._push_frame(node)
+        return True
 
-        self.generic_visit(node)
+    def _function_key(self, node: FunctionNode) -> Optional[bytes]:
+        """
+        Compute the memoization key of a function, if its violations can be memoized.
 
-        # TODO: Skip function if it doesn't have docstring?
-        docstr = parse(ast.get_docstring(node))
-        documented_exceptions = [e.type_name for e in docstr.raises]
+        Args:
+            node (FunctionNode): The function definition node in the AST.
 
-        # raised but not documented
-        for exception in self.exceptions:
-            if exception not in documented_exceptions:
-                assert exception is not None  # TODO: mypy error, handle better
-                assert self.curr_filename is not None
+        Returns:
+            Optional[bytes]: The key, or None without the source of the module.
+        """
+        if self._lines is None:
+            return None
+        context = self._memo_context
+        if context is None:
+            # The violations depend on the style, or on the styles detected so far in AUTO mode
+            detected = (
+                self._detected_styles if self._detected_styles is not None else ()
+            )
+            state = ",".join(
+                [self._module_style.name, *(style.name for style in detected)]
+            )
+            context = self._memo_context = self._symbols.fingerprint() + state.encode()
+        return function_key(self._lines, node, context)
 
-                violation = Violation.from_code(
-                    self.curr_filename, node.lineno, ViolationCodes.DR001, exception
-                )
-                self.violations.append(violation)
+    def _replay(self, node: FunctionNode, memoized: MemoizedFunction) -> None:
+        """
+        Report the memoized violations of a function without traversing it.
 
-        # TODO: should be able to silence
-        for exception in documented_exceptions:
-            if exception not in self.exceptions:
-                assert exception is not None  # TODO: mypy error, handle better
-                assert self.curr_filename is not None
+        Args:
+            node (FunctionNode): The function definition node in the AST.
+            memoized (MemoizedFunction): The violations of an identical function.
+        """
+        assert self.curr_filename is not None
+        self._memoized_functions += 1
+        self._functions += memoized.functions
+        self._raises += memoized.raises
+        for offset, code, name in memoized.violations:
+            self.violations.append(
+                Violation(self.curr_filename, node.lineno + offset, code, name)
+            )
+        for style in memoized.styles:
+            self._parsed_styles.append(style)
+            if self._detected_styles is not None:
+                self._detect_style(style)
 
-                violation = Violation.from_code(
-                    self.curr_filename, node.lineno, ViolationCodes.DR002, exception
-                )
-                self.violations.append(violation)
+    def _push_frame(self, node: FunctionNode) -> None:
+        """
+        Make a function the innermost one, saving the state of the enclosing scope.
 
-        self.curr_func = None
+        Args:
+            node (FunctionNode): The function definition node in the AST.
+        """
+        self._frames.append((self.curr_func, self.exceptions))
+        self.curr_func = node
         self.exceptions = []
 
-    def visit_Raise(self, node: ast.Raise) -> Any:
+    def _pop_frame(self) -> List[Optional[str]]:
         """
-        Visit a raise statement in the AST and checks for violations.
+        Leave the innermost function, restoring the state of the enclosing scope.
 
-        This method is automatically called by NodeVisitor.generic_visit.
+        Returns:
+            List[Optional[str]]: The exceptions raised by the function.
+        """
+        exceptions = self.exceptions
+        self.curr_func, self.exceptions = self._frames.pop()
+        return exceptions
+
+    def _is_changed(self, node: FunctionNode) -> bool:
+        """
+        Check whether a function definition, including its decorators, overlaps a changed line range.
 
         Args:
-            node (Raise): The raise statement node in the AST.
+            node (FunctionNode): The function definition node in the AST.
+
+        Returns:
+            bool: Whether the function changed.
         """
-        if isinstance(node.exc, ast.Name):
-            self.exceptions.append(node.exc.id)
-        elif isinstance(node.exc, ast.Call):
-            if isinstance(node.exc.func, ast.Name):
-                self.exceptions.append(node.exc.func.id)
-            elif isinstance(node.exc.func, ast.Attribute):
-                self.exceptions.append(node.exc.func.attr)
-            else:
-                raise AssertionError("Case not covered")
-        elif isinstance(node.exc, ast.Attribute):
-            self.exceptions.append(node.exc.attr)
-        else:
-            self.exceptions.append(None)
+        assert self._changed_lines is not None
+        first = min([node.lineno] + [d.lineno for d in node.decorator_list])
+        last = node.end_lineno or node.lineno
+        return any(start <= last and first <= end for start, end in self._changed_lines)
+
+    def _leave_FunctionDef(self, node: FunctionNode) -> None:
+        """
+        Check a function definition for violations once its body has been traversed.
+
+        Args:
+            node (FunctionNode): The (async) function definition node in the AST.
+        """
+        self._functions += 1
+        exceptions = self._pop_frame()
+
+        parsed = self.docstring_cache.parse(ast.get_docstring(node), self._module_style)
+        if parsed.style is not None:
+            self._parsed_styles.append(parsed.style)
+            if self._detected_styles is not None:
+                self._detect_style(parsed.style)
+        resolve = self._symbols.resolve
+        documented_exceptions = [
+            resolve(e) if e is not None else e for e in parsed.exceptions
+        ]
+
+        if self._propagated is not None:
+            callee_exceptions = self._propagated.get(node.lineno, ())
+            exceptions = exceptions + [
+                e for e in callee_exceptions if e not in exceptions
+            ]
+
+        documents = self._documents
+        # An exception that cannot be named cannot be reported either
+        undocumented = [
+            e
+            for e in exceptions
+            if e is not None and not any(documents(d, e) for d in documented_exceptions)
+        ]
+        not_raised = [
+            d
+            for d in documented_exceptions
+            if d is not None and not any(documents(d, e) for e in exceptions)
+        ]
+
+        # raised but not documented
+        for exception in undocumented:
+            assert self.curr_filename is not None
+
+            violation = Violation.from_code(
+                self.curr_filename, node.lineno, ViolationCodes.DR001, exception
+            )
+            self.violations.append(violation)
 
-        self.generic_visit(node)
+        # TODO: should be able to silence
+        for exception in not_raised:
+            assert self.curr_filename is not None
+
+            violation = Violation.from_code(
+                self.curr_filename, node.lineno, ViolationCodes.DR002, exception
+            )
+            self.violations.append(violation)
+
+        key, first, functions, first_style, raises = self._memoizing.pop()
+        if key is not None:
+            violations = tuple(
+                (v.lineno - node.lineno, v.code, v.name)
+                for v in self.violations[first:]
+            )
+            memoized = MemoizedFunction(
+                violations,
+                self._functions - functions,
+                self._raises - raises,
+                tuple(self._parsed_styles[first_style:]),
+            )
+            self.function_cache.put(key, memoized)
 
-    def visit_ExceptHandler(self, node: ast.ExceptHandler) -> Any:
+    def _documents(self, documented: Optional[str], raised: Optional[str]) -> bool:
         """
-        Visit an exception handler in the AST and checks for violations.
+        Check whether a documented exception covers a raised exception.
 
-        This method is automatically called by NodeVisitor.generic_visit.
+        Args:
+            documented (Optional[str]): The qualified name of the documented exception.
+            raised (Optional[str]): The qualified name of the raised exception.
+
+        Returns:
+            bool: True if the names match, if the raised exception is a subclass of the documented
+                one (with a hierarchy) or if one of them is a bare name unknown to the module and
+                both have the same last component.
+        """
+        if documented == raised:
+            return True
+        if documented is None or raised is None:
+            return False
+        if self._hierarchy is not None and self._hierarchy.is_subclass(
+            raised, documented
+        ):
+            return True
+        # e.g. "JSONDecodeError" documented without importing it, for json.JSONDecodeError
+        return (
+            self._symbols.is_unresolved(documented)
+            or self._symbols.is_unresolved(raised)
+        ) and documented.rpartition(".")[2] == raised.rpartition(".")[2]
+
+    def _detect_style(self, style: DocstringStyle) -> None:
+        """
+        Fix the docstring style of the module once the first docstrings agree on it.
 
         Args:
-            node (ExceptHandler): The exception handler node in the AST.
+            style (DocstringStyle): The style detected for the last parsed docstring.
+        """
+        assert self._detected_styles is not None
+        self._detected_styles.append(style)
+        self._memo_context = None
+        if len(self._detected_styles) < STYLE_DETECTION_SAMPLES:
+            return
+
+        if len(set(self._detected_styles)) == 1:
+            self._module_style = style
+        # Either way the detection is over; a module with mixed styles stays in AUTO mode
+        self._detected_styles = None
 
-        Raises:
-            (specific exceptions this method can raise)
+    def _enter_Raise(self, node: ast.Raise) -> bool:
         """
+        Record the exception raised by a raise statement.
+
+        Args:
+            node (Raise): The raise statement node in the AST.
+
+        Returns:
+            bool: Always False, a raise statement does not contain statements.
+        """
+        self._raises += 1
+        exception = node.exc.func if isinstance(node.exc, ast.Call) else node.exc
+        if exception is None:  # only used raise
+            self.exceptions.append(None)
+        else:
+            # None for an expression that cannot be resolved, e.g. raise ERRORS[code](message)
+            self.exceptions.append(self._symbols.resolve_node(exception))
+
+        return False
 
-        self.generic_visit(node)
+    def _leave_ExceptHandler(self, node: ast.ExceptHandler) -> None:
+        """
+        Resolve a re-raise within an exception handler once its body has been traversed.
 
+        Args:
+            node (ExceptHandler): The exception handler node in the AST.
+        """
         if self.exceptions:
             latest_exception = self.exceptions.pop()
 
             if latest_exception is None:  # only used raise
-                if isinstance(node.type, ast.Name):
-                    # This exception will be raised
-                    self.exceptions.append(node.type.id)
-                elif isinstance(node.type, ast.Tuple):
-                    # These exceptions will be raised
-                    exceptions: List[ast.Name] = [
-                        n for n in node.type.elts if isinstance(n, ast.Name)
-                    ]
-
-                    assert len(exceptions) == len(
-                        node.type.elts
-                    ), "Case not covered"  # All are of type ast.Name
-
-                    self.exceptions.extend(e.id for e in exceptions)
-                elif node.type is None:
-                    # Only raise
-                    """
-                    try:
-                        pass
-                    except:
-                        raise
-                    """
-                    # In this case the exception documentation will be ignored since it's missing a name
-                    pass
-                else:
-                    raise AssertionError("Case not covered")
-            elif latest_exception == node.name:  # e.g., raise e
-                # Switch name with the actual exception name
-                if isinstance(node.type, ast.Name):  # e.g., except ValueError as e
-                    self.exceptions.append(node.type.id)
-                elif isinstance(
-                    node.type, ast.Tuple
-                ):  # e.g., except (ValueError, AttributeError) as e
-                    _exceptions: List[ast.Name] = [  # _ because of mypy no-redef
-                        n for n in node.type.elts if isinstance(n, ast.Name)
-                    ]
-
-                    assert len(_exceptions) == len(
-                        node.type.elts
-                    ), "Case not covered"  # All must be names
-
-                    self.exceptions.extend(e.id for e in _exceptions)
-                else:
-                    raise AssertionError("Case not covered")
+                # The caught exceptions will be raised. With a bare except the exception
+                # documentation will be ignored since it's missing a name
+                self.exceptions.extend(self._handler_types(node))
+            elif node.name is not None and latest_exception == self._symbols.resolve(
+                node.name
+            ):  # e.g., raise e
+                # Switch name with the actual exception names, e.g., except (ValueError, AttributeError) as e
+                self.exceptions.extend(self._handler_types(node))
             else:  # raise ValueError, raise ValueError()
                 self.exceptions.append(latest_exception)
+
+    def _handler_types(self, node: ast.ExceptHandler) -> List[str]:
+        """
+        Resolve the exception types caught by a handler.
+
+        Args:
+            node (ExceptHandler): The exception handler node in the AST.
+
+        Returns:
+            List[str]: The qualified names of the caught types; expressions that are not names are left out.
+        """
+        types: List[Optional[ast.expr]] = (
+            list(node.type.elts) if isinstance(node.type, ast.Tuple) else [node.type]
+        )
+        resolved = (self._symbols.resolve_node(t) for t in types if t is not None)
+        return [name for name in resolved if name is not None]
@@ -0,0 +1,172 @@
+"""
+This module contains the library API of docraise, for programs that embed the linter.
+
+Unlike the command line, which exits the process, the API returns the violations:
+1. analyze_source checks a single in-memory source.
+2. iter_analyze_paths checks the Python files of files and directories, with the same
+   discovery and worker processes as a docraise run, and yields the violations of every
+   file as soon as it and the files before it are done.
+3. analyze_many checks in-memory sources concurrently from asyncio code, on a thread or
+   process executor, and yields the violations of every source as soon as it is done.
+
+All of them skip the sources the prefilter proves free of violations (see
+docraise.prefilter) and reuse one Analyzer per thread instead of creating one per source.
+
+Example:
+    To use this module, check a source, or many of them from a coroutine.
+
+        from docraise import analyze_many, analyze_source
+
+        for violation in analyze_source(text, "service.py"):
+            print(violation.lineno, violation.code, violation.text)
+
+        async for filename, violations in analyze_many(sources, concurrency=16):
+            ...
+"""
+
+import asyncio
+from concurrent.futures import Executor
+from itertools import islice
+from pathlib import Path
+from typing import (
+    AsyncIterator,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from docraise.cache import ResultCache
+from docraise.discovery import DEFAULT_EXCLUDE, iter_python_files
+from docraise.limits import RunLimits
+from docraise.runner import AnalysisOptions, analyze_content, iter_results
+from docraise.stats import Stats
+from docraise.violation import Violation
+
+# A source to check: its filename and its raw content or decoded text
+Source = Tuple[str, Union[str, bytes]]
+
+# Sources being analyzed or waiting to be yielded by analyze_many, by default
+DEFAULT_CONCURRENCY = 8
+
+
+def analyze_source(
+    source: Union[str, bytes],
+    filename: str = "<unknown>",
+    options: AnalysisOptions = AnalysisOptions(),
+    module: Optional[str] = None,
+) -> List[Violation]:
+    """
+    Parse and validate a Python source held in memory.
+
+    Args:
+        source (Union[str, bytes]): The raw content of the file, or its decoded text.
+        filename (str): The name reported in violations and syntax errors.
+        options (AnalysisOptions): The analysis options.
+        module (Optional[str]): The dotted name of the module, used to qualify its classes
+            and relative imports. Without it, they keep their names as spelled.
+
+    Returns:
+        List[Violation]: The violations detected in the source.
+
+    Raises:
+        SyntaxError: If the source cannot be parsed.
+    """
+    return analyze_content(source, filename, options, module)
+
+
+def iter_analyze_paths(
+    paths: Iterable[Union[str, Path]],
+    jobs: int = 1,
+    options: AnalysisOptions = AnalysisOptions(),
+    cache: Optional[ResultCache] = None,
+    stats: Optional[Stats] = None,
+    exclude: Sequence[str] = DEFAULT_EXCLUDE,
+    extend_exclude: Sequence[str] = (),
+    gitignore: bool = True,
+    limits: RunLimits = RunLimits(),
+) -> Iterator[Tuple[Path, List[Violation]]]:
+    """
+    Find the Python files in the given files and directories and yield their violations.
+
+    Files are found and analyzed lazily, so the first results are yielded before the
+    directories have been walked to the end.
+
+    Args:
+        paths (Iterable[Union[str, Path]]): The files and directories to check.
+        jobs (int): The number of worker processes. With 1, files are analyzed in the current process.
+        options (AnalysisOptions): The analysis options.
+        cache (Optional[ResultCache]): The result cache, if caching is enabled.
+        stats (Optional[Stats]): The run statistics to update, if any.
+        exclude (Sequence[str]): The exclude patterns, replacing the default ones (see docraise.discovery).
+        extend_exclude (Sequence[str]): Additional exclude patterns.
+        gitignore (bool): Whether to skip the files ignored by .gitignore files.
+        limits (RunLimits): The time budget of a file and the limits of the worker processes; the
+            files that cannot be checked get a DR9xx diagnostic.
+
+    Yields:
+        Tuple[Path, List[Violation]]: The resolved path of every file and its violations, in discovery order.
+    """
+    files = iter_python_files(
+        (str(path) for path in paths), exclude, extend_exclude, gitignore
+    )
+    yield from iter_results(
+        files, jobs=jobs, options=options, cache=cache, stats=stats, limits=limits
+    )
+
+
+async def analyze_many(
+    sources: Iterable[Source],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    options: AnalysisOptions = AnalysisOptions(),
+    executor: Optional[Executor] = None,
+) -> AsyncIterator[Tuple[str, List[Violation]]]:
+    """
+    Analyze in-memory sources on an executor and yield their violations as they complete.
+
+    The sources are consumed lazily and at most concurrency of them are analyzed or wait
+    to be yielded at any time, so a slow consumer holds the producer back instead of
+    letting results pile up. The default executor of the event loop runs the analysis
+    in threads, which keeps the loop responsive; a ProcessPoolExecutor runs it in parallel.
+
+    Args:
+        sources (Iterable[Source]): The filename and source of every module, consumed lazily.
+        concurrency (int): The maximum number of sources submitted but not yet yielded.
+        options (AnalysisOptions): The analysis options.
+        executor (Optional[Executor]): The executor that runs analyze_source, the loop's default one if None.
+
+    Yields:
+        Tuple[str, List[Violation]]: The filename of every source and its violations, in completion order.
+
+    Raises:
+        SyntaxError: If a source cannot be parsed; the sources not yet started are cancelled.
+        ValueError: If concurrency is smaller than 1.
+    """
+    if concurrency < 1:
+        raise ValueError(f"concurrency must be at least 1, got {concurrency}")
+    loop = asyncio.get_running_loop()
+    iterator = iter(sources)
+    pending: Dict["asyncio.Future[List[Violation]]", str] = {}
+
+    def submit(count: int) -> None:
+        for filename, source in islice(iterator, count):
+            future = loop.run_in_executor(
+                executor, analyze_source, source, filename, options
+            )
+            pending[future] = filename
+
+    submit(concurrency)
+    try:
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                filename = pending.pop(future)
+                yield filename, future.result()
+            submit(concurrency - len(pending))
+    finally:
+        for future in pending:
+            future.cancel()
@@ -0,0 +1,209 @@
+"""
+This module contains the ResultCache class, a persistent on-disk cache of analysis results.
+
+Each entry stores the violation records of one file. Entries are keyed by a hash of the
+file content, the docraise version and the options that influence the analysis, so an
+unchanged file never has to be parsed or analyzed again. Entries are written atomically
+(written to a temporary file and renamed into place), which makes the cache safe to share
+between worker processes and concurrent runs. Reading an entry refreshes its modification
+time, and prune removes the least recently used entries once the cache grows past its
+maximum size.
+
+Example:
+    To use this module, create a ResultCache and look up entries by content.
+
+        from docraise.cache import ResultCache
+
+        cache = ResultCache(".docraise_cache")
+        key = cache.key(content)
+        records = cache.get(key)
+        if records is None:
+            records = analyze(content)
+            cache.put(key, records)
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Any, Iterator, List, Mapping, Optional, Tuple, Union
+
+from docraise._version import __version__
+from docraise.defaults import DEFAULT_CACHE_DIR, DEFAULT_MAX_SIZE
+
+# Part of every key; bump whenever the format of the cached results changes
+FORMAT_VERSION = 3
+
+# The shard directories and the files the cache writes into them, entries and temporary files;
+# nothing else in the directory is ever removed, as it may not be a cache directory at all
+_SHARD = re.compile(r"[0-9a-f]{2}")
+_CACHE_FILE = re.compile(r"[0-9a-f]{64}\.json|tmp\w+\.tmp")
+
+
+class ResultCache:
+    """
+    Persistent, size-capped cache of per-file analysis results.
+
+    Attributes:
+        directory: The directory holding the cache entries.
+        max_size: The maximum total size of the entries in bytes.
+        options: The options that influence the analysis; they are part of every key.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path] = DEFAULT_CACHE_DIR,
+        max_size: int = DEFAULT_MAX_SIZE,
+        options: Optional[Mapping[str, Any]] = None,
+    ):
+        """Initialize the cache; the directory is created lazily on the first write."""
+        self.directory = Path(directory)
+        self.max_size = max_size
+        self.options = dict(options or {})
+
+        self._salt = json.dumps(
+            [__version__, FORMAT_VERSION, self.options], sort_keys=True
+        ).encode()
+
+    def key(self, content: bytes, kind: str = "violations") -> str:
+        """
+        Compute the cache key of a file.
+
+        Args:
+            content (bytes): The content of the file.
+            kind (str): The kind of the cached result, so one file can have several entries.
+
+        Returns:
+            str: The hexadecimal cache key.
+        """
+        digest = hashlib.sha256(self._salt)
+        digest.update(kind.encode())
+        digest.update(b"\0")
+        digest.update(content)
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Return the cached result for the key and mark the entry as recently used.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            Optional[Any]: The cached result, or None if the entry does not exist or is unreadable.
+        """
+        path = self._entry_path(key)
+        try:
+            with open(path, "rb") as entry:
+                result = json.load(entry)
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            # A read-only cache still serves its entries, they are just never pruned as recent
+            pass
+        return result
+
+    def put(self, key: str, result: Any) -> None:
+        """
+        Atomically store a result in the cache.
+
+        Failing to write the cache is not an error; the result will simply be computed again.
+
+        Args:
+            key (str): The cache key.
+            result (Any): A JSON-serializable result.
+        """
+        path = self._entry_path(key)
+        try:
+            self._ensure_directory()
+            path.parent.mkdir(exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w") as entry:
+                    json.dump(result, entry, separators=(",", ":"))
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError:
+            pass
+
+    def _ensure_directory(self) -> None:
+        if self.directory.is_dir():
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Keep the cache out of version control, like pytest and mypy do
+        (self.directory / ".gitignore").write_text("# Created by docraise\n*\n")
+
+    def _files(self) -> Iterator[Path]:
+        # The files written by the cache, in its shard directories
+        try:
+            shards = [p for p in self.directory.iterdir() if _SHARD.fullmatch(p.name)]
+        except OSError:
+            return
+        for shard in shards:
+            try:
+                names = os.listdir(shard)
+            except OSError:  # Not a directory, or removed by a concurrent run
+                continue
+            for name in names:
+                if _CACHE_FILE.fullmatch(name):
+                    yield shard / name
+
+    def clear(self) -> None:
+        """
+        Remove every entry from the cache.
+
+        Only the files written by the cache are removed, so clearing a directory that holds
+        anything else, e.g. the socket of a running daemon, leaves the rest of it untouched.
+        """
+        shards = set()
+        for path in self._files():
+            shards.add(path.parent)
+            try:
+                path.unlink()
+            except OSError:  # Already removed by a concurrent run
+                pass
+        for shard in shards:
+            try:
+                shard.rmdir()
+            except OSError:  # Not empty, it holds files the cache did not write
+                pass
+
+    def prune(self) -> int:
+        """
+        Remove the least recently used entries until the cache fits into max_size.
+
+        Returns:
+            int: The number of removed entries.
+        """
+        entries: List[Tuple[float, int, Path]] = []
+        total = 0
+        for path in self._files():
+            if path.suffix != ".json":
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            try:
+                path.unlink()
+            except OSError:  # Already removed by a concurrent run
+                pass
+            total -= size
+            removed += 1
+        return removed
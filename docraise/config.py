@@ -0,0 +1,60 @@
+"""
+This module loads the docraise configuration from INI-style configuration files.
+
+Like flake8, docraise reads a [docraise] section from setup.cfg or tox.ini in the current
+directory. Every key is the long name of a command line option, with dashes or underscores,
+and command line options always take precedence over the configuration file.
+
+Example:
+    A setup.cfg that fixes the docstring style and the number of worker processes:
+
+        [docraise]
+        docstring-style = google
+        jobs = 4
+"""
+
+import configparser
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+CONFIG_FILES = ("setup.cfg", "tox.ini")
+SECTION = "docraise"
+
+
+def find_config_file(directory: Union[str, Path] = ".") -> Optional[Path]:
+    """
+    Find the first configuration file with a [docraise] section in a directory.
+
+    Args:
+        directory (Union[str, Path]): The directory to search.
+
+    Returns:
+        Optional[Path]: The configuration file, or None if there is none.
+    """
+    for name in CONFIG_FILES:
+        path = Path(directory) / name
+        if path.is_file() and SECTION in _read(path):
+            return path
+    return None
+
+
+def _read(path: Path) -> configparser.ConfigParser:
+    parser = configparser.ConfigParser(interpolation=None)
+    parser.read(path, encoding="utf-8")
+    return parser
+
+
+def load_config(path: Union[str, Path]) -> Dict[str, str]:
+    """
+    Load the [docraise] section of a configuration file.
+
+    Args:
+        path (Union[str, Path]): The configuration file.
+
+    Returns:
+        Dict[str, str]: The raw option values by parameter name (underscores instead of dashes).
+    """
+    parser = _read(Path(path))
+    if SECTION not in parser:
+        return {}
+    return {key.replace("-", "_"): value for key, value in parser[SECTION].items()}
@@ -0,0 +1,371 @@
+"""
+This module contains the server behind `docraise daemon` and the client behind `docraise client`.
+
+The daemon keeps the violations of every file it has seen, and the module summaries when
+the analysis needs them, in memory. It watches the files by polling their modification
+time and size, so it has no dependency on a platform file notification API, and it only
+re-analyzes the files whose stamp changed (or whose cross-module inputs changed, e.g. the
+exceptions propagated from a modified callee). Files are checked again when a request
+comes in, so a client never gets stale results even between two polls.
+
+The client sends one JSON request per connection over a Unix socket and reads one JSON
+response, which is cheap enough for editor-on-save and pre-commit hooks.
+
+Example:
+    To use this module, serve a Daemon and send it requests.
+
+        from docraise.daemon import Daemon, request
+
+        daemon = Daemon(["src"], discover=process_paths)
+        daemon.serve(".docraise_cache/daemon.sock")  # Blocks until shut down
+
+        response = request(".docraise_cache/daemon.sock", {"command": "check", "paths": ["src/app.py"]})
+"""
+
+import json
+import socket
+import socketserver
+import threading
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from docraise.defaults import DEFAULT_POLL_INTERVAL, DEFAULT_SOCKET, DEFAULT_TIMEOUT
+from docraise.stats import Stats
+from docraise.violation import Violation
+
+# The analysis is imported by the daemon when it analyzes, so that the client starts quickly
+if TYPE_CHECKING:
+    from docraise.hierarchy import ExceptionHierarchy
+    from docraise.propagation import ModuleSummary, PropagatedExceptions
+    from docraise.runner import AnalysisOptions
+
+# (st_mtime_ns, st_size) of a file when it was last analyzed
+Stamp = Tuple[int, int]
+
+
+class DaemonError(RuntimeError):
+    """Raised when the daemon cannot be started or reached."""
+
+
+class Daemon:
+    """
+    In-memory results of the files under a set of roots, kept up to date by polling.
+
+    Attributes:
+        roots: The files and directories watched by the daemon.
+        options: The analysis options.
+        propagate: Whether exceptions are propagated from the called functions.
+        allow_subclass_docs: Whether base classes document their subclasses.
+        stats: The statistics of every analysis run by the daemon.
+    """
+
+    def __init__(
+        self,
+        roots: Iterable[str],
+        discover: Callable[[Iterable[str]], List[Path]],
+        options: Optional["AnalysisOptions"] = None,
+        propagate: bool = False,
+        allow_subclass_docs: bool = False,
+    ):
+        """Initialize the daemon; nothing is analyzed until refresh or check is called."""
+        from docraise.runner import AnalysisOptions
+
+        self.roots = list(roots)
+        self.options = options if options is not None else AnalysisOptions()
+        self.propagate = propagate
+        self.allow_subclass_docs = allow_subclass_docs
+        self.stats = Stats()
+
+        self._discover = discover
+        self._lock = threading.Lock()
+        self._stamps: Dict[Path, Stamp] = {}
+        # Files whose stamp changed since they were last analyzed
+        self._dirty: Set[Path] = set()
+        self._results: Dict[Path, List[Violation]] = {}
+        self._errors: Dict[Path, str] = {}
+        self._summaries: Dict[Path, "ModuleSummary"] = {}
+        # The cross-module inputs each file was analyzed with
+        self._inputs: Dict[Path, Any] = {}
+        self._propagated: Optional[Dict[Path, "PropagatedExceptions"]] = None
+        self._hierarchies: Optional[Dict[Path, "ExceptionHierarchy"]] = None
+
+    @property
+    def _needs_summaries(self) -> bool:
+        return self.propagate or self.allow_subclass_docs
+
+    def refresh(self) -> int:
+        """
+        Discover the files under the roots and re-analyze the changed ones.
+
+        Returns:
+            int: The number of re-analyzed files.
+        """
+        with self._lock:
+            files = self._discover(self.roots)
+            removed = set(self._stamps).difference(files)
+            for path in removed:
+                self._forget(path)
+            return self._update(files, force_inputs=bool(removed))
+
+    def check(
+        self, paths: Iterable[str]
+    ) -> Tuple[List[Violation], Dict[Path, str], int]:
+        """
+        Return the violations of the given files, re-analyzing only the changed ones.
+
+        Args:
+            paths (Iterable[str]): The files and directories to check.
+
+        Returns:
+            Tuple[List[Violation], Dict[Path, str], int]: The violations, the files that could not be
+                analyzed with the reason, and the number of re-analyzed files.
+        """
+        with self._lock:
+            files = self._discover(paths)
+            reanalyzed = self._update(files)
+            violations = [v for path in files for v in self._results.get(path, ())]
+            errors = {
+                path: self._errors[path] for path in files if path in self._errors
+            }
+            return violations, errors, reanalyzed
+
+    def _forget(self, path: Path) -> None:
+        states: Tuple[Dict[Path, Any], ...] = (
+            self._stamps,
+            self._results,
+            self._errors,
+            self._summaries,
+            self._inputs,
+        )
+        for state in states:
+            state.pop(path, None)
+        self._dirty.discard(path)
+
+    def _update(self, files: List[Path], force_inputs: bool = False) -> int:
+        """
+        Bring the results of the given files up to date; the caller holds the lock.
+
+        Args:
+            files (List[Path]): The files.
+            force_inputs (bool): Whether to recompute the cross-module inputs even if no file changed.
+
+        Returns:
+            int: The number of re-analyzed files.
+        """
+        from docraise.runner import analyze_file, cross_module_inputs
+
+        # A change anywhere may change the cross-module inputs of the given files
+        watched = files
+        if self._needs_summaries:
+            watched = list(self._stamps)
+            watched.extend(path for path in files if path not in self._stamps)
+
+        changed = []
+        for path in watched:
+            try:
+                stat = path.stat()
+            except OSError:
+                force_inputs = force_inputs or path in self._summaries
+                self._forget(path)
+                continue
+            stamp = (stat.st_mtime_ns, stat.st_size)
+            if self._stamps.get(path) != stamp:
+                self._stamps[path] = stamp
+                changed.append(path)
+
+        if self._needs_summaries and (changed or force_inputs):
+            for path, summary in self._summarize(changed):
+                self._summaries[path] = summary
+            self._propagated, self._hierarchies = cross_module_inputs(
+                self._summaries,
+                self._summaries,
+                self.propagate,
+                self.allow_subclass_docs,
+            )
+
+        self._dirty.update(changed)
+
+        reanalyzed = 0
+        for path in files:
+            if path not in self._stamps:
+                continue
+            propagated = (
+                self._propagated.get(path) if self._propagated is not None else None
+            )
+            hierarchy = (
+                self._hierarchies.get(path) if self._hierarchies is not None else None
+            )
+            inputs = (
+                propagated,
+                hierarchy.to_json() if hierarchy is not None else None,
+            )
+            if path not in self._dirty and self._inputs.get(path) == inputs:
+                continue
+            self._dirty.discard(path)
+            self._inputs[path] = inputs
+            self._errors.pop(path, None)
+            try:
+                self._results[path] = analyze_file(
+                    path,
+                    self.options,
+                    stats=self.stats,
+                    propagated=propagated,
+                    hierarchy=hierarchy,
+                )
+            except (OSError, SyntaxError, ValueError) as e:
+                self._results.pop(path, None)
+                self._errors[path] = str(e)
+            except Exception as e:
+                self._results[path] = [Violation.from_failure(str(path), e)]
+            reanalyzed += 1
+        return reanalyzed
+
+    def _summarize(self, paths: List[Path]) -> List[Tuple[Path, "ModuleSummary"]]:
+        from docraise.runner import iter_summaries
+
+        # The files that cannot be summarized get an empty summary, their analysis reports why
+        return list(iter_summaries(paths, stats=self.stats))
+
+    def poll(self, interval: float, stop: threading.Event) -> None:
+        """
+        Refresh the results every interval seconds until stop is set.
+
+        Args:
+            interval (float): The polling interval in seconds.
+            stop (threading.Event): Set to stop polling.
+        """
+        while not stop.wait(interval):
+            self.refresh()
+
+    def handle(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Handle a request of a client.
+
+        Args:
+            message (Dict[str, Any]): The request, e.g. {"command": "check", "paths": [...]}.
+
+        Returns:
+            Dict[str, Any]: The response.
+        """
+        command = message.get("command")
+        if command == "check":
+            violations, errors, reanalyzed = self.check(
+                message.get("paths") or self.roots
+            )
+            return {
+                "violations": [
+                    [v.filename, v.lineno, v.code, v.name] for v in violations
+                ],
+                "errors": {str(path): error for path, error in errors.items()},
+                "reanalyzed": reanalyzed,
+            }
+        if command == "stats":
+            return {"stats": dict(self.stats.counters), "files": len(self._stamps)}
+        if command == "ping":
+            return {"pong": True}
+        return {"error": f"unknown command: {command!r}"}
+
+    def serve(
+        self,
+        socket_path: Union[str, Path] = DEFAULT_SOCKET,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        ready: Optional[threading.Event] = None,
+    ) -> None:
+        """
+        Analyze the roots and serve requests on a Unix socket until a shutdown request.
+
+        Args:
+            socket_path (Union[str, Path]): The path of the Unix socket.
+            poll_interval (float): The polling interval in seconds, 0 to only check on request.
+            ready (Optional[threading.Event]): Set once the daemon accepts requests.
+
+        Raises:
+            DaemonError: If Unix sockets are not supported or another daemon listens on the socket.
+        """
+        if not hasattr(socket, "AF_UNIX"):
+            raise DaemonError("Unix sockets are not supported on this platform")
+        socket_path = Path(socket_path)
+        if socket_path.exists():
+            try:
+                request(socket_path, {"command": "ping"}, timeout=1.0)
+            except DaemonError:
+                socket_path.unlink()  # Left over by a daemon that did not shut down
+            else:
+                raise DaemonError(f"a daemon is already listening on {socket_path}")
+        socket_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.refresh()
+
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self) -> None:
+                message = json.loads(self.rfile.readline() or b"{}")
+                if message.get("command") == "shutdown":
+                    response: Dict[str, Any] = {"shutdown": True}
+                    threading.Thread(target=self.server.shutdown).start()
+                else:
+                    response = daemon.handle(message)
+                self.wfile.write(json.dumps(response).encode() + b"\n")
+
+        stop = threading.Event()
+        with socketserver.ThreadingUnixStreamServer(
+            str(socket_path), Handler
+        ) as server:
+            if poll_interval > 0:
+                threading.Thread(
+                    target=self.poll, args=(poll_interval, stop), daemon=True
+                ).start()
+            if ready is not None:
+                ready.set()
+            try:
+                server.serve_forever()
+            finally:
+                stop.set()
+                socket_path.unlink(missing_ok=True)
+
+
+def request(
+    socket_path: Union[str, Path],
+    message: Dict[str, Any],
+    timeout: Optional[float] = DEFAULT_TIMEOUT,
+) -> Dict[str, Any]:
+    """
+    Send a request to a running daemon and return its response.
+
+    Args:
+        socket_path (Union[str, Path]): The path of the Unix socket of the daemon.
+        message (Dict[str, Any]): The request.
+        timeout (Optional[float]): The timeout in seconds, None to wait forever.
+
+    Returns:
+        Dict[str, Any]: The response.
+
+    Raises:
+        DaemonError: If no daemon listens on the socket or it does not answer.
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        raise DaemonError("Unix sockets are not supported on this platform")
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(timeout)
+            client.connect(str(socket_path))
+            client.sendall(json.dumps(message).encode() + b"\n")
+            with client.makefile("rb") as stream:
+                response = stream.readline()
+    except OSError as e:
+        raise DaemonError(f"no daemon is listening on {socket_path}: {e}") from e
+    if not response:
+        raise DaemonError(f"the daemon on {socket_path} closed the connection")
+    return json.loads(response)
@@ -0,0 +1,43 @@
+"""
+This module contains the defaults of the command line options.
+
+The command line parses its arguments before it knows whether it will analyze anything,
+e.g. for --version or for a run in which no Python file matched, so the defaults it shows
+and validates against live here, in a module that imports nothing heavier than os, and
+not in the modules that use them: importing those loads the analyzer and docstring_parser.
+The modules that use a default import it from here.
+
+Example:
+    To use this module, import the defaults.
+
+        from docraise.defaults import STYLE_NAMES, default_jobs
+
+        click.Choice(STYLE_NAMES)
+"""
+
+import os
+
+# The docstring styles of --docstring-style, the keys of docraise.docstrings.STYLES
+STYLE_NAMES = ("google", "numpy", "rest", "epydoc", "auto")
+
+# The directory of the result cache and of the daemon socket
+DEFAULT_CACHE_DIR = ".docraise_cache"
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024  # bytes
+DEFAULT_SOCKET = os.path.join(DEFAULT_CACHE_DIR, "daemon.sock")
+DEFAULT_POLL_INTERVAL = 1.0  # seconds
+DEFAULT_TIMEOUT = 60.0  # seconds
+DEFAULT_DEBOUNCE = 0.2  # seconds
+
+# The limits of a run (see docraise.limits); generous enough to never stop a healthy file or worker
+DEFAULT_FILE_TIMEOUT = 60.0  # seconds
+DEFAULT_MAX_FILES_PER_WORKER = 5000
+DEFAULT_MAX_WORKER_MEMORY = 2048  # MiB
+
+
+def default_jobs() -> int:
+    """Return the default number of worker processes.
+
+    Returns:
+        int: The number of CPUs available, or 1 if it cannot be determined.
+    """
+    return os.cpu_count() or 1
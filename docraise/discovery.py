@@ -0,0 +1,309 @@
+"""
+This module finds the Python files to analyze.
+
+The walker is built on os.scandir, which returns the type of every entry together with its
+name, so only Python files and directories are ever looked at more closely. Excluded
+directories are pruned before they are entered: by default the usual virtual environment,
+version control, build and cache directories are never walked. Exclude patterns are
+fnmatch-style globs; they are compiled once into a single regular expression. Patterns
+without a slash match the name of a file or directory, the others match the end of its
+path (or the whole path, if they are absolute).
+
+The .gitignore files of the walked directories (and of their parents up to the root of the
+repository) are honoured as well, with the usual semantics: anchored and unanchored
+patterns, directory-only patterns, ** and negation.
+
+Files are yielded lazily as they are found, in a deterministic order, and each resolved
+path is yielded only once even if the given paths overlap.
+
+Example:
+    To use this module, iterate over the Python files under some paths.
+
+        from docraise.discovery import iter_python_files
+
+        for path in iter_python_files(["src", "tests"], extend_exclude=["fixtures"]):
+            print(path)
+"""
+
+import fnmatch
+import os
+import re
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Pattern, Sequence, Set, Tuple
+
+from docraise.defaults import DEFAULT_CACHE_DIR
+
+DEFAULT_EXCLUDE = (
+    ".git",
+    ".hg",
+    ".svn",
+    ".bzr",
+    ".tox",
+    ".nox",
+    ".venv",
+    "venv",
+    ".eggs",
+    "*.egg-info",
+    "__pycache__",
+    "node_modules",
+    "build",
+    "dist",
+    "site-packages",
+    ".mypy_cache",
+    ".pytest_cache",
+    DEFAULT_CACHE_DIR,
+)
+
+# (regex, negated, directory only) of every pattern of a .gitignore file
+_GitignoreRule = Tuple[Pattern[str], bool, bool]
+
+
+def parse_patterns(value: Optional[str]) -> List[str]:
+    """
+    Split a comma-separated list of patterns, as given on the command line or in the config file.
+
+    Args:
+        value (Optional[str]): The patterns, e.g. "build,*.pyi", possibly over several lines.
+
+    Returns:
+        List[str]: The patterns, without surrounding whitespace and empty items.
+    """
+    if not value:
+        return []
+    return [pattern.strip() for pattern in re.split(r"[,\n]", value) if pattern.strip()]
+
+
+class ExcludeMatcher:
+    """
+    Exclude patterns compiled into one regular expression for names and one for paths.
+
+    Attributes:
+        patterns: The fnmatch-style patterns.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        """Compile the patterns."""
+        self.patterns = list(patterns)
+        names = [p for p in self.patterns if "/" not in p]
+        paths = [p.rstrip("/") for p in self.patterns if "/" in p]
+        self._names = self._compile(names)
+        # Relative path patterns match the end of the path, e.g. "app/fixtures" any such directory
+        self._paths = self._compile(paths, prefix="(?:.*/)?")
+
+    @staticmethod
+    def _compile(patterns: List[str], prefix: str = "") -> Optional[Pattern[str]]:
+        if not patterns:
+            return None
+        return re.compile(
+            "|".join(
+                f"(?:{'' if p.startswith('/') else prefix}{fnmatch.translate(p)})"
+                for p in patterns
+            )
+        )
+
+    def match(self, name: str, path: str) -> bool:
+        """
+        Check whether a file or directory is excluded.
+
+        Args:
+            name (str): The name of the entry.
+            path (str): The absolute path of the entry.
+
+        Returns:
+            bool: True if one of the patterns matches.
+        """
+        if self._names is not None and self._names.match(name):
+            return True
+        return self._paths is not None and bool(
+            self._paths.match(path.replace(os.sep, "/"))
+        )
+
+
+def _gitignore_pattern(pattern: str) -> str:
+    """
+    Translate a .gitignore glob into a regular expression for paths relative to its directory.
+
+    Args:
+        pattern (str): The glob, without negation and trailing slash.
+
+    Returns:
+        str: The regular expression.
+    """
+    anchored = "/" in pattern
+    pattern = pattern.lstrip("/")
+    regex = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            regex.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("/**", i) and i + 3 == len(pattern):
+            regex.append("/.*")
+            i += 3
+        elif pattern[i] == "*":
+            regex.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            regex.append("[^/]")
+            i += 1
+        elif pattern[i] == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                regex.append(re.escape("["))
+                i += 1
+            else:
+                i += 1
+                regex.append("[" + pattern[i:end].replace("!", "^", 1) + "]")
+                i = end + 1
+        else:
+            regex.append(re.escape(pattern[i]))
+            i += 1
+    prefix = "" if anchored else "(?:.*/)?"
+    return prefix + "".join(regex) + "$"
+
+
+def read_gitignore(path: Path) -> List[_GitignoreRule]:
+    """
+    Read the rules of a .gitignore file.
+
+    Args:
+        path (Path): The path to the .gitignore file.
+
+    Returns:
+        List[_GitignoreRule]: The rules, in order; an unreadable file has no rules.
+    """
+    try:
+        lines = path.read_text(encoding="utf-8", errors="replace").splitlines()
+    except OSError:
+        return []
+
+    rules = []
+    for line in lines:
+        line = line.rstrip()
+        if not line or line.startswith("#"):
+            continue
+        negated = line.startswith("!")
+        if negated:
+            line = line[1:]
+        if line.startswith("\\"):
+            line = line[1:]
+        directory_only = line.endswith("/")
+        line = line.rstrip("/")
+        if line:
+            rules.append(
+                (re.compile(_gitignore_pattern(line)), negated, directory_only)
+            )
+    return rules
+
+
+# The rules of every .gitignore file that applies to a directory, with the directory they belong to
+_GitignoreStack = Tuple[Tuple[str, List[_GitignoreRule]], ...]
+
+
+def _is_ignored(stack: _GitignoreStack, path: str, is_dir: bool) -> bool:
+    ignored = False
+    for base, rules in stack:
+        start = len(base) + 1
+        relative = path[start:].replace(os.sep, "/")
+        for regex, negated, directory_only in rules:
+            if directory_only and not is_dir:
+                continue
+            if regex.match(relative):
+                ignored = not negated
+    return ignored
+
+
+def _parent_gitignores(directory: Path) -> _GitignoreStack:
+    """
+    Collect the .gitignore files of the parents of a directory, up to the root of its repository.
+
+    Args:
+        directory (Path): The resolved directory.
+
+    Returns:
+        _GitignoreStack: The rules, outermost first; empty outside of a repository.
+    """
+    stack = []
+    for parent in directory.parents:
+        rules = read_gitignore(parent / ".gitignore")
+        if rules:
+            stack.append((str(parent), rules))
+        if (parent / ".git").exists():
+            return tuple(reversed(stack))
+    return ()
+
+
+def iter_python_files(
+    paths: Iterable[str],
+    exclude: Sequence[str] = DEFAULT_EXCLUDE,
+    extend_exclude: Sequence[str] = (),
+    gitignore: bool = True,
+) -> Iterator[Path]:
+    """
+    Lazily find the Python files in the given files and directories.
+
+    Files given explicitly are only subject to the exclude patterns, not to .gitignore.
+
+    Args:
+        paths (Iterable[str]): The files and directories.
+        exclude (Sequence[str]): The exclude patterns, replacing the default ones.
+        extend_exclude (Sequence[str]): Additional exclude patterns.
+        gitignore (bool): Whether to skip the files ignored by .gitignore files.
+
+    Yields:
+        Path: The resolved path of every Python file, once.
+    """
+    excluded = ExcludeMatcher([*exclude, *extend_exclude])
+    seen: Set[Path] = set()
+
+    for argument in paths:
+        root = Path(argument).resolve()
+        if root.is_file():
+            if (
+                root.suffix == ".py"
+                and root not in seen
+                and not excluded.match(root.name, str(root))
+            ):
+                seen.add(root)
+                yield root
+            continue
+        if not root.is_dir() or excluded.match(root.name, str(root)):
+            continue
+
+        initial = _parent_gitignores(root) if gitignore else ()
+        # Depth-first; each directory carries the .gitignore rules that apply to it
+        directories: List[Tuple[str, _GitignoreStack]] = [(str(root), initial)]
+        while directories:
+            directory, stack = directories.pop()
+            if gitignore:
+                rules = read_gitignore(Path(directory, ".gitignore"))
+                if rules:
+                    stack = stack + ((directory, rules),)
+            try:
+                with os.scandir(directory) as scan:
+                    entries = sorted(scan, key=lambda entry: entry.name)
+            except OSError:
+                continue
+
+            subdirectories = []
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                    if not is_dir and not entry.name.endswith(".py"):
+                        continue
+                    if is_dir and entry.is_symlink():
+                        continue
+                except OSError:
+                    continue
+                if excluded.match(entry.name, entry.path):
+                    continue
+                if stack and _is_ignored(stack, entry.path, is_dir):
+                    continue
+                if is_dir:
+                    subdirectories.append((entry.path, stack))
+                elif entry.is_file():
+                    path = Path(entry.path)
+                    if path not in seen:
+                        seen.add(path)
+                        yield path
+            directories.extend(reversed(subdirectories))
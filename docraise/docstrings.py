@@ -0,0 +1,123 @@
+"""
+This module contains helpers that extract the documented exceptions from docstrings.
+
+Parsing a docstring with docstring_parser is by far the most expensive part of the
+analysis, so it is avoided whenever possible:
+1. Docstrings without any marker of a raises section are never parsed, because the
+   parser cannot find a documented exception in them.
+2. The documented exceptions of every parsed docstring are memoized in a bounded LRU
+   cache keyed by the docstring text and style, since boilerplate docstrings repeat a lot.
+3. With the AUTO style docstring_parser runs all four style parsers and keeps the best
+   result. A fixed style runs only one of them, and the style each docstring was detected
+   as is returned so callers can fix the style for similar docstrings.
+
+Example:
+    To use this module, create a DocstringCache and pass docstrings to parse.
+
+        from docraise.docstrings import DocstringCache
+
+        cache = DocstringCache()
+        names = cache.parse(ast.get_docstring(node)).exceptions
+"""
+
+import re
+import time
+from typing import Dict, NamedTuple, Optional, Tuple
+
+import docstring_parser
+from docstring_parser import DocstringStyle
+
+# Every keyword docstring_parser turns into DocstringRaises: Raises/Raise/Exceptions/Except
+# sections (Google, Numpydoc), :raises/:raise/:except/:exception fields (ReST), @raise (Epydoc)
+# and Warns/Warn sections (Numpydoc).
+RAISES_MARKER = re.compile(r"rais|except|warn", re.IGNORECASE)
+
+DEFAULT_CACHE_SIZE = 4096
+
+# Names accepted by the --docstring-style option
+STYLES = {
+    "google": DocstringStyle.GOOGLE,
+    "numpy": DocstringStyle.NUMPYDOC,
+    "rest": DocstringStyle.REST,
+    "epydoc": DocstringStyle.EPYDOC,
+    "auto": DocstringStyle.AUTO,
+}
+
+# Documented exception names, None for entries without a type (e.g., ":raises: on error")
+DocumentedExceptions = Tuple[Optional[str], ...]
+
+
+class ParsedDocstring(NamedTuple):
+    """The exceptions documented in a docstring and the style it was parsed with."""
+
+    exceptions: DocumentedExceptions
+    # None if the docstring was not parsed because it has no raises section
+    style: Optional[DocstringStyle]
+
+
+NOT_PARSED = ParsedDocstring((), None)
+
+
+class DocstringCache:
+    """
+    Bounded LRU cache of the exceptions documented in docstrings.
+
+    Attributes:
+        maxsize: The maximum number of cached docstrings.
+        hits: The number of docstrings found in the cache.
+        misses: The number of docstrings that had to be parsed.
+        skipped: The number of docstrings that were not parsed because they have no raises section.
+        parse_ns: The time spent parsing the docstrings that were not in the cache, in nanoseconds.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE):
+        """Initialize an empty cache."""
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+        self.parse_ns = 0
+
+        # Dictionaries keep insertion order, so the first key is the least recently used one
+        self._entries: Dict[Tuple[str, DocstringStyle], ParsedDocstring] = {}
+
+    def parse(
+        self, docstring: Optional[str], style: DocstringStyle = DocstringStyle.AUTO
+    ) -> ParsedDocstring:
+        """
+        Return the exception names documented in a docstring.
+
+        Args:
+            docstring (Optional[str]): The docstring, or None if the function has none.
+            style (DocstringStyle): The style of the docstring, AUTO to detect it.
+
+        Returns:
+            ParsedDocstring: The documented exception names in docstring order and the detected style.
+        """
+        if not docstring or RAISES_MARKER.search(docstring) is None:
+            self.skipped += 1
+            return NOT_PARSED
+
+        key = (docstring, style)
+        entries = self._entries
+        parsed = entries.pop(key, None)
+        if parsed is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            start = time.perf_counter_ns()
+            result = docstring_parser.parse(docstring, style)
+            self.parse_ns += time.perf_counter_ns() - start
+            parsed = ParsedDocstring(
+                tuple(e.type_name for e in result.raises), result.style or style
+            )
+            if entries and len(entries) >= self.maxsize:
+                del entries[next(iter(entries))]
+        if self.maxsize > 0:
+            entries[key] = parsed
+
+        return parsed
+
+
+# Shared by all analyzers of a process, so boilerplate docstrings are parsed once per process
+shared_cache = DocstringCache()
@@ -0,0 +1,127 @@
+"""
+This module contains the flake8 plugin, which reports the docraise violations through flake8.
+
+flake8 reads and parses every file once and hands the syntax tree to its AST plugins, so
+running docraise as a plugin saves the second read and parse of a separate docraise run,
+and the files are spread over flake8's own --jobs processes. The plugin is registered
+under the DR code prefix with the flake8.extension entry point; DR001 and DR002 are
+reported at column 1 of the line docraise reports them on. Like a docraise run, the plugin
+does not traverse the trees of files whose lines have no raise and no raises section marker.
+
+The plugin checks every file flake8 checks: the docraise options that select or skip
+files (--diff-against, --exclude, the cache) do not apply, and neither do
+--propagate and --allow-subclass-docs, which need every module before the first check.
+
+Example:
+    Once docraise is installed, flake8 runs the plugin without further configuration.
+    The docstring style can be set on the command line or in the [flake8] section:
+
+        [flake8]
+        docraise-docstring-style = google
+"""
+
+import ast
+from pathlib import Path
+from typing import ClassVar, Dict, Iterator, Optional, Sequence, Tuple, Type
+
+from docraise._version import __version__
+from docraise.analyzer import Analyzer
+from docraise.docstrings import STYLES
+from docraise.prefilter import may_have_violations
+from docraise.symbols import SymbolTable, module_name
+from docraise.violation import Violation
+
+# (line, column, "CODE text", plugin class) - what flake8 expects from an AST plugin
+Flake8Error = Tuple[int, int, str, Type["Plugin"]]
+
+
+class Plugin:
+    """
+    The flake8 AST plugin that validates the tree flake8 already parsed.
+
+    Attributes:
+        name: The name flake8 shows in its --version output.
+        version: The version flake8 shows in its --version output.
+        docstring_style: The docstring style name, set from the flake8 options.
+    """
+
+    name = "docraise"
+    version = __version__
+    docstring_style: ClassVar[str] = "auto"
+    # One analyzer per style and process, so the docstring cache is shared by all the files of a worker
+    _analyzers: ClassVar[Dict[str, Analyzer]] = {}
+
+    def __init__(
+        self,
+        tree: ast.AST,
+        filename: str = "Unknown file",
+        lines: Optional[Sequence[str]] = None,
+    ):
+        """
+        Initialize the plugin for one file; flake8 passes the arguments by name.
+
+        Args:
+            tree (ast.AST): The syntax tree flake8 parsed.
+            filename (str): The name of the file the tree was parsed from.
+            lines (Optional[Sequence[str]]): The lines of the file. If given, files without a
+                raise or a raises section marker are not traversed (see docraise.prefilter).
+        """
+        self.tree = tree
+        self.filename = filename
+        self.lines = lines
+
+    @classmethod
+    def add_options(cls, option_manager) -> None:
+        """
+        Register the docraise options with flake8.
+
+        Args:
+            option_manager: The flake8 option manager.
+        """
+        option_manager.add_option(
+            "--docraise-docstring-style",
+            default="auto",
+            choices=list(STYLES),
+            parse_from_config=True,
+            help="The style of the docstrings checked by docraise. (Default: %(default)s)",
+        )
+
+    @classmethod
+    def parse_options(cls, options) -> None:
+        """
+        Read the docraise options from the parsed flake8 options.
+
+        Args:
+            options: The flake8 options namespace.
+        """
+        cls.docstring_style = options.docraise_docstring_style
+
+    @classmethod
+    def _analyzer(cls) -> Analyzer:
+        analyzer = cls._analyzers.get(cls.docstring_style)
+        if analyzer is None:
+            analyzer = Analyzer(docstring_style=STYLES[cls.docstring_style])
+            cls._analyzers[cls.docstring_style] = analyzer
+        return analyzer
+
+    def run(self) -> Iterator[Flake8Error]:
+        """
+        Validate the tree and yield its violations in the format of flake8.
+
+        Yields:
+            Flake8Error: The line, column, message and plugin class of every violation.
+        """
+        if self.lines is not None and not may_have_violations("".join(self.lines)):
+            return
+        try:
+            # Qualified exception names depend on where the module lives in its package
+            path = Path(self.filename)
+            symbols = SymbolTable.from_tree(self.tree, *module_name(path))
+            violations = self._analyzer().validate(
+                self.tree, self.filename, symbols=symbols
+            )
+        except Exception as e:
+            # A bug of the analysis must not abort the whole flake8 run
+            violations = [Violation.from_failure(self.filename, e)]
+        for violation in violations:
+            yield violation.lineno, 0, f"{violation.code} {violation.text}", type(self)
@@ -0,0 +1,207 @@
+"""
+This module contains the ExceptionHierarchy class used by --allow-subclass-docs.
+
+The hierarchy is built once per run from the builtin exception classes and the bases of
+every class of the analyzed modules (see ModuleSummary.classes). For every class it stores
+the precomputed set of its ancestors, so checking whether a raised exception is a subclass
+of a documented one is a single set lookup. Classes are identified by their bare name: the
+qualified names resolved by the Analyzer (see docraise.symbols) are reduced to their last
+component before the lookup, since the bases of a class are recorded as spelled.
+
+Workers do not receive the whole hierarchy: subset restricts it to the exceptions a module
+raises, which is all the Analyzer needs, and keeps the cache key of a file independent of
+unrelated classes.
+
+Example:
+    To use this module, build the hierarchy from the module summaries.
+
+        from docraise.hierarchy import ExceptionHierarchy
+
+        hierarchy = ExceptionHierarchy.from_summaries(summaries.values())
+        hierarchy.is_subclass("FileNotFoundError", "OSError")  # True
+"""
+
+import builtins
+from typing import Any, Dict, FrozenSet, Iterable, List, Mapping, Optional
+
+from docraise.propagation import ModuleSummary, PropagatedExceptions
+
+
+def _builtin_bases() -> Dict[str, List[str]]:
+    bases = {}
+    for name, value in vars(builtins).items():
+        if isinstance(value, type) and issubclass(value, BaseException):
+            bases[name] = [
+                base.__name__ for base in value.__bases__ if base is not object
+            ]
+    return bases
+
+
+class ExceptionHierarchy:
+    """
+    The ancestors of the builtin exceptions and of the classes of the analyzed modules.
+
+    Attributes:
+        ancestors: Class name -> names of all its (direct and indirect) base classes.
+    """
+
+    def __init__(self, ancestors: Mapping[str, FrozenSet[str]]):
+        """Initialize the hierarchy from precomputed ancestor sets."""
+        self.ancestors = dict(ancestors)
+
+    @classmethod
+    def build(
+        cls, classes: Mapping[str, Iterable[str]], builtin: bool = True
+    ) -> "ExceptionHierarchy":
+        """
+        Build the hierarchy from the direct bases of each class.
+
+        Classes defined with the same name in several modules are merged. Cycles, which
+        can only come from such merges, are ignored.
+
+        Args:
+            classes (Mapping[str, Iterable[str]]): Class name -> names of its direct bases.
+            builtin (bool): Whether to include the builtin exception classes.
+
+        Returns:
+            ExceptionHierarchy: The hierarchy.
+        """
+        bases: Dict[str, List[str]] = _builtin_bases() if builtin else {}
+        for name, names in classes.items():
+            bases.setdefault(name, []).extend(names)
+
+        ancestors: Dict[str, FrozenSet[str]] = {}
+        for root in bases:
+            if root in ancestors:
+                continue
+            # Depth-first with an explicit stack, ancestors are computed bases first
+            stack = [root]
+            in_progress = {root}
+            while stack:
+                name = stack[-1]
+                # A base that is in progress is on the current path, i.e. a cycle
+                pending = next(
+                    (
+                        base
+                        for base in bases.get(name, ())
+                        if base not in ancestors and base not in in_progress
+                    ),
+                    None,
+                )
+                if pending is not None:
+                    stack.append(pending)
+                    in_progress.add(pending)
+                    continue
+                stack.pop()
+                in_progress.discard(name)
+                if name in ancestors:
+                    continue
+                result = set()
+                for base in bases.get(name, ()):
+                    result.add(base)
+                    result.update(ancestors.get(base, ()))
+                result.discard(name)
+                ancestors[name] = frozenset(result)
+        return cls(ancestors)
+
+    @classmethod
+    def from_summaries(
+        cls, summaries: Iterable[ModuleSummary], builtin: bool = True
+    ) -> "ExceptionHierarchy":
+        """
+        Build the hierarchy from the classes of the analyzed modules.
+
+        Args:
+            summaries (Iterable[ModuleSummary]): The summaries of the analyzed modules.
+            builtin (bool): Whether to include the builtin exception classes.
+
+        Returns:
+            ExceptionHierarchy: The hierarchy.
+        """
+        classes: Dict[str, List[str]] = {}
+        for summary in summaries:
+            for name, bases in summary.classes.items():
+                classes.setdefault(name, []).extend(bases)
+        return cls.build(classes, builtin)
+
+    def is_subclass(self, name: str, base: str) -> bool:
+        """
+        Check whether a class is the given base class or one of its subclasses.
+
+        Args:
+            name (str): The name of the class, possibly qualified.
+            base (str): The name of the base class, possibly qualified.
+
+        Returns:
+            bool: True if the class is the base class or derives from it; unknown classes only match themselves.
+        """
+        if name == base:
+            return True
+        ancestors = self.ancestors.get(name.rpartition(".")[2])
+        return ancestors is not None and base.rpartition(".")[2] in ancestors
+
+    def subset(self, names: Iterable[Optional[str]]) -> "ExceptionHierarchy":
+        """
+        Restrict the hierarchy to the given classes, keeping their full ancestor sets.
+
+        Args:
+            names (Iterable[Optional[str]]): The names of the classes, possibly qualified; None and unknown
+                names are ignored.
+
+        Returns:
+            ExceptionHierarchy: The restricted hierarchy.
+        """
+        bare = {name.rpartition(".")[2] for name in names if name is not None}
+        return ExceptionHierarchy(
+            {name: self.ancestors[name] for name in bare if name in self.ancestors}
+        )
+
+    def for_module(
+        self, summary: ModuleSummary, propagated: Optional[PropagatedExceptions] = None
+    ) -> "ExceptionHierarchy":
+        """
+        Restrict the hierarchy to the exceptions raised in a module.
+
+        Args:
+            summary (ModuleSummary): The summary of the module.
+            propagated (Optional[PropagatedExceptions]): The exceptions propagated to its functions, if any.
+
+        Returns:
+            ExceptionHierarchy: The hierarchy needed to validate the module.
+        """
+        names = {name for function in summary.functions for name in function.raises}
+        if propagated:
+            names.update(name for callee in propagated.values() for name in callee)
+        return self.subset(names)
+
+    def __len__(self) -> int:
+        return len(self.ancestors)
+
+    def __eq__(self, other: object) -> bool:
+        return (
+            isinstance(other, ExceptionHierarchy) and self.ancestors == other.ancestors
+        )
+
+    def to_json(self) -> Any:
+        """
+        Convert the hierarchy to a JSON-serializable value, e.g. for the result cache.
+
+        The value is deterministic, so it can also be used as part of a cache key.
+
+        Returns:
+            Any: The JSON-serializable hierarchy.
+        """
+        return {name: sorted(self.ancestors[name]) for name in sorted(self.ancestors)}
+
+    @classmethod
+    def from_json(cls, value: Any) -> "ExceptionHierarchy":
+        """
+        Create a hierarchy from the value returned by to_json.
+
+        Args:
+            value (Any): The JSON value.
+
+        Returns:
+            ExceptionHierarchy: The hierarchy.
+        """
+        return cls({name: frozenset(ancestors) for name, ancestors in value.items()})
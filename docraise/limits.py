@@ -0,0 +1,120 @@
+"""
+This module contains the limits that keep a large run going when single files misbehave.
+
+A run over tens of thousands of files should end with the results of every file it could
+analyze, even if a few files hang the analysis, crash a worker process or make it grow
+without bound. RunLimits sets the time budget of every file and when the worker processes
+are replaced; none of the limits changes the violations of a file that stays within them.
+
+The time budget is enforced in the process that analyzes the file with an interval timer
+(SIGALRM), which interrupts the analysis between two bytecodes and raises FileTimeout.
+Where there is no such timer (Windows, or any thread but the main one), the block runs
+without limit; a pool of worker processes still kills a worker that stalls past the
+budget of its files, e.g. in a C function that a signal cannot interrupt.
+
+Example:
+    To use this module, run the analysis of a file under a time limit.
+
+        from docraise.limits import FileTimeout, time_limit
+
+        try:
+            with time_limit(30.0):
+                analyze(path)
+        except FileTimeout:
+            print(f"{path} took more than 30 seconds")
+"""
+
+import os
+import signal
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+
+class FileTimeout(Exception):
+    """Raised in the analysis of a file that exceeded its time budget, with the budget in seconds."""
+
+
+@dataclass(frozen=True)
+class RunLimits:
+    """
+    Limits of a run that do not influence the violations detected in a file.
+
+    Attributes:
+        file_timeout: The seconds the analysis of a file may take before it is cancelled, None for no limit.
+        max_files_per_worker: The files each worker process analyzes before the pool is replaced, None for no limit.
+        max_worker_memory: The resident memory of a worker process, in MiB, above which the pool is replaced,
+            None for no limit.
+    """
+
+    file_timeout: Optional[float] = None
+    max_files_per_worker: Optional[int] = None
+    max_worker_memory: Optional[int] = None
+
+
+@contextmanager
+def time_limit(seconds: Optional[float]) -> Iterator[None]:
+    """
+    Raise FileTimeout in a block that runs for longer than the given seconds.
+
+    A timer that was already running, e.g. the one of a test runner, is restored afterwards
+    with the time it had left.
+
+    Args:
+        seconds (Optional[float]): The time limit, None or 0 for no limit.
+
+    Yields:
+        None: The block runs under the limit.
+
+    Raises:
+        FileTimeout: If the block runs for longer than the limit.
+    """
+    if (
+        not seconds
+        or not hasattr(signal, "setitimer")
+        or threading.current_thread() is not threading.main_thread()
+    ):
+        yield
+        return
+
+    def expired(signum, frame):
+        raise FileTimeout(seconds)
+
+    previous = signal.signal(signal.SIGALRM, expired)
+    previous_delay, _ = signal.setitimer(signal.ITIMER_REAL, seconds)
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(
+            signal.SIGALRM, previous if previous is not None else signal.SIG_DFL
+        )
+        if previous_delay:
+            remaining = previous_delay - (time.monotonic() - start)
+            signal.setitimer(signal.ITIMER_REAL, max(remaining, 1e-3))
+
+
+def resident_memory() -> Optional[float]:
+    """
+    Return the resident memory of the current process.
+
+    Returns:
+        Optional[float]: The resident set size in MiB, its peak where the current size is not
+            available, or None where neither is.
+    """
+    try:
+        with open("/proc/self/statm", "rb") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / (2**20 if sys.platform == "darwin" else 2**10)
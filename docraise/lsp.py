@@ -0,0 +1,434 @@
+"""
+This module contains the Language Server Protocol server behind `docraise lsp`.
+
+The server speaks JSON-RPC over stdin/stdout and publishes the DR001/DR002 violations of
+every open document as diagnostics. Documents are synchronized in full, but they are not
+re-analyzed in full: the violations of every function are cached by a hash of its source,
+and on each change only the functions whose hash changed are checked again (through the
+changed_lines support of the Analyzer). The cached violations of the other functions are
+moved to their new line. Anything outside of the functions, e.g. an import, can change the
+result of every function, so a change there discards the cache of the document. So does any
+change to the names the functions resolve against, e.g. an import inside a function that was
+edited or deleted, which the symbol table fingerprint of every version catches.
+
+Rapid edits are debounced: a document is analyzed once no change has arrived for the
+debounce delay.
+
+Example:
+    To use this module, serve the protocol on the standard streams.
+
+        from docraise.lsp import LanguageServer
+
+        LanguageServer(debounce=0.2).serve(sys.stdin.buffer, sys.stdout.buffer)
+"""
+
+import ast
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import IO, Any, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+from docraise import __version__
+from docraise.defaults import DEFAULT_DEBOUNCE
+from docraise.runner import AnalysisOptions
+from docraise.stats import Stats
+from docraise.symbols import STATEMENT_FIELDS, SymbolTable, module_name
+from docraise.violation import Violation
+
+# JSON-RPC error codes
+METHOD_NOT_FOUND = -32601
+# LSP constants
+TEXT_DOCUMENT_SYNC_FULL = 1
+SEVERITY_WARNING = 2
+
+# (line offset from the start of the function, code, exception name)
+FunctionViolation = Tuple[int, str, str]
+
+
+def read_message(stream: IO[bytes]) -> Optional[Dict[str, Any]]:
+    """
+    Read one JSON-RPC message framed with a Content-Length header.
+
+    Args:
+        stream (IO[bytes]): The input stream.
+
+    Returns:
+        Optional[Dict[str, Any]]: The message, or None at the end of the stream.
+    """
+    length = None
+    while True:
+        line = stream.readline()
+        if not line:
+            return None
+        line = line.strip()
+        if not line:
+            break
+        name, _, value = line.decode("ascii").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    if length is None:
+        return None
+    return json.loads(stream.read(length))
+
+
+def write_message(stream: IO[bytes], message: Dict[str, Any]) -> None:
+    """
+    Write one JSON-RPC message framed with a Content-Length header.
+
+    Args:
+        stream (IO[bytes]): The output stream.
+        message (Dict[str, Any]): The message.
+    """
+    body = json.dumps(message).encode()
+    stream.write(b"Content-Length: %d\r\n\r\n" % len(body) + body)
+    stream.flush()
+
+
+def uri_to_path(uri: str) -> Path:
+    """
+    Convert a file URI to a path.
+
+    Args:
+        uri (str): The URI, e.g. "file:///home/user/module.py".
+
+    Returns:
+        Path: The path.
+    """
+    return Path(unquote(urlparse(uri).path))
+
+
+class _Unit(NamedTuple):
+    """A function checked as a whole, from its first decorator to its last line."""
+
+    start: int
+    end: int
+    key: str
+
+
+def _function_units(tree: ast.AST, lines: List[str]) -> List[_Unit]:
+    """
+    Return the outermost function definitions, including methods, in source order.
+
+    Args:
+        tree (AST): The module.
+        lines (List[str]): The lines of the module.
+
+    Returns:
+        List[_Unit]: The functions with the hash of their source.
+    """
+    units = []
+    stack = list(reversed(getattr(tree, "body", [])))
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            start = min([node.lineno] + [d.lineno for d in node.decorator_list])
+            end = node.end_lineno or node.lineno
+            first = start - 1
+            source = "\n".join(lines[first:end]).encode()
+            key = hashlib.blake2b(source, digest_size=16).hexdigest()
+            units.append(_Unit(start, end, key))
+            continue
+        for field in STATEMENT_FIELDS:
+            stack.extend(reversed(getattr(node, field, None) or []))
+    return units
+
+
+def _skeleton(lines: List[str], units: List[_Unit]) -> str:
+    """
+    Hash the non-blank lines outside of the functions.
+
+    Args:
+        lines (List[str]): The lines of the module.
+        units (List[_Unit]): The functions of the module.
+
+    Returns:
+        str: The hash.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    previous = 0
+    for start, end, *_ in units + [_Unit(len(lines) + 1, len(lines), "")]:
+        before = start - 1
+        for line in lines[previous:before]:
+            if line.strip():
+                digest.update(line.encode() + b"\n")
+        previous = max(previous, end)
+    return digest.hexdigest()
+
+
+class _Document:
+    """An open document and the cached violations of its functions."""
+
+    def __init__(self, uri: str, text: str):
+        self.uri = uri
+        self.path = uri_to_path(uri)
+        self.text = text
+        self.skeleton: Optional[str] = None
+        self.symbols: Optional[SymbolTable] = None
+        # Function hash -> violations relative to the start of the function
+        self.functions: Dict[str, List[FunctionViolation]] = {}
+        self.timer: Optional[threading.Timer] = None
+
+
+class LanguageServer:
+    """
+    A Language Server Protocol server publishing the violations of the open documents.
+
+    Attributes:
+        options: The analysis options.
+        debounce: The delay in seconds without changes before a changed document is analyzed.
+        stats: The counters of the analyses, e.g. the number of reused function results.
+    """
+
+    def __init__(
+        self,
+        options: AnalysisOptions = AnalysisOptions(),
+        debounce: float = DEFAULT_DEBOUNCE,
+    ):
+        """Initialize the server without open documents."""
+        self.options = options
+        self.debounce = debounce
+        self.stats = Stats()
+
+        self._documents: Dict[str, _Document] = {}
+        self._output: Optional[IO[bytes]] = None
+        self._lock = threading.Lock()
+        self._shutdown = False
+
+    def serve(self, reader: IO[bytes], writer: IO[bytes]) -> int:
+        """
+        Handle messages until the exit notification or the end of the input.
+
+        Args:
+            reader (IO[bytes]): The stream the client writes to, usually stdin.
+            writer (IO[bytes]): The stream the client reads from, usually stdout.
+
+        Returns:
+            int: The exit code, 0 if the client asked for a shutdown before exiting.
+        """
+        self._output = writer
+        while True:
+            message = read_message(reader)
+            if message is None or message.get("method") == "exit":
+                break
+            self.handle(message)
+
+        for document in self._documents.values():
+            if document.timer is not None:
+                document.timer.cancel()
+        return 0 if self._shutdown else 1
+
+    def handle(self, message: Dict[str, Any]) -> None:
+        """
+        Handle one request or notification.
+
+        Args:
+            message (Dict[str, Any]): The JSON-RPC message.
+        """
+        method = message.get("method")
+        params = message.get("params") or {}
+        handler = getattr(
+            self, "_on_" + str(method).replace("/", "_").replace("$", "_"), None
+        )
+
+        if handler is None:
+            if "id" in message:
+                self._send(
+                    {
+                        "jsonrpc": "2.0",
+                        "id": message["id"],
+                        "error": {
+                            "code": METHOD_NOT_FOUND,
+                            "message": f"{method} not supported",
+                        },
+                    }
+                )
+            return
+
+        result = handler(params)
+        if "id" in message:
+            self._send({"jsonrpc": "2.0", "id": message["id"], "result": result})
+
+    def _send(self, message: Dict[str, Any]) -> None:
+        assert self._output is not None
+        with self._lock:
+            write_message(self._output, message)
+
+    def _on_initialize(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "capabilities": {
+                "textDocumentSync": {
+                    "openClose": True,
+                    "change": TEXT_DOCUMENT_SYNC_FULL,
+                    "save": True,
+                }
+            },
+            "serverInfo": {"name": "docraise", "version": __version__},
+        }
+
+    def _on_initialized(self, params: Dict[str, Any]) -> None:
+        pass
+
+    def _on_shutdown(self, params: Dict[str, Any]) -> None:
+        self._shutdown = True
+
+    def _on_textDocument_didOpen(self, params: Dict[str, Any]) -> None:
+        item = params["textDocument"]
+        document = self._documents[item["uri"]] = _Document(item["uri"], item["text"])
+        self._analyze(document)
+
+    def _on_textDocument_didChange(self, params: Dict[str, Any]) -> None:
+        document = self._documents.get(params["textDocument"]["uri"])
+        if document is None or not params.get("contentChanges"):
+            return
+        # Full synchronization, the last change holds the whole text
+        document.text = params["contentChanges"][-1]["text"]
+        self._schedule(document)
+
+    def _on_textDocument_didSave(self, params: Dict[str, Any]) -> None:
+        document = self._documents.get(params["textDocument"]["uri"])
+        if document is not None:
+            if "text" in params:
+                document.text = params["text"]
+            self._schedule(document)
+
+    def _on_textDocument_didClose(self, params: Dict[str, Any]) -> None:
+        document = self._documents.pop(params["textDocument"]["uri"], None)
+        if document is not None:
+            if document.timer is not None:
+                document.timer.cancel()
+            self._publish(document.uri, [])
+
+    def _schedule(self, document: _Document) -> None:
+        """
+        Analyze a changed document once no other change arrived for the debounce delay.
+
+        Args:
+            document (_Document): The changed document.
+        """
+        if document.timer is not None:
+            document.timer.cancel()
+        if self.debounce <= 0:
+            self._analyze(document)
+            return
+        document.timer = threading.Timer(self.debounce, self._analyze, (document,))
+        document.timer.daemon = True
+        document.timer.start()
+
+    def _analyze(self, document: _Document) -> None:
+        """
+        Check the changed functions of a document and publish its diagnostics.
+
+        Args:
+            document (_Document): The document.
+        """
+        with self._lock:
+            violations = self.validate(document)
+        if violations is not None:
+            self._publish(document.uri, violations, document.text.splitlines())
+
+    def validate(self, document: _Document) -> Optional[List[Violation]]:
+        """
+        Return the violations of a document, only checking the functions that changed.
+
+        Args:
+            document (_Document): The document.
+
+        Returns:
+            Optional[List[Violation]]: The violations, or None if the document does not parse.
+        """
+        text = document.text
+        try:
+            tree = ast.parse(text, filename=str(document.path))
+        except (SyntaxError, ValueError):
+            return None  # Usually in the middle of an edit; keep the last diagnostics
+        lines = text.splitlines()
+        units = _function_units(tree, lines)
+
+        skeleton = _skeleton(lines, units)
+        symbols = SymbolTable.from_tree(tree, *module_name(document.path))
+        if (
+            skeleton != document.skeleton
+            or document.symbols is None
+            or symbols.fingerprint() != document.symbols.fingerprint()
+        ):
+            document.skeleton = skeleton
+            document.functions = {}
+        document.symbols = symbols
+
+        changed_units = [u for u in units if u.key not in document.functions]
+        violations: List[Violation] = []
+        if changed_units:
+            try:
+                violations = self._validate_changed(document, tree, changed_units)
+            except Exception as e:
+                # The functions stay unchecked, so the next change checks them again
+                return [Violation.from_failure(str(document.path), e)]
+
+        # Group the new violations by function and reuse the cached ones of the other functions
+        functions: Dict[str, List[FunctionViolation]] = {}
+        found = iter(sorted(violations, key=lambda v: v.lineno))
+        pending = next(found, None)
+        for unit in units:
+            cached = document.functions.get(unit.key)
+            if cached is None:
+                cached = []
+                while pending is not None and pending.lineno <= unit.end:
+                    cached.append(
+                        (pending.lineno - unit.start, pending.code, pending.name)
+                    )
+                    pending = next(found, None)
+            functions[unit.key] = cached
+        document.functions = functions
+
+        self.stats.update(
+            {
+                "functions_reanalyzed": len(changed_units),
+                "functions_reused": len(units) - len(changed_units),
+            }
+        )
+        filename = str(document.path)
+        return [
+            Violation(filename, unit.start + offset, code, name)
+            for unit in units
+            for offset, code, name in functions[unit.key]
+        ]
+
+    def _validate_changed(
+        self, document: _Document, tree: ast.AST, changed_units: List[_Unit]
+    ) -> List[Violation]:
+        analyzer = self.options.shared_analyzer()
+        changed = [(u.start, u.end) for u in changed_units]
+        violations = analyzer.validate(
+            tree, str(document.path), changed, symbols=document.symbols
+        )
+        self.stats.update(analyzer.counters)
+        return violations
+
+    def _publish(
+        self, uri: str, violations: List[Violation], lines: Optional[List[str]] = None
+    ) -> None:
+        diagnostics = []
+        for violation in violations:
+            line = violation.lineno - 1
+            length = len(lines[line]) if lines is not None and line < len(lines) else 0
+            diagnostics.append(
+                {
+                    "range": {
+                        "start": {"line": line, "character": 0},
+                        "end": {"line": line, "character": length},
+                    },
+                    "severity": SEVERITY_WARNING,
+                    "code": violation.code,
+                    "source": "docraise",
+                    "message": violation.text,
+                }
+            )
+        self._send(
+            {
+                "jsonrpc": "2.0",
+                "method": "textDocument/publishDiagnostics",
+                "params": {"uri": uri, "diagnostics": diagnostics},
+            }
+        )
@@ -1,12 +1,38 @@
 import ast
+import functools
+import json
 import sys
+import time
+from dataclasses import asdict
+from itertools import chain
 from pathlib import Path
-from typing import Iterable, List, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
 import click
 
 import docraise
-from docraise.analyzer import Analyzer
+from docraise.config import find_config_file, load_config
+from docraise.defaults import (
+    DEFAULT_CACHE_DIR,
+    DEFAULT_DEBOUNCE,
+    DEFAULT_FILE_TIMEOUT,
+    DEFAULT_MAX_FILES_PER_WORKER,
+    DEFAULT_MAX_SIZE,
+    DEFAULT_MAX_WORKER_MEMORY,
+    DEFAULT_POLL_INTERVAL,
+    DEFAULT_SOCKET,
+    DEFAULT_TIMEOUT,
+    STYLE_NAMES,
+    default_jobs,
+)
+from docraise.discovery import DEFAULT_EXCLUDE, iter_python_files, parse_patterns
+from docraise.reporters import REPORTERS
+from docraise.stats import DEFAULT_SLOWEST, Stats
+from docraise.violation import Violation
+
+# The modules that load the analyzer and docstring_parser (docraise.runner, docraise.lsp) are
+# imported by the commands that need them, and by check only once a Python file was found, so
+# that --version, --help and runs without Python files start quickly.
 
 # def get_python_files(path: str) -> List[str]:
 #     """Walk through the given directory and return python files.
@@ -37,71 +63,582 @@ def get_function_defs(tree: ast.AST):
     return [node for node in ast.walk(tree) if isinstance(node, ast.FunctionDef)]
 
 
-def get_python_files(path: Path) -> List[Path]:
-    """Walk through the given directory and return python files.
+def process_paths(
+    paths: Iterable[str],
+    exclude: Sequence[str] = DEFAULT_EXCLUDE,
+    extend_exclude: Sequence[str] = (),
+    gitignore: bool = True,
+) -> List[Path]:
+    """Process a list of paths, returning a list of all Python files in those paths.
 
     Args:
-        path (Path): The path to the directory to analyze.
+        paths (Iterable[str]): A list of paths to files or directories.
+        exclude (Sequence[str]): The exclude patterns, replacing the default ones.
+        extend_exclude (Sequence[str]): Additional exclude patterns.
+        gitignore (bool): Whether to skip the files ignored by .gitignore files.
 
     Returns:
-        List[Path]: A list of paths to Python files in the directory.
+        List[Path]: A list of paths to Python files in the provided paths, without duplicates.
     """
-    return list(path.rglob("*.py"))
+    return list(iter_python_files(paths, exclude, extend_exclude, gitignore))
 
 
-def process_paths(paths: Iterable[str]) -> List[Path]:
-    """Process a list of paths, returning a list of all Python files in those paths.
+def _load_config(
+    ctx: click.Context, param: click.Parameter, value: Optional[str]
+) -> None:
+    """Use the [docraise] section of the configuration file as the defaults of the options."""
+    path = value if value is not None else find_config_file()
+    if path is not None:
+        ctx.default_map = {**load_config(path), **(ctx.default_map or {})}
 
-    Args:
-        paths (Iterable[str]): A list of paths to files or directories.
 
-    Returns:
-        List[Path]: A list of paths to Python files in the provided paths.
+class _DefaultGroup(click.Group):
+    """A command group that runs the default command when no subcommand is named."""
+
+    default_command = "check"
+
+    def parse_args(self, ctx: click.Context, args: List[str]) -> List[str]:
+        """Insert the default command unless the arguments start with a subcommand or --help/--version."""
+        if not args or (
+            args[0] not in self.commands and args[0] not in ("--help", "--version")
+        ):
+            args = [self.default_command, *args]
+        return super().parse_args(ctx, args)
+
+
+@click.group(cls=_DefaultGroup)
+@click.version_option(docraise.__version__)
+def main() -> None:
+    """Check that the docstrings document the exceptions raised by each function.
+
+    Without a command, the paths are checked like with the check command.
     """
-    python_files = []
-    for pth in paths:
-        path: Path = Path(pth).resolve()
-        if path.is_file() and path.suffix == ".py":
-            python_files.append(path)
-        elif path.is_dir():
-            python_files.extend(get_python_files(path))
-    return python_files
 
 
-@click.command()
+@main.command()
 @click.argument("paths", nargs=-1)
-@click.version_option(docraise.__version__)
-def main(paths: Tuple[str]) -> None:
-    """Command line interface for the program.
+@click.option(
+    "--config",
+    type=click.Path(exists=True, dir_okay=False),
+    callback=_load_config,
+    is_eager=True,
+    expose_value=False,
+    help="Configuration file with a [docraise] section. Defaults to setup.cfg or tox.ini.",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=default_jobs,
+    show_default="number of CPUs",
+    help="Number of worker processes used to analyze the files.",
+)
+@click.option(
+    "--file-timeout",
+    type=click.FloatRange(min=0),
+    default=DEFAULT_FILE_TIMEOUT,
+    show_default=True,
+    help="Seconds the analysis of a file may take before it is cancelled and reported as DR903; 0 for no limit.",
+)
+@click.option(
+    "--max-files-per-worker",
+    type=click.IntRange(min=0),
+    default=DEFAULT_MAX_FILES_PER_WORKER,
+    show_default=True,
+    help="Files each worker process analyzes before the workers are replaced; 0 for no limit.",
+)
+@click.option(
+    "--max-worker-memory",
+    type=click.IntRange(min=0),
+    default=DEFAULT_MAX_WORKER_MEMORY,
+    show_default=True,
+    help="Resident memory in MiB of a worker process above which the workers are replaced; 0 for no limit.",
+)
+@click.option(
+    "--docstring-style",
+    type=click.Choice(STYLE_NAMES),
+    default="auto",
+    show_default=True,
+    help="Style of the docstrings. In auto mode the style is detected from the first docstrings of each module.",
+)
+@click.option(
+    "--diff-against",
+    metavar="REF",
+    help="Only check the functions changed since the git REF (e.g. origin/main).",
+)
+@click.option(
+    "--staged",
+    is_flag=True,
+    help="Only check the functions with staged changes, e.g. in a pre-commit hook.",
+)
+@click.option(
+    "--propagate",
+    is_flag=True,
+    help="Also count the exceptions that escape from the functions called by each function.",
+)
+@click.option(
+    "--allow-subclass-docs",
+    is_flag=True,
+    help="Accept a documented base class (e.g. OSError) for a raised subclass (e.g. FileNotFoundError).",
+)
+@click.option(
+    "--lazy-parse",
+    is_flag=True,
+    help="Only parse the functions of large modules that raise or document exceptions.",
+)
+@click.option(
+    "--exclude",
+    metavar="PATTERNS",
+    help="Comma-separated globs of the files and directories to skip, replacing the defaults "
+    f"({','.join(DEFAULT_EXCLUDE)}).",
+)
+@click.option(
+    "--extend-exclude",
+    metavar="PATTERNS",
+    help="Comma-separated globs of the files and directories to skip, on top of --exclude.",
+)
+@click.option(
+    "--no-gitignore",
+    is_flag=True,
+    help="Also check the files ignored by .gitignore files.",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False),
+    default=DEFAULT_CACHE_DIR,
+    show_default=True,
+    help="Directory of the result cache.",
+)
+@click.option(
+    "--cache-max-size",
+    type=click.IntRange(min=0),
+    default=DEFAULT_MAX_SIZE // (1024 * 1024),
+    show_default=True,
+    help="Maximum size of the result cache in MiB; least recently used entries are evicted.",
+)
+@click.option(
+    "--no-cache", is_flag=True, help="Neither read nor write the result cache."
+)
+@click.option(
+    "--clear-cache", is_flag=True, help="Clear the result cache before the analysis."
+)
+@click.option(
+    "--stats", "show_stats", is_flag=True, help="Print run statistics to stderr."
+)
+@click.option(
+    "--stats-format",
+    type=click.Choice(["text", "json"]),
+    default="text",
+    show_default=True,
+    help="Format of the statistics printed by --stats, a summary or JSON.",
+)
+@click.option(
+    "--slowest",
+    type=click.IntRange(min=0),
+    default=DEFAULT_SLOWEST,
+    show_default=True,
+    help="Number of slowest files listed by --stats.",
+)
+@click.option(
+    "--profile",
+    "profile_path",
+    type=click.Path(dir_okay=False, writable=True),
+    help="Profile the run with cProfile and write the profile to this file. Implies -j1.",
+)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(list(REPORTERS)),
+    default="text",
+    show_default=True,
+    help="Output format of the violations.",
+)
+def check(
+    paths: Tuple[str],
+    jobs: int,
+    file_timeout: float,
+    max_files_per_worker: int,
+    max_worker_memory: int,
+    docstring_style: str,
+    diff_against: Optional[str],
+    staged: bool,
+    propagate: bool,
+    allow_subclass_docs: bool,
+    lazy_parse: bool,
+    exclude: Optional[str],
+    extend_exclude: Optional[str],
+    no_gitignore: bool,
+    cache_dir: str,
+    cache_max_size: int,
+    no_cache: bool,
+    clear_cache: bool,
+    show_stats: bool,
+    stats_format: str,
+    slowest: int,
+    profile_path: Optional[str],
+    output_format: str,
+) -> None:
+    """Check that the docstrings document the exceptions raised by each function.
 
+    \f
     Args:
         paths (Tuple[str]): A tuple of paths to files or directories.
+        jobs (int): The number of worker processes.
+        file_timeout (float): The time budget of a file in seconds, 0 for no limit.
+        max_files_per_worker (int): The files each worker analyzes before the workers are replaced, 0 for no limit.
+        max_worker_memory (int): The memory of a worker in MiB above which the workers are replaced, 0 for no limit.
+        docstring_style (str): The style of the docstrings.
+        diff_against (Optional[str]): The git ref to compare against, if any.
+        staged (bool): Whether to only check the staged changes.
+        propagate (bool): Whether to propagate exceptions from the called functions.
+        allow_subclass_docs (bool): Whether documented base classes also document their subclasses.
+        lazy_parse (bool): Whether to only parse the functions of large modules that can have violations.
+        exclude (Optional[str]): The comma-separated exclude patterns replacing the default ones.
+        extend_exclude (Optional[str]): The comma-separated additional exclude patterns.
+        no_gitignore (bool): Whether to ignore the .gitignore files.
+        cache_dir (str): The directory of the result cache.
+        cache_max_size (int): The maximum size of the result cache in MiB.
+        no_cache (bool): Whether to disable the result cache.
+        clear_cache (bool): Whether to clear the result cache before the analysis.
+        show_stats (bool): Whether to print run statistics to stderr.
+        stats_format (str): The format of the run statistics, "text" or "json".
+        slowest (int): The number of slowest files listed in the run statistics.
+        profile_path (Optional[str]): The file the cProfile profile of the run is written to, if any.
+        output_format (str): The output format of the violations, a key of REPORTERS.
     """
-    # TODO: Option to exclude files
-    python_files = process_paths(paths)
+    profiler = None
+    if profile_path is not None:
+        import cProfile
+
+        # Worker processes are not profiled, so the whole analysis runs in the profiled process
+        jobs = 1
+        profiler = cProfile.Profile()
+        profiler.enable()
+    stats = Stats(slowest=slowest if show_stats else 0)
+    start = time.perf_counter_ns()
+
+    changed = None
+    if diff_against is not None or staged:
+        from docraise.git import GitError, changed_lines
+
+        try:
+            changed = changed_lines(diff_against, staged)
+        except GitError as e:
+            raise click.ClickException(f"git: {e}")
+
+    def discover(roots: Iterable[str]) -> Iterator[Path]:
+        files = iter_python_files(
+            roots,
+            parse_patterns(exclude) if exclude is not None else DEFAULT_EXCLUDE,
+            parse_patterns(extend_exclude),
+            not no_gitignore,
+        )
+        return stats.timed(files, "discovery_ns")
+
+    roots = (paths or (".",)) if changed is not None else paths
+    # Files are discovered lazily, while the first ones are already being analyzed
+    python_files: Iterable[Path] = discover(roots)
+    if changed is not None:
+        python_files = [path for path in python_files if path in changed]
+
+    # Nothing is analyzed (nor imported for the analysis) until the first file is found
+    files = iter(python_files)
+    first = next(files, None)
+    results: Iterable[Tuple[Path, List[Violation]]] = ()
+    cache = None
+    if first is not None:
+        from docraise.cache import ResultCache
+        from docraise.limits import RunLimits
+        from docraise.runner import (
+            AnalysisOptions,
+            cross_module_inputs,
+            iter_results,
+            iter_summaries,
+        )
+
+        python_files = chain([first], files)
+        options = AnalysisOptions(
+            docstring_style=docstring_style, lazy_parse=lazy_parse
+        )
+        limits = RunLimits(
+            file_timeout=file_timeout or None,
+            max_files_per_worker=max_files_per_worker or None,
+            max_worker_memory=max_worker_memory or None,
+        )
+
+        cache = ResultCache(
+            cache_dir, max_size=cache_max_size * 1024 * 1024, options=asdict(options)
+        )
+        if clear_cache:
+            cache.clear()
+
+        propagated = None
+        hierarchies = None
+        if propagate or allow_subclass_docs:
+            # Every module is summarized, even unchanged ones, since they may be called from changed
+            # ones or define the base classes of their exceptions, so all files are needed up front
+            python_files = list(python_files)
+            all_files = list(discover(roots)) if changed is not None else python_files
+            with stats.timer("summaries_ns"):
+                summaries = dict(
+                    iter_summaries(
+                        all_files,
+                        jobs=jobs,
+                        cache=None if no_cache else cache,
+                        stats=stats,
+                        limits=limits,
+                    )
+                )
+                propagated, hierarchies = cross_module_inputs(
+                    summaries, python_files, propagate, allow_subclass_docs
+                )
 
-    python_trees = []
-    for filename in python_files:
-        with open(filename, "r") as source:
-            python_trees.append(ast.parse(source.read()))
+        results = iter_results(
+            python_files,
+            jobs=jobs,
+            options=options,
+            cache=None if no_cache else cache,
+            stats=stats,
+            changed_lines=changed,
+            propagated=propagated,
+            hierarchies=hierarchies,
+            limits=limits,
+        )
 
-    results = []
-    for filename, tree in zip(python_files, python_trees):
-        # TODO: Cover failed Python parsing
-        analyzer = Analyzer()
+    found = False
+    # Files that cannot be checked are reported as DR9xx violations, so they fail the run too.
+    # Results arrive in discovery order even with worker processes, so the output is deterministic
+    with REPORTERS[output_format](sys.stdout) as reporter:
+        for _, violations in results:
+            reporter.report(violations)
+            found = found or bool(violations)
 
-        violations = analyzer.validate(tree, str(filename))
+    if cache is not None and not no_cache:
+        cache.prune()
 
-        results.extend(violations)
+    stats.update({"run_ns": time.perf_counter_ns() - start})
+    if profiler is not None:
+        assert profile_path is not None
+        profiler.disable()
+        profiler.dump_stats(profile_path)
 
-    for violation in results:
-        print(violation)
+    if show_stats and stats_format == "json":
+        click.echo(json.dumps(stats.to_json(), indent=2), err=True)
+    elif show_stats:
+        click.echo(stats.format(), err=True)
 
-    if results:
+    if found:
         sys.exit(1)  # TODO: ctx.exit
 
     sys.exit(0)
 
 
+@main.command()
+@click.argument("paths", nargs=-1)
+@click.option(
+    "--config",
+    type=click.Path(exists=True, dir_okay=False),
+    callback=_load_config,
+    is_eager=True,
+    expose_value=False,
+    help="Configuration file with a [docraise] section. Defaults to setup.cfg or tox.ini.",
+)
+@click.option(
+    "--socket",
+    "socket_path",
+    type=click.Path(dir_okay=False),
+    default=DEFAULT_SOCKET,
+    show_default=True,
+    help="Path of the Unix socket to listen on.",
+)
+@click.option(
+    "--poll-interval",
+    type=click.FloatRange(min=0),
+    default=DEFAULT_POLL_INTERVAL,
+    show_default=True,
+    help="Seconds between two checks of the watched files for changes; 0 to only check on request.",
+)
+@click.option(
+    "--docstring-style",
+    type=click.Choice(STYLE_NAMES),
+    default="auto",
+    show_default=True,
+    help="Style of the docstrings.",
+)
+@click.option(
+    "--propagate",
+    is_flag=True,
+    help="Also count the exceptions that escape from the functions called by each function.",
+)
+@click.option(
+    "--allow-subclass-docs",
+    is_flag=True,
+    help="Accept a documented base class for a raised subclass.",
+)
+@click.option(
+    "--exclude",
+    metavar="PATTERNS",
+    help="Comma-separated globs of the files and directories to skip, replacing the defaults.",
+)
+@click.option(
+    "--extend-exclude",
+    metavar="PATTERNS",
+    help="Comma-separated globs of the files and directories to skip, on top of --exclude.",
+)
+@click.option(
+    "--no-gitignore",
+    is_flag=True,
+    help="Also watch the files ignored by .gitignore files.",
+)
+def daemon(
+    paths: Tuple[str],
+    socket_path: str,
+    poll_interval: float,
+    docstring_style: str,
+    propagate: bool,
+    allow_subclass_docs: bool,
+    exclude: Optional[str],
+    extend_exclude: Optional[str],
+    no_gitignore: bool,
+) -> None:
+    """Keep the results of the files under PATHS in memory and serve them to clients.
+
+    \f
+    Args:
+        paths (Tuple[str]): The files and directories to watch, defaults to the current directory.
+        socket_path (str): The path of the Unix socket.
+        poll_interval (float): The polling interval in seconds.
+        docstring_style (str): The style of the docstrings.
+        propagate (bool): Whether to propagate exceptions from the called functions.
+        allow_subclass_docs (bool): Whether documented base classes also document their subclasses.
+        exclude (Optional[str]): The comma-separated exclude patterns replacing the default ones.
+        extend_exclude (Optional[str]): The comma-separated additional exclude patterns.
+        no_gitignore (bool): Whether to ignore the .gitignore files.
+    """
+    from docraise.daemon import Daemon, DaemonError
+    from docraise.runner import AnalysisOptions
+
+    discover = functools.partial(
+        process_paths,
+        exclude=parse_patterns(exclude) if exclude is not None else DEFAULT_EXCLUDE,
+        extend_exclude=parse_patterns(extend_exclude),
+        gitignore=not no_gitignore,
+    )
+    server = Daemon(
+        paths or (".",),
+        discover=discover,
+        options=AnalysisOptions(docstring_style=docstring_style),
+        propagate=propagate,
+        allow_subclass_docs=allow_subclass_docs,
+    )
+    try:
+        server.serve(socket_path, poll_interval)
+    except DaemonError as e:
+        raise click.ClickException(f"daemon: {e}")
+
+
+@main.command()
+@click.argument("paths", nargs=-1)
+@click.option(
+    "--socket",
+    "socket_path",
+    type=click.Path(dir_okay=False),
+    default=DEFAULT_SOCKET,
+    show_default=True,
+    help="Path of the Unix socket of the daemon.",
+)
+@click.option(
+    "--timeout",
+    type=click.FloatRange(min=0),
+    default=DEFAULT_TIMEOUT,
+    show_default=True,
+    help="Seconds to wait for the daemon.",
+)
+@click.option("--shutdown", is_flag=True, help="Stop the daemon.")
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(list(REPORTERS)),
+    default="text",
+    show_default=True,
+    help="Output format of the violations.",
+)
+def client(
+    paths: Tuple[str],
+    socket_path: str,
+    timeout: float,
+    shutdown: bool,
+    output_format: str,
+) -> None:
+    """Check PATHS with a running daemon, by default every watched file.
+
+    \f
+    Args:
+        paths (Tuple[str]): The files and directories to check.
+        socket_path (str): The path of the Unix socket of the daemon.
+        timeout (float): The timeout in seconds.
+        shutdown (bool): Whether to stop the daemon instead.
+        output_format (str): The output format of the violations, a key of REPORTERS.
+    """
+    from docraise.daemon import DaemonError, request
+
+    message: Dict[str, Any] = {"command": "shutdown"}
+    if not shutdown:
+        message = {"command": "check", "paths": [str(Path(p).resolve()) for p in paths]}
+    try:
+        response = request(socket_path, message, timeout)
+    except DaemonError as e:
+        raise click.ClickException(f"client: {e}")
+
+    for path, error in response.get("errors", {}).items():
+        click.echo(f"{path}: {error}", err=True)
+    with REPORTERS[output_format](sys.stdout) as reporter:
+        reporter.report(
+            [Violation(*record) for record in response.get("violations", ())]
+        )
+
+    if response.get("violations") or response.get("errors"):
+        sys.exit(1)
+    sys.exit(0)
+
+
+@main.command()
+@click.option(
+    "--config",
+    type=click.Path(exists=True, dir_okay=False),
+    callback=_load_config,
+    is_eager=True,
+    expose_value=False,
+    help="Configuration file with a [docraise] section. Defaults to setup.cfg or tox.ini.",
+)
+@click.option(
+    "--docstring-style",
+    type=click.Choice(STYLE_NAMES),
+    default="auto",
+    show_default=True,
+    help="Style of the docstrings.",
+)
+@click.option(
+    "--debounce",
+    type=click.FloatRange(min=0),
+    default=DEFAULT_DEBOUNCE,
+    show_default=True,
+    help="Seconds without changes before a changed document is analyzed.",
+)
+def lsp(docstring_style: str, debounce: float) -> None:
+    """Run a Language Server Protocol server on stdin and stdout.
+
+    \f
+    Args:
+        docstring_style (str): The style of the docstrings.
+        debounce (float): The debounce delay in seconds.
+    """
+    from docraise.lsp import LanguageServer
+    from docraise.runner import AnalysisOptions
+
+    server = LanguageServer(AnalysisOptions(docstring_style=docstring_style), debounce)
+    sys.exit(server.serve(sys.stdin.buffer, sys.stdout.buffer))
+
+
 if __name__ == "__main__":
     main()
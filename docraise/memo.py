@@ -0,0 +1,128 @@
+"""
+This module contains the FunctionCache class, which memoizes the violations of whole functions.
+
+Copy-pasted functions are common in large code bases. The violations of a function only
+depend on its source, on the symbol table of its module (the names its exceptions resolve
+to) and on the docstring style (or the state of its detection), so they are memoized under
+a digest of the three and a repeated function is neither traversed nor has its docstring
+looked up again. The key does not depend on the line of the function, so the same function
+at another line or in another module shares the entry; its violations are stored relative
+to the def line, together with the ones of the nested functions.
+
+Example:
+    To use this module, look a function up before checking it and store its violations after.
+
+        from docraise.memo import FunctionCache, function_key
+
+        cache = FunctionCache()
+        key = function_key(source.splitlines(keepends=True), node, symbols.fingerprint())
+        memoized = cache.get(key)
+"""
+
+import hashlib
+from typing import Dict, NamedTuple, Optional, Sequence, Tuple
+
+from docstring_parser import DocstringStyle
+
+from docraise.symbols import FunctionNode
+
+DEFAULT_CACHE_SIZE = 16384
+
+
+class MemoizedFunction(NamedTuple):
+    """The violations of a function and of the functions nested in it."""
+
+    # (line offset from the def line, code, exception name)
+    violations: Tuple[Tuple[int, str, str], ...]
+    # The number of checked functions: the function itself and the nested ones
+    functions: int
+    # The number of raise statements in the function and the nested ones
+    raises: int
+    # The styles of the parsed docstrings, to replay the docstring style detection
+    styles: Tuple[DocstringStyle, ...]
+
+
+def function_key(
+    lines: Sequence[bytes], node: FunctionNode, context: bytes
+) -> Optional[bytes]:
+    """
+    Compute the memoization key of a function from its source, wherever it is in its module.
+
+    Args:
+        lines (Sequence[bytes]): The lines of the module with their line endings, as split by bytes.splitlines.
+        node (FunctionNode): The (async) function definition node in the AST.
+        context (bytes): Everything else the violations depend on, e.g. the symbol table fingerprint.
+
+    Returns:
+        Optional[bytes]: The key, or None if the lines do not match the node.
+    """
+    first = node.lineno - 1
+    end = node.end_lineno
+    if end is None or end > len(lines):
+        return None
+    indent = lines[first][: node.col_offset]
+    if indent.strip() or not lines[first].startswith(
+        (b"def", b"async"), node.col_offset
+    ):
+        return None
+
+    digest = hashlib.blake2b(context, digest_size=16)
+    digest.update(b"".join(lines[first:end]))
+    return digest.digest()
+
+
+class FunctionCache:
+    """
+    Bounded LRU cache of the violations of functions.
+
+    Attributes:
+        maxsize: The maximum number of memoized functions.
+        hits: The number of functions found in the cache.
+        misses: The number of functions that had to be checked.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE):
+        """Initialize an empty cache."""
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+        # Dictionaries keep insertion order, so the first key is the least recently used one
+        self._entries: Dict[bytes, MemoizedFunction] = {}
+
+    def get(self, key: bytes) -> Optional[MemoizedFunction]:
+        """
+        Look a function up.
+
+        Args:
+            key (bytes): The key returned by function_key.
+
+        Returns:
+            Optional[MemoizedFunction]: The memoized violations, or None if the function must be checked.
+        """
+        memoized = self._entries.pop(key, None)
+        if memoized is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries[key] = memoized
+        return memoized
+
+    def put(self, key: bytes, memoized: MemoizedFunction) -> None:
+        """
+        Memoize the violations of a function.
+
+        Args:
+            key (bytes): The key returned by function_key.
+            memoized (MemoizedFunction): The violations of the function.
+        """
+        entries = self._entries
+        if self.maxsize <= 0:
+            return
+        if key not in entries and len(entries) >= self.maxsize:
+            del entries[next(iter(entries))]
+        entries[key] = memoized
+
+
+# Shared by all analyzers of a process, so functions repeated across files are checked once per process
+shared_cache = FunctionCache()
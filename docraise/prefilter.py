@@ -0,0 +1,130 @@
+"""
+This module contains the lexical prefilter that decides whether a file needs to be parsed at all.
+
+A file can only produce a DR001 violation if it contains a raise statement, and a DR002
+violation if one of its docstrings has a raises section. docstring_parser matches section
+titles and field names case-sensitively, so such a docstring contains "Rais", "Except",
+"Warn" (Google and Numpydoc section titles), ":raise", ":except" (ReST fields) or "@raise"
+(Epydoc). All of them are looked for in the raw bytes of the file, without decoding it, by
+a single regular expression. Files without a match are neither parsed nor analyzed. Large
+files are searched through mmap, so they are not read into memory when they are skipped.
+
+The search is conservative: it is only trusted for source encodings in which the markers
+are plain ASCII bytes (UTF-8 and the PEP 263 encodings that extend ASCII), and a file with
+an escape sequence that could spell a marker inside a docstring (e.g. "R\\x61ises") is
+always parsed. The only blind spot is a marker split over implicitly concatenated literals.
+
+Example:
+    To use this module, read a file and check it before parsing it.
+
+        from docraise.prefilter import parse_source, read_source
+
+        content, size = read_source(path)
+        if content is not None:
+            tree = parse_source(content, str(path))
+"""
+
+import ast
+import codecs
+import io
+import mmap
+import os
+import re
+import tokenize
+from pathlib import Path
+from typing import Optional, Tuple, Union, cast
+
+# The raise keyword and the raises sections of every docstring style
+MARKER = re.compile(rb"raise|Rais|Except|Warn|:[ \t]*except|@[ \t]*raise")
+# Every character of MARKER and ESCAPE, to check that an encoding writes them as in ASCII
+MARKERS_TEXT = "raise Rais Except Warn except :@\\xuUN01234567"
+# Escape sequences that can produce letters in a string literal
+ESCAPE = re.compile(rb"\\[xuUN0-7]")
+# The same patterns, for sources that are already decoded
+TEXT_MARKER = re.compile(MARKER.pattern.decode())
+TEXT_ESCAPE = re.compile(ESCAPE.pattern.decode())
+# PEP 263 encoding declaration, only looked at in the first two lines
+CODING = re.compile(rb"^[ \t\f]*#.*?coding[:=]", re.MULTILINE)
+
+# Files from this size on are searched through mmap instead of being read
+MMAP_THRESHOLD = 1024 * 1024
+
+Buffer = Union[bytes, mmap.mmap]
+
+
+def _ascii_compatible(head: bytes) -> bool:
+    """
+    Check whether the markers are plain ASCII bytes in the declared encoding of a file.
+
+    Args:
+        head (bytes): The first two lines of the file.
+
+    Returns:
+        bool: True for the default UTF-8 and every encoding that extends ASCII.
+    """
+    if CODING.search(head) is None:
+        return True
+    try:
+        encoding, _ = tokenize.detect_encoding(io.BytesIO(head).readline)
+        return MARKERS_TEXT.encode(codecs.lookup(encoding).name) == MARKERS_TEXT.encode(
+            "ascii"
+        )
+    except (LookupError, SyntaxError, UnicodeError):
+        # Let the parser report the invalid declaration
+        return True
+
+
+def may_have_violations(content: Union[str, Buffer]) -> bool:
+    """
+    Check whether a file may produce a DR001 or DR002 violation.
+
+    Args:
+        content (Union[str, Buffer]): The raw content of the file, or its decoded text.
+
+    Returns:
+        bool: False only if the file provably has neither a raise statement nor a raises section.
+    """
+    if isinstance(content, str):
+        return (
+            TEXT_MARKER.search(content) is not None
+            or TEXT_ESCAPE.search(content) is not None
+        )
+    if MARKER.search(content) is not None or ESCAPE.search(content) is not None:
+        return True
+    second_newline = content.find(b"\n", content.find(b"\n") + 1)
+    head = bytes(content[: second_newline if second_newline != -1 else len(content)])
+    return not _ascii_compatible(head)
+
+
+def read_source(path: Union[str, Path]) -> Tuple[Optional[bytes], int]:
+    """
+    Read a file unless the prefilter proves that it cannot produce violations.
+
+    Args:
+        path (Union[str, Path]): The path to the Python file.
+
+    Returns:
+        Tuple[Optional[bytes], int]: The content of the file, or None if it can be skipped, and its size.
+    """
+    with open(path, "rb") as source:
+        size = os.fstat(source.fileno()).st_size
+        if size < MMAP_THRESHOLD:
+            content = source.read()
+            return (content if may_have_violations(content) else None), len(content)
+        with mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return (mapped[:] if may_have_violations(mapped) else None), size
+
+
+def parse_source(content: Union[str, bytes], filename: str) -> ast.Module:
+    """
+    Parse the raw content of a file, decoding it as declared by its PEP 263 encoding cookie.
+
+    Args:
+        content (Union[str, bytes]): The raw content of the file, or its decoded text.
+        filename (str): The filename used in syntax errors.
+
+    Returns:
+        ast.Module: The syntax tree of the file.
+    """
+    tree = compile(content, filename, "exec", ast.PyCF_ONLY_AST, dont_inherit=True)
+    return cast(ast.Module, tree)
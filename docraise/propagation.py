@@ -0,0 +1,448 @@
+"""
+This module implements the interprocedural exception propagation used by --propagate.
+
+The propagation runs in three steps:
+1. summarize_module computes a ModuleSummary for every analyzed file: for each function
+   the exceptions it raises itself (exactly as the Analyzer sees them), the calls it makes
+   together with the exceptions caught around each call, and the imports of the module.
+   The summary also holds the bases of every class of the module, which are used to build
+   the project-wide exception hierarchy (see docraise.hierarchy). A summary only depends
+   on the content of the file, so it is stored in the result cache.
+2. propagate resolves the calls to the functions of the analyzed modules, which builds a
+   project-wide call graph.
+3. The exception set of every function is the union of its own exceptions and the
+   exceptions of its callees that are not caught at the call site. Recursion is handled by
+   computing the strongly connected components of the call graph (Tarjan's algorithm) and
+   iterating each component to a fixpoint, callees before callers, so the whole step is
+   linear in the size of the call graph for non-recursive code.
+
+Calls are resolved by name only: calls of module-level functions, of methods through self,
+cls or the class name, and of functions of imported modules. Calls that cannot be resolved,
+e.g. methods of arbitrary objects, do not propagate anything. Nested functions are summarized
+like the others, under a name such as "load.<locals>.read" that no call resolves to, so they
+get the exceptions of their own callees but pass nothing on to their callers.
+
+Example:
+    To use this module, summarize every module and propagate the exceptions.
+
+        from docraise.propagation import propagate, summarize_module
+
+        summaries = {path: summarize_module(ast.parse(path.read_bytes())) for path in paths}
+        propagated = propagate(summaries)
+        violations = Analyzer().validate(tree, str(path), propagated=propagated.get(path))
+"""
+
+import ast
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    FrozenSet,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Type,
+)
+
+from docraise.analyzer import Analyzer, FunctionNode
+from docraise.symbols import (
+    SymbolTable,
+    absolute_target,
+    dotted_name,
+    iter_statements,
+    module_name,
+)
+
+if TYPE_CHECKING:
+    from docraise.hierarchy import ExceptionHierarchy
+
+# Caught names of a handler that catches everything: a bare except, Exception or BaseException
+CATCH_ALL = "*"
+_CATCH_ALL_NAMES = {"Exception", "BaseException"}
+# try statements, with except* since Python 3.11
+_TRY_TYPES: Tuple[Type[ast.Try], Type[ast.Try]] = (
+    ast.Try,
+    getattr(ast, "TryStar", ast.Try),
+)
+
+# Exceptions propagated from callees, by the line number of the calling function
+PropagatedExceptions = Dict[int, Tuple[str, ...]]
+
+
+class CallSite(NamedTuple):
+    """A call made by a function."""
+
+    # Dotted spelling of the called expression, e.g. "load", "self.load" or "util.load"
+    callee: str
+    # Names of the exceptions caught around the call, CATCH_ALL if everything is caught
+    caught: Tuple[str, ...]
+
+
+class FunctionSummary(NamedTuple):
+    """The exceptions raised by a function and the calls it makes."""
+
+    # Qualified name within the module, e.g. "load" or "Loader.load"
+    name: str
+    lineno: int
+    raises: Tuple[str, ...]
+    calls: Tuple[CallSite, ...]
+
+
+class ModuleSummary(NamedTuple):
+    """The summaries of the functions of a module, the names it imports and its classes."""
+
+    functions: Tuple[FunctionSummary, ...]
+    # Local name -> dotted target, relative imports keep their leading dots (e.g. "..util.load")
+    imports: Dict[str, str]
+    # Class name -> names of its bases (last attribute of dotted names)
+    classes: Dict[str, List[str]]
+
+    def to_json(self) -> Any:
+        """
+        Convert the summary to a JSON-serializable value, e.g. for the result cache.
+
+        Returns:
+            Any: The JSON-serializable summary.
+        """
+        return [
+            [[f.name, f.lineno, f.raises, f.calls] for f in self.functions],
+            self.imports,
+            self.classes,
+        ]
+
+    @classmethod
+    def from_json(cls, value: Any) -> "ModuleSummary":
+        """
+        Create a summary from the value returned by to_json.
+
+        Args:
+            value (Any): The JSON value.
+
+        Returns:
+            ModuleSummary: The summary.
+        """
+        functions, imports, classes = value
+        return cls(
+            tuple(
+                FunctionSummary(
+                    name,
+                    lineno,
+                    tuple(raises),
+                    tuple(CallSite(callee, tuple(caught)) for callee, caught in calls),
+                )
+                for name, lineno, raises, calls in functions
+            ),
+            imports,
+            classes,
+        )
+
+
+def _caught_names(
+    handlers: List[ast.ExceptHandler], symbols: SymbolTable
+) -> Tuple[str, ...]:
+    """
+    Return the names of the exceptions caught by the handlers of a try statement.
+
+    Args:
+        handlers (List[ExceptHandler]): The exception handlers.
+        symbols (SymbolTable): The symbol table of the module.
+
+    Returns:
+        Tuple[str, ...]: The qualified caught names, or (CATCH_ALL,).
+    """
+    caught = []
+    for handler in handlers:
+        types: List[Optional[ast.expr]] = (
+            list(handler.type.elts)
+            if isinstance(handler.type, ast.Tuple)
+            else [handler.type]
+        )
+        for exc_type in types:
+            name = symbols.resolve_node(exc_type) if exc_type is not None else None
+            if exc_type is None or (name is not None and name in _CATCH_ALL_NAMES):
+                return (CATCH_ALL,)
+            if name is not None:
+                caught.append(name)
+    return tuple(caught)
+
+
+def _collect_calls(
+    function: FunctionNode, symbols: SymbolTable
+) -> Tuple[CallSite, ...]:
+    """
+    Collect the calls made in the body of a function, without nested functions and classes.
+
+    Args:
+        function (FunctionNode): The (async) function definition node in the AST.
+        symbols (SymbolTable): The symbol table of the module.
+
+    Returns:
+        Tuple[CallSite, ...]: The call sites in source order.
+    """
+    calls = []
+    stack: List[Tuple[ast.AST, Tuple[str, ...]]] = [
+        (statement, ()) for statement in reversed(function.body)
+    ]
+    while stack:
+        node, caught = stack.pop()
+
+        if isinstance(
+            node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda)
+        ):
+            continue  # Not executed when the function runs
+
+        if isinstance(node, _TRY_TYPES):
+            protected = caught + _caught_names(node.handlers, symbols)
+            children: List[Tuple[ast.AST, Tuple[str, ...]]] = [
+                (n, protected) for n in node.body
+            ]
+            children += [(n, caught) for n in node.handlers]
+            children += [(n, caught) for n in node.orelse + node.finalbody]
+            stack.extend(reversed(children))
+            continue
+
+        if isinstance(node, ast.Call):
+            callee = dotted_name(node.func)
+            if callee is not None:
+                calls.append(CallSite(callee, caught))
+
+        stack.extend(
+            (child, caught) for child in reversed(list(ast.iter_child_nodes(node)))
+        )
+
+    return tuple(calls)
+
+
+class _RaiseCollector(Analyzer):
+    """An Analyzer that records the exceptions raised by each function instead of checking docstrings."""
+
+    def __init__(self):
+        """Initialize the collector with an empty scope stack."""
+        super().__init__()
+        self.functions: List[FunctionSummary] = []
+        # The qualified name of the current scope, e.g. ["Loader", "load", "<locals>"]
+        self.scopes: List[str] = []
+
+        self._enter[ast.ClassDef] = self._enter_ClassDef
+        self._leave[ast.ClassDef] = self._leave_ClassDef
+
+    def _enter_ClassDef(self, node: ast.ClassDef) -> bool:
+        self.scopes.append(node.name)
+        return True
+
+    def _leave_ClassDef(self, node: ast.ClassDef) -> None:
+        self.scopes.pop()
+
+    def _enter_FunctionDef(self, node: FunctionNode) -> bool:
+        # Every function gets a frame of its own, as in the Analyzer. The <locals> part keeps the
+        # names of nested functions apart from the ones that can be called from other modules.
+        self._push_frame(node)
+        self.scopes += [node.name, "<locals>"]
+        return True
+
+    def _leave_FunctionDef(self, node: FunctionNode) -> None:
+        exceptions = self._pop_frame()
+        del self.scopes[-2:]
+        self.functions.append(
+            FunctionSummary(
+                name=".".join(self.scopes + [node.name]),
+                lineno=node.lineno,
+                raises=tuple(e for e in exceptions if e is not None),
+                calls=_collect_calls(node, self._symbols),
+            )
+        )
+
+
+def _collect_classes(tree: ast.AST) -> Dict[str, List[str]]:
+    classes: Dict[str, List[str]] = {}
+    for node in iter_statements(tree):
+        if isinstance(node, ast.ClassDef):
+            bases = classes.setdefault(node.name, [])
+            for base in node.bases:
+                name = dotted_name(base)
+                if name is not None:
+                    bases.append(name.rpartition(".")[2])
+    return classes
+
+
+def summarize_module(
+    tree: ast.AST, module: Optional[str] = None, is_package: bool = False
+) -> ModuleSummary:
+    """
+    Summarize the functions of a module for the exception propagation.
+
+    Args:
+        tree (AST): The module.
+        module (Optional[str]): The name of the module, used to qualify the exception names.
+        is_package (bool): Whether the module is a package (__init__.py).
+
+    Returns:
+        ModuleSummary: The summary of the module.
+    """
+    symbols = SymbolTable.from_tree(tree, module, is_package)
+    collector = _RaiseCollector()
+    collector.validate(tree, symbols=symbols)
+    return ModuleSummary(
+        tuple(collector.functions), symbols.imports, _collect_classes(tree)
+    )
+
+
+def _strongly_connected_components(graph: List[List[int]]) -> List[List[int]]:
+    """
+    Compute the strongly connected components of a graph with Tarjan's algorithm, iteratively.
+
+    Args:
+        graph (List[List[int]]): The successors of each node.
+
+    Returns:
+        List[List[int]]: The components in reverse topological order (successors first).
+    """
+    index = [-1] * len(graph)
+    low = [0] * len(graph)
+    on_stack = [False] * len(graph)
+    stack: List[int] = []
+    components: List[List[int]] = []
+    counter = 0
+
+    for root in range(len(graph)):
+        if index[root] != -1:
+            continue
+        work = [(root, 0)]
+        while work:
+            node, edge = work[-1]
+            if edge == 0:
+                index[node] = low[node] = counter
+                counter += 1
+                stack.append(node)
+                on_stack[node] = True
+
+            successors = graph[node]
+            descended = False
+            while edge < len(successors):
+                successor = successors[edge]
+                edge += 1
+                if index[successor] == -1:
+                    work[-1] = (node, edge)
+                    work.append((successor, 0))
+                    descended = True
+                    break
+                if on_stack[successor]:
+                    low[node] = min(low[node], index[successor])
+            if descended:
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+
+            if low[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component)
+
+    return components
+
+
+def propagate(
+    summaries: Mapping[Path, ModuleSummary],
+    hierarchy: Optional["ExceptionHierarchy"] = None,
+) -> Dict[Path, PropagatedExceptions]:
+    """
+    Compute the exceptions that escape from the callees of every function.
+
+    Args:
+        summaries (Mapping[Path, ModuleSummary]): The summary of every analyzed module by path.
+        hierarchy (Optional[ExceptionHierarchy]): If given, a handler also catches the subclasses
+            of the exceptions it names; otherwise it only catches the exact names.
+
+    Returns:
+        Dict[Path, PropagatedExceptions]: For each module, the exceptions of each function that come
+            from its callees and are not raised by the function itself, by the line number of the function.
+    """
+    # Number every function and index them by module and qualified name
+    functions: List[Tuple[Path, FunctionSummary]] = []
+    by_module: Dict[str, Dict[str, int]] = {}
+    modules: Dict[Path, Tuple[str, bool]] = {}
+    for path, summary in summaries.items():
+        name, is_package = modules[path] = module_name(path)
+        local = by_module.setdefault(name, {})
+        for function in summary.functions:
+            local[function.name] = len(functions)
+            functions.append((path, function))
+
+    def lookup(target: str) -> Optional[int]:
+        # Try every split of the target into a module and a qualified function name
+        parts = target.split(".")
+        for split in range(len(parts) - 1, 0, -1):
+            local = by_module.get(".".join(parts[:split]))
+            if local is not None:
+                found = local.get(".".join(parts[split:]))
+                if found is not None:
+                    return found
+        return None
+
+    # Resolve the call sites into the edges of the call graph
+    graph: List[List[int]] = []
+    edges: List[List[Tuple[int, Tuple[str, ...]]]] = []
+    for path, function in functions:
+        name, is_package = modules[path]
+        local = by_module[name]
+        imports = summaries[path].imports
+        owner = function.name.rpartition(".")[0]
+
+        resolved = []
+        for callee, caught in function.calls:
+            if CATCH_ALL in caught:
+                continue
+            head, _, rest = callee.partition(".")
+            target: Optional[int] = None
+            if head in ("self", "cls") and owner:
+                target = local.get(f"{owner}.{rest}")
+            elif callee in local:
+                target = local[callee]
+            elif head in imports:
+                absolute = absolute_target(imports[head], name, is_package)
+                target = lookup(f"{absolute}.{rest}" if rest else absolute)
+            if target is not None:
+                resolved.append((target, caught))
+
+        edges.append(resolved)
+        graph.append([target for target, _ in resolved])
+
+    def is_caught(name: str, caught: Tuple[str, ...]) -> bool:
+        if hierarchy is None:
+            return name in caught
+        return any(hierarchy.is_subclass(name, base) for base in caught)
+
+    # Callees are solved before their callers; recursive components are iterated to a fixpoint
+    exceptions: List[FrozenSet[str]] = [frozenset(f.raises) for _, f in functions]
+    for component in _strongly_connected_components(graph):
+        recursive = len(component) > 1 or component[0] in graph[component[0]]
+        changed = True
+        while changed:
+            changed = False
+            for node in component:
+                escaping = set(exceptions[node])
+                for successor, caught in edges[node]:
+                    escaping.update(
+                        e for e in exceptions[successor] if not is_caught(e, caught)
+                    )
+                if len(escaping) != len(exceptions[node]):
+                    exceptions[node] = frozenset(escaping)
+                    changed = recursive
+
+    propagated: Dict[Path, PropagatedExceptions] = {}
+    for (path, function), raised in zip(functions, exceptions):
+        extra = raised.difference(function.raises)
+        if extra:
+            propagated.setdefault(path, {})[function.lineno] = tuple(sorted(extra))
+    return propagated
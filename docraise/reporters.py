@@ -0,0 +1,268 @@
+"""
+This module contains the reporters, which write the violations of a run in an output format.
+
+The formats are:
+1. text: one colored line per violation, for humans (the default).
+2. jsonl: one JSON object per violation and line, for scripts.
+3. sarif: a SARIF 2.1.0 log, for code scanning tools.
+4. github: one workflow command per violation, which GitHub Actions shows as annotations.
+
+A reporter receives the violations file by file and writes them as they come, so a run
+never holds all its violations in memory; the SARIF log is streamed between its header
+and its footer. The output is collected in a buffer and written in large chunks: on a
+terminal, which flushes every line it is written, the buffer is written once per file
+instead of once per line.
+
+Example:
+    To use this module, create the reporter of a format and report the violations of every file.
+
+        from docraise.reporters import REPORTERS
+
+        with REPORTERS["jsonl"](sys.stdout) as reporter:
+            for _, violations in iter_results(files):
+                reporter.report(violations)
+"""
+
+import json
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, TextIO, Type
+
+from docraise._version import __version__
+from docraise.violation import Violation, ViolationCodes
+
+# Characters of output collected before they are written to the stream
+DEFAULT_BUFFER_SIZE = 64 * 1024
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+INFORMATION_URI = "https://github.com/Laleee/docraise"
+
+
+class Reporter(ABC):
+    """
+    Base class of the reporters, which buffers their output.
+
+    A reporter is a context manager: entering it writes the header of the format, and
+    leaving it writes the footer and flushes the stream. If an exception is raised, the
+    violations reported so far are flushed without the footer.
+
+    Attributes:
+        stream: The text stream the output is written to.
+        buffer_size: The number of characters collected before they are written.
+    """
+
+    def __init__(self, stream: TextIO, buffer_size: Optional[int] = None):
+        """
+        Initialize the reporter.
+
+        Args:
+            stream (TextIO): The text stream the output is written to.
+            buffer_size (Optional[int]): The number of characters collected before they are
+                written. If None, the output is written once per file on a terminal and in
+                chunks of DEFAULT_BUFFER_SIZE otherwise.
+        """
+        if buffer_size is None:
+            buffer_size = 0 if stream.isatty() else DEFAULT_BUFFER_SIZE
+        self.stream = stream
+        self.buffer_size = buffer_size
+        self._buffer: List[str] = []
+        self._buffered = 0
+
+    def __enter__(self) -> "Reporter":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.finish()
+        else:
+            self.flush()
+
+    def start(self) -> None:
+        """Write the header of the output, if the format has one."""
+
+    def report(self, violations: Sequence[Violation]) -> None:
+        """
+        Report the violations of a file.
+
+        Args:
+            violations (Sequence[Violation]): The violations, usually all from the same file.
+        """
+        if not violations:
+            return
+        chunk = "".join([self.format(violation) for violation in violations])
+        self._buffer.append(chunk)
+        self._buffered += len(chunk)
+        if self._buffered >= self.buffer_size:
+            self.flush()
+
+    @abstractmethod
+    def format(self, violation: Violation) -> str:
+        """
+        Render a violation.
+
+        Args:
+            violation (Violation): The violation.
+
+        Returns:
+            str: The violation in the output format, with its trailing line ending.
+        """
+
+    def finish(self) -> None:
+        """Write the footer of the output, if the format has one, and flush the stream."""
+        self.flush()
+
+    def flush(self) -> None:
+        """Write the buffered output and flush the stream."""
+        if self._buffer:
+            self.stream.write("".join(self._buffer))
+            self._buffer.clear()
+            self._buffered = 0
+        self.stream.flush()
+
+    def _write(self, text: str) -> None:
+        self._buffer.append(text)
+        self._buffered += len(text)
+
+
+class TextReporter(Reporter):
+    """Reporter of one colored line per violation, e.g. 'module.py:3: DR001 Exception ...'."""
+
+    def format(self, violation: Violation) -> str:
+        return f"{violation}\n"
+
+
+def _json_messages() -> Dict[str, str]:
+    # The descriptions encoded as JSON strings once, with the encoded name formatted in
+    return {code.name: json.dumps(code.value) for code in ViolationCodes}
+
+
+class JsonLinesReporter(Reporter):
+    """
+    Reporter of one JSON object per line, with the keys filename, line, code, exception and message.
+    """
+
+    def __init__(self, stream: TextIO, buffer_size: Optional[int] = None):
+        super().__init__(stream, buffer_size)
+        # The violations of a file share their filename, so it is only encoded once per file
+        self._filename = ""
+        self._encoded = '""'
+        self._messages = _json_messages()
+
+    def format(self, violation: Violation) -> str:
+        if violation.filename is not self._filename:
+            self._filename = violation.filename
+            self._encoded = json.dumps(violation.filename)
+        name = json.dumps(violation.name)
+        message = self._messages[violation.code].format(name=name[1:-1])
+        return (
+            f'{{"filename": {self._encoded}, "line": {violation.lineno}, "code": "{violation.code}", '
+            f'"exception": {name}, "message": {message}}}\n'
+        )
+
+
+def _uri(filename: str, cwd: Path) -> str:
+    # The path relative to the working directory, or the absolute file URI of the files outside of it
+    path = Path(filename)
+    if not path.is_absolute():
+        return path.as_posix()
+    try:
+        return path.relative_to(cwd).as_posix()
+    except ValueError:
+        return path.as_uri()
+
+
+class SarifReporter(Reporter):
+    """
+    Reporter of a SARIF 2.1.0 log with a single run, whose results are streamed.
+
+    The paths of the files under the working directory are relative to it, which is what
+    code scanning tools expect; the other files have absolute file URIs.
+    """
+
+    def __init__(self, stream: TextIO, buffer_size: Optional[int] = None):
+        super().__init__(stream, buffer_size)
+        self._cwd = Path.cwd()
+        self._filename = ""
+        self._location = ""
+        self._messages = _json_messages()
+        self._rules = {code.name: index for index, code in enumerate(ViolationCodes)}
+        self._separator = ""
+
+    def start(self) -> None:
+        rules = [
+            {
+                "id": code.name,
+                "shortDescription": {"text": code.value.format(name="...")},
+                "defaultConfiguration": {"level": "error"},
+            }
+            for code in ViolationCodes
+        ]
+        driver = {
+            "name": "docraise",
+            "version": __version__,
+            "informationUri": INFORMATION_URI,
+            "rules": rules,
+        }
+        header = json.dumps({"$schema": SARIF_SCHEMA, "version": "2.1.0"})
+        # The results are written between the header and the footer
+        self._write(
+            f'{header[:-1]}, "runs": [{{"tool": {{"driver": {json.dumps(driver)}}}, "results": [\n'
+        )
+
+    def format(self, violation: Violation) -> str:
+        # The violations of a file share their filename, so its location is only encoded once per file
+        if violation.filename is not self._filename:
+            self._filename = violation.filename
+            uri = json.dumps(_uri(violation.filename, self._cwd))
+            self._location = f'{{"physicalLocation": {{"artifactLocation": {{"uri": {uri}}}, "region": {{"startLine": '
+        code = violation.code
+        message = self._messages[code].format(name=json.dumps(violation.name)[1:-1])
+        separator, self._separator = self._separator, ",\n"
+        # The result is formatted by hand: encoding a dictionary per violation is several times slower
+        return (
+            f'{separator}{{"ruleId": "{code}", "ruleIndex": {self._rules[code]}, "level": "error", '
+            f'"message": {{"text": {message}}}, "locations": [{self._location}{violation.lineno}}}}}}}]}}'
+        )
+
+    def finish(self) -> None:
+        self._write("\n]}]}\n")
+        super().finish()
+
+
+def _escape_data(text: str) -> str:
+    return text.replace("%", "%25").replace("\r", "%0D").replace("\n", "%0A")
+
+
+def _escape_property(text: str) -> str:
+    return _escape_data(text).replace(":", "%3A").replace(",", "%2C")
+
+
+class GithubReporter(Reporter):
+    """
+    Reporter of GitHub Actions workflow commands, e.g. '::error file=module.py,line=3,title=DR001::...'.
+
+    The paths of the files are relative to the working directory, which is the root of the
+    repository in a workflow, so that the annotations are shown on the changed lines.
+    """
+
+    def __init__(self, stream: TextIO, buffer_size: Optional[int] = None):
+        super().__init__(stream, buffer_size)
+        self._cwd = Path.cwd()
+        self._filename = ""
+        self._file = ""
+
+    def format(self, violation: Violation) -> str:
+        if violation.filename is not self._filename:
+            self._filename = violation.filename
+            self._file = _escape_property(_uri(violation.filename, self._cwd))
+        text = _escape_data(violation.text)
+        return f"::error file={self._file},line={violation.lineno},title={violation.code}::{text}\n"
+
+
+REPORTERS: Dict[str, Type[Reporter]] = {
+    "text": TextReporter,
+    "jsonl": JsonLinesReporter,
+    "sarif": SarifReporter,
+    "github": GithubReporter,
+}
@@ -0,0 +1,911 @@
+"""
+This module contains the pipeline that turns Python files into violations.
+
+Every file goes through the same steps: it is read, parsed into an AST and validated
+by an Analyzer, which each process reuses from file to file. The files can be processed
+one after another in the current process or spread across a pool of worker processes.
+Workers send back compact violation records instead of ASTs, and the results are always
+yielded in the same order as the input files, so the output of a parallel run is
+identical to the output of a serial run.
+
+The pipeline is streaming: paths are consumed lazily, only a bounded number of files
+is in flight at any time and each result is yielded as soon as it is available, so
+memory usage does not grow with the number of files.
+
+Every file is isolated from the others: a file that cannot be read or parsed, that makes
+the analyzer fail, that exceeds its time budget or that kills its worker process gets a
+DR9xx diagnostic instead of aborting the run, and the worker processes are replaced when
+they have analyzed too many files or use too much memory (see docraise.limits).
+
+Example:
+    To use this module, pass a list of Python files to iter_results.
+
+        from pathlib import Path
+        from docraise.runner import iter_results
+
+        for path, violations in iter_results([Path("file_to_analyze.py")], jobs=4):
+            for violation in violations:
+                print(violation)
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import signal
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from functools import partial
+from itertools import chain, islice
+from multiprocessing.queues import SimpleQueue
+from pathlib import Path
+from typing import (
+    Callable,
+    Deque,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Sized,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from docraise.analyzer import Analyzer
+from docraise.cache import ResultCache
+from docraise.defaults import default_jobs  # noqa: F401 (re-exported)
+from docraise.docstrings import STYLES
+from docraise.git import LineRange
+from docraise.hierarchy import ExceptionHierarchy
+from docraise.limits import FileTimeout, RunLimits, resident_memory, time_limit
+from docraise.prefilter import CODING, may_have_violations, parse_source, read_source
+from docraise.propagation import (
+    ModuleSummary,
+    PropagatedExceptions,
+    propagate,
+    summarize_module,
+)
+from docraise.slicing import LAZY_PARSE_MIN_SIZE, parse_lazily
+from docraise.stats import Stats
+from docraise.symbols import SymbolTable, collect_imports, module_name
+from docraise.violation import Violation, describe_failure
+
+# (lineno, code, exception name) - the filename is known to the parent process
+ViolationRecord = Tuple[int, str, str]
+# The violation records of a file together with its counters for the run statistics
+FileResult = Tuple[List[ViolationRecord], Dict[str, int]]
+
+# Module-level classes and relative imports, looked for anywhere in a file; with an encoding
+# declaration the content may not even be ASCII compatible
+_MODULE_DEPENDENT = re.compile(rb"\bclass\b|\bfrom[\s\\]*\.")
+
+# Files sent to a worker at once, large enough to amortize the IPC overhead
+CHUNK_SIZE = 8
+# Chunks in flight per worker, so workers never wait for the parent process
+CHUNKS_PER_WORKER = 4
+# Seconds a worker may take beyond the time budget of its files before it is considered stalled
+STALL_GRACE = 5.0
+# File contents whose violations are kept for later duplicates; older ones are analyzed again
+DEDUPLICATION_SIZE = 1024
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# The analyzers of each thread by their options, reused from file to file
+_analyzers = threading.local()
+
+
+@dataclass(frozen=True)
+class AnalysisOptions:
+    """
+    Options that influence the violations detected in a file.
+
+    All fields are part of the result cache key.
+
+    Attributes:
+        docstring_style: The docstring style name, one of the keys of docraise.docstrings.STYLES.
+        lazy_parse: Whether to only parse the functions of large modules that can have violations.
+    """
+
+    docstring_style: str = "auto"
+    lazy_parse: bool = False
+
+    def create_analyzer(self) -> Analyzer:
+        """
+        Create an Analyzer configured with these options.
+
+        Returns:
+            Analyzer: A new analyzer.
+        """
+        return Analyzer(docstring_style=STYLES[self.docstring_style])
+
+    def shared_analyzer(self) -> Analyzer:
+        """
+        Return the analyzer of the current thread for these options, creating it on first use.
+
+        The analyzer resets itself before every tree (see Analyzer.reset), so one analyzer
+        per thread validates every file instead of a new one per file.
+
+        Returns:
+            Analyzer: The analyzer of the current thread.
+        """
+        analyzers = getattr(_analyzers, "by_options", None)
+        if analyzers is None:
+            analyzers = _analyzers.by_options = {}
+        analyzer = analyzers.get(self)
+        if analyzer is None:
+            analyzer = analyzers[self] = self.create_analyzer()
+        return analyzer
+
+
+class FileTask(NamedTuple):
+    """A file to validate together with the per-file inputs of the analysis."""
+
+    path: Path
+    # If given, only the functions overlapping these lines are checked
+    changed_lines: Optional[Sequence[LineRange]] = None
+    # Exceptions propagated from the callees of each function (--propagate)
+    propagated: Optional[PropagatedExceptions] = None
+    # The ancestors of the exceptions raised in the file (--allow-subclass-docs)
+    hierarchy: Optional[ExceptionHierarchy] = None
+    # The content of the file, if the parent process already read it
+    content: Optional[bytes] = None
+
+
+def _to_violations(filename: str, records: List[ViolationRecord]) -> List[Violation]:
+    # Unpickled records hold their own copies of the strings, the violations share them
+    filename = sys.intern(filename)
+    intern = sys.intern
+    return [
+        Violation(filename, lineno, intern(code), intern(name))
+        for lineno, code, name in records
+    ]
+
+
+def _prefiltered(size: int) -> Dict[str, int]:
+    return {"files": 1, "files_prefiltered": 1, "bytes_prefiltered": size}
+
+
+def _diagnose(error: BaseException) -> FileResult:
+    """Turn the error that stopped the analysis of a file into a DR9xx diagnostic.
+
+    Args:
+        error (BaseException): The error raised by the analysis, or the error of the pool of
+            worker processes for a worker that died (BrokenProcessPool) or stalled (FileTimeout).
+
+    Returns:
+        FileResult: The diagnostic, as the only violation of the file, and its counters.
+    """
+    lineno = 1
+    if isinstance(error, FileTimeout):
+        code, counter, detail = "DR903", "files_timed_out", f"{error.args[0]:g}"
+    elif isinstance(error, BrokenProcessPool):
+        code, counter, detail = "DR904", "files_failed", str(error)
+    elif isinstance(error, SyntaxError):
+        code, counter, detail = "DR901", "files_failed", str(error.msg)
+        lineno = error.lineno or 1
+    elif isinstance(error, (OSError, ValueError)):
+        # ValueError covers null bytes and undecodable sources
+        code, counter, detail = "DR901", "files_failed", str(error)
+    else:
+        code, counter, detail = "DR902", "files_failed", describe_failure(error)
+    return [(lineno, code, detail)], {"files": 1, counter: 1}
+
+
+def _content_key(
+    content: bytes, path: Path
+) -> Tuple[bytes, Optional[Tuple[str, bool]]]:
+    # The violations depend on the module name through module-level classes and relative
+    # imports; the name is left out of the key only if the content has neither
+    digest = hashlib.blake2b(content, digest_size=16).digest()
+    if (
+        _MODULE_DEPENDENT.search(content) is None
+        and CODING.search(content, 0, 1024) is None
+    ):
+        return digest, None
+    return digest, module_name(path)
+
+
+def _analyze_task(
+    task: FileTask,
+    options: AnalysisOptions = AnalysisOptions(),
+    cache: Optional[ResultCache] = None,
+) -> FileResult:
+    """Validate a single Python file and return picklable violation records and counters.
+
+    This function also runs inside the worker processes. Files whose content is found
+    in the cache, and files that the lexical prefilter proves free of violations (see
+    docraise.prefilter), are neither parsed nor analyzed.
+
+    Args:
+        task (FileTask): The file to validate.
+        options (AnalysisOptions): The analysis options.
+        cache (Optional[ResultCache]): The result cache, if caching is enabled.
+
+    Returns:
+        FileResult: The violations detected in the file, without the filename, and its counters.
+    """
+    path, changed_lines, propagated, hierarchy, content = task
+    read_ns = 0
+    if content is None:
+        start = time.perf_counter_ns()
+        if propagated:
+            # The exceptions propagated from callees can be raised by a function without raise
+            with open(path, "rb") as source:
+                content = source.read()
+        else:
+            content, size = read_source(path)
+        read_ns = time.perf_counter_ns() - start
+        if content is None:
+            return [], dict(_prefiltered(size), read_ns=read_ns)
+
+    # Qualified exception names depend on where the module lives in its package
+    module, is_package = module_name(path)
+
+    key = None
+    if cache is not None:
+        # The per-file inputs change the result as much as the content does
+        kind = f"violations:{module}:{is_package}"
+        if changed_lines is not None:
+            kind += f":{changed_lines}"
+        if propagated:
+            kind += f":{sorted(propagated.items())}"
+        if hierarchy is not None:
+            kind += f":{json.dumps(hierarchy.to_json())}"
+        key = cache.key(content, kind)
+        cached = cache.get(key)
+        if cached is not None:
+            records = [(lineno, code, name) for lineno, code, name in cached]
+            return records, {"files": 1, "files_cached": 1, "read_ns": read_ns}
+
+    records, counters = _analyze_content(
+        content,
+        str(path),
+        options,
+        module,
+        is_package,
+        changed_lines,
+        propagated,
+        hierarchy,
+    )
+    counters["read_ns"] = read_ns
+
+    if cache is not None and key is not None:
+        cache.put(key, records)
+
+    return records, counters
+
+
+def _isolated_task(
+    task: FileTask,
+    options: AnalysisOptions = AnalysisOptions(),
+    cache: Optional[ResultCache] = None,
+    timeout: Optional[float] = None,
+) -> FileResult:
+    """Run _analyze_task under a time limit, turning any error into a DR9xx diagnostic.
+
+    This function also runs inside the worker processes. Diagnostics are not cached.
+
+    Args:
+        task (FileTask): The file to validate.
+        options (AnalysisOptions): The analysis options.
+        cache (Optional[ResultCache]): The result cache, if caching is enabled.
+        timeout (Optional[float]): The time budget of the file in seconds, None for no limit.
+
+    Returns:
+        FileResult: The violations detected in the file, or its diagnostic, and its counters.
+    """
+    try:
+        with time_limit(timeout):
+            return _analyze_task(task, options, cache)
+    except Exception as e:
+        return _diagnose(e)
+
+
+def _analyze_content(
+    content: Union[str, bytes],
+    filename: str,
+    options: AnalysisOptions,
+    module: Optional[str] = None,
+    is_package: bool = False,
+    changed_lines: Optional[Sequence[LineRange]] = None,
+    propagated: Optional[PropagatedExceptions] = None,
+    hierarchy: Optional[ExceptionHierarchy] = None,
+) -> FileResult:
+    """Parse and validate the content of a Python file.
+
+    Args:
+        content (Union[str, bytes]): The raw content of the file, or its decoded text.
+        filename (str): The name of the file, used in violations and syntax errors.
+        options (AnalysisOptions): The analysis options.
+        module (Optional[str]): The name of the module, used to qualify exception names.
+        is_package (bool): Whether the module is a package (__init__.py).
+        changed_lines (Optional[Sequence[LineRange]]): If given, only functions overlapping these lines are checked.
+        propagated (Optional[PropagatedExceptions]): Exceptions propagated from the callees of each function.
+        hierarchy (Optional[ExceptionHierarchy]): If given, base classes document their subclasses.
+
+    Returns:
+        FileResult: The violations detected in the file, without the filename, and its counters.
+    """
+    start = time.perf_counter_ns()
+    counters = {"files": 1}
+    sliced = None
+    # Propagated exceptions can be raised by functions that slicing leaves out
+    if options.lazy_parse and not propagated and len(content) >= LAZY_PARSE_MIN_SIZE:
+        sliced = parse_lazily(content, filename)
+        counters["files_sliced" if sliced is not None else "slicing_fallbacks"] = 1
+    if sliced is not None:
+        tree = sliced.tree
+        symbols = SymbolTable(collect_imports(tree), sliced.classes, module, is_package)
+        counters["lines_sliced_out"] = sliced.skipped_lines
+    else:
+        tree = parse_source(content, filename)
+        symbols = SymbolTable.from_tree(tree, module, is_package)
+    counters["parse_ns"] = time.perf_counter_ns() - start
+    analyzer = options.shared_analyzer()
+    source = content.encode() if isinstance(content, str) else content
+    violations = analyzer.validate(
+        tree, filename, changed_lines, propagated, hierarchy, symbols, source
+    )
+    records = [(v.lineno, v.code, v.name) for v in violations]
+    # The time of the parse and of the analyzer; the analysis speed estimates the time the prefilter saved
+    elapsed = time.perf_counter_ns() - start
+
+    return records, dict(
+        analyzer.counters, **counters, bytes_analyzed=len(content), analysis_ns=elapsed
+    )
+
+
+def analyze_file(
+    path: Path,
+    options: AnalysisOptions = AnalysisOptions(),
+    cache: Optional[ResultCache] = None,
+    stats: Optional[Stats] = None,
+    changed_lines: Optional[Sequence[LineRange]] = None,
+    propagated: Optional[PropagatedExceptions] = None,
+    hierarchy: Optional[ExceptionHierarchy] = None,
+) -> List[Violation]:
+    """Read, parse and validate a single Python file.
+
+    Args:
+        path (Path): The path to the Python file.
+        options (AnalysisOptions): The analysis options.
+        cache (Optional[ResultCache]): The result cache, if caching is enabled.
+        stats (Optional[Stats]): The run statistics to update, if any.
+        changed_lines (Optional[Sequence[LineRange]]): If given, only functions overlapping these lines are checked.
+        propagated (Optional[PropagatedExceptions]): Exceptions propagated from the callees of each function.
+        hierarchy (Optional[ExceptionHierarchy]): If given, base classes document their subclasses.
+
+    Returns:
+        List[Violation]: The violations detected in the file.
+    """
+    task = FileTask(path, changed_lines, propagated, hierarchy)
+    records, counters = _analyze_task(task, options, cache)
+    if stats is not None:
+        stats.update(counters, str(path))
+    return _to_violations(str(path), records)
+
+
+def analyze_content(
+    content: Union[str, bytes],
+    filename: str,
+    options: AnalysisOptions = AnalysisOptions(),
+    module: Optional[str] = None,
+    stats: Optional[Stats] = None,
+) -> List[Violation]:
+    """Parse and validate a Python source held in memory, unless the prefilter skips it.
+
+    Args:
+        content (Union[str, bytes]): The raw content of the file, or its decoded text.
+        filename (str): The name of the file, used in violations and syntax errors.
+        options (AnalysisOptions): The analysis options.
+        module (Optional[str]): The name of the module, used to qualify exception names.
+        stats (Optional[Stats]): The run statistics to update, if any.
+
+    Returns:
+        List[Violation]: The violations detected in the source.
+    """
+    if may_have_violations(content):
+        records, counters = _analyze_content(content, filename, options, module)
+    else:
+        records, counters = [], _prefiltered(len(content))
+    if stats is not None:
+        stats.update(counters, filename)
+    return _to_violations(filename, records)
+
+
+def _summarize_file(
+    path: Path, cache: Optional[ResultCache] = None
+) -> Tuple[ModuleSummary, Dict[str, int]]:
+    """Read and parse a single Python file and summarize it for the exception propagation.
+
+    This function also runs inside the worker processes.
+
+    Args:
+        path (Path): The path to the Python file.
+        cache (Optional[ResultCache]): The result cache, if caching is enabled.
+
+    Returns:
+        Tuple[ModuleSummary, Dict[str, int]]: The summary of the module and its counters.
+    """
+    with open(path, "rb") as source:
+        content = source.read()
+
+    module, is_package = module_name(path)
+
+    key = None
+    if cache is not None:
+        key = cache.key(content, f"summary:{module}:{is_package}")
+        cached = cache.get(key)
+        if cached is not None:
+            return ModuleSummary.from_json(cached), {"summaries_cached": 1}
+
+    tree = parse_source(content, str(path))
+    summary = summarize_module(tree, module, is_package)
+
+    if cache is not None and key is not None:
+        cache.put(key, summary.to_json())
+
+    return summary, {"summaries": 1}
+
+
+def _failed_summary() -> Tuple[ModuleSummary, Dict[str, int]]:
+    # The analysis of the file reports the problem, the file just takes no part in the propagation
+    return ModuleSummary((), {}, {}), {"summaries_failed": 1}
+
+
+def _isolated_summary(
+    path: Path, cache: Optional[ResultCache] = None, timeout: Optional[float] = None
+) -> Tuple[ModuleSummary, Dict[str, int]]:
+    """Run _summarize_file under a time limit, with an empty summary for the files it fails on.
+
+    This function also runs inside the worker processes.
+
+    Args:
+        path (Path): The path to the Python file.
+        cache (Optional[ResultCache]): The result cache, if caching is enabled.
+        timeout (Optional[float]): The time budget of the file in seconds, None for no limit.
+
+    Returns:
+        Tuple[ModuleSummary, Dict[str, int]]: The summary of the module and its counters.
+    """
+    try:
+        with time_limit(timeout):
+            return _summarize_file(path, cache)
+    except Exception:
+        return _failed_summary()
+
+
+def _apply_chunk(
+    fn: Callable[[T], R], chunk: List[T]
+) -> Tuple[List[R], Optional[float]]:
+    # The memory of the worker after the chunk tells the parent process when to replace the pool
+    return [fn(item) for item in chunk], resident_memory()
+
+
+def _iter_chunks(iterable: Iterable[T], size: int) -> Iterator[List[T]]:
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _succeeded(future: Future) -> bool:
+    return future.done() and not future.cancelled() and future.exception() is None
+
+
+def _submit(executor: ProcessPoolExecutor, fn: Callable[[T], R], item: T) -> Future:
+    # A pool refuses new items as soon as one of its workers died; they then fail like the
+    # items it was running, rather than before the oldest pending item is looked at
+    try:
+        return executor.submit(fn, item)
+    except BrokenProcessPool as e:
+        future: Future = Future()
+        future.set_exception(e)
+        return future
+
+
+def _record_pid(pids: SimpleQueue) -> None:
+    # Runs first in every worker process, so that the parent process knows whom to kill
+    pids.put(os.getpid())
+
+
+def _start_pool(jobs: int) -> Tuple[ProcessPoolExecutor, SimpleQueue]:
+    pids: SimpleQueue = multiprocessing.SimpleQueue()
+    executor = ProcessPoolExecutor(jobs, initializer=_record_pid, initargs=(pids,))
+    return executor, pids
+
+
+def _kill_pool(executor: ProcessPoolExecutor, pids: SimpleQueue) -> None:
+    # A stalled worker never finishes its task, so it cannot be waited for. Killing the workers
+    # breaks the pool, which then terminates and joins any worker left, so the shutdown returns.
+    while not pids.empty():
+        try:
+            os.kill(pids.get(), signal.SIGTERM)
+        except OSError:
+            # The worker already exited
+            pass
+    executor.shutdown(wait=True)
+
+
+def _run_one_by_one(
+    apply: Callable[[List[T]], Tuple[List[R], Optional[float]]],
+    items: List[T],
+    file_timeout: Optional[float],
+    fallback: Callable[[T, BaseException], R],
+) -> Iterator[Tuple[T, R]]:
+    # Runs the items of a chunk that broke the pool one at a time, to tell which of them is the
+    # culprit. They share a single worker, which is only replaced after an item broke it.
+    deadline = file_timeout + STALL_GRACE if file_timeout else None
+    executor, pids = _start_pool(1)
+    try:
+        for item in items:
+            try:
+                (result,), _ = executor.submit(apply, [item]).result(timeout=deadline)
+            except (BrokenProcessPool, FutureTimeoutError) as e:
+                _kill_pool(executor, pids)
+                executor, pids = _start_pool(1)
+                error: BaseException = e
+                if isinstance(e, FutureTimeoutError):
+                    error = FileTimeout(file_timeout)
+                result = fallback(item, error)
+            yield item, result
+    finally:
+        executor.shutdown(wait=True)
+
+
+def _map_files(
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    jobs: int,
+    limits: RunLimits = RunLimits(),
+    fallback: Optional[Callable[[T, BaseException], R]] = None,
+) -> Iterator[Tuple[T, R]]:
+    """Apply a picklable function to every item, in a pool of worker processes if jobs > 1.
+
+    The pool is replaced once its workers have processed limits.max_files_per_worker items each
+    on average, or once a worker uses more than limits.max_worker_memory MiB. It is also replaced
+    when a worker dies or stalls past the time budget of its items: the items of the oldest
+    unfinished chunk then run again one at a time, those that fail again get the result of
+    fallback, and the other unfinished chunks are resubmitted to the new pool.
+
+    Args:
+        fn (Callable[[T], R]): The function to apply, must be picklable.
+        items (Iterable[T]): The items, consumed lazily.
+        jobs (int): The number of worker processes.
+        limits (RunLimits): The time budget of an item and the limits of the worker processes.
+        fallback (Optional[Callable[[T, BaseException], R]]): The result of an item whose worker died
+            (BrokenProcessPool) or stalled (FileTimeout), None to raise the error instead.
+
+    Yields:
+        Tuple[T, R]: Each item together with its result, in input order.
+    """
+    if jobs <= 1:
+        for item in items:
+            yield item, fn(item)
+        return
+
+    apply = partial(_apply_chunk, fn)
+    chunks = _iter_chunks(items, CHUNK_SIZE)
+    window = jobs * CHUNKS_PER_WORKER
+    chunk_deadline = None
+    if limits.file_timeout:
+        # The oldest chunk may wait for a worker to finish another chunk before it runs itself
+        chunk_deadline = 2 * CHUNK_SIZE * limits.file_timeout + STALL_GRACE
+    max_items = (
+        limits.max_files_per_worker * jobs if limits.max_files_per_worker else None
+    )
+
+    # The chunks taken from the items but not yet yielded, in input order, with their futures
+    pending: Deque[Tuple[List[T], Future]] = deque()
+    while True:
+        executor, pids = _start_pool(jobs)
+        try:
+            # The chunks of a replaced pool run again in the new one, unless they were done
+            pending = deque(
+                (
+                    chunk,
+                    future if _succeeded(future) else _submit(executor, apply, chunk),
+                )
+                for chunk, future in pending
+            )
+            # The items submitted to this pool, including the ones of the replaced pool
+            submitted = sum(len(chunk) for chunk, _ in pending)
+            recycle = False
+            while True:
+                while not recycle and len(pending) < window:
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        break
+                    pending.append((chunk, _submit(executor, apply, chunk)))
+                    submitted += len(chunk)
+                    # The pool is drained before it is replaced, so no result is lost
+                    recycle = max_items is not None and submitted >= max_items
+                if not pending:
+                    if not recycle:
+                        return
+                    break
+                chunk, future = pending[0]
+                try:
+                    results, memory = future.result(timeout=chunk_deadline)
+                except (BrokenProcessPool, FutureTimeoutError):
+                    _kill_pool(executor, pids)
+                    if fallback is None:
+                        raise
+                    pending.popleft()
+                    yield from _run_one_by_one(
+                        apply, chunk, limits.file_timeout, fallback
+                    )
+                    break
+                pending.popleft()
+                yield from zip(chunk, results)
+                if limits.max_worker_memory is not None and memory is not None:
+                    recycle = recycle or memory > limits.max_worker_memory
+        finally:
+            executor.shutdown(wait=True)
+
+
+def _map_deduplicated(
+    fn: Callable[[FileTask], FileResult],
+    tasks: Iterable[FileTask],
+    jobs: int,
+    limits: RunLimits = RunLimits(),
+) -> Iterator[Tuple[FileTask, FileResult]]:
+    """Apply _analyze_task to every task, analyzing identical file contents only once.
+
+    Files without per-file inputs are read in this process: the ones the prefilter skips
+    are never sent to a worker, and the ones whose content (and module name, when the
+    violations depend on it) was seen recently reuse the violations of the first one. Only
+    the violations of the last DEDUPLICATION_SIZE contents are kept, so the memory does not
+    grow with the number of files; a duplicate of an older content is analyzed again.
+
+    Args:
+        fn (Callable[[FileTask], FileResult]): _isolated_task with its options, must be picklable.
+        tasks (Iterable[FileTask]): The tasks, consumed lazily.
+        jobs (int): The number of worker processes.
+        limits (RunLimits): The time budget of a file and the limits of the worker processes.
+
+    Yields:
+        Tuple[FileTask, FileResult]: Each task together with its result, in input order.
+    """
+    # Every task in input order with its content key, the list its violations are put into, the
+    # time spent reading it and, unless it was submitted, its counters. The duplicates share the
+    # list of the task they duplicate.
+    order: Deque[
+        Tuple[
+            FileTask,
+            Optional[Hashable],
+            Optional[List[List[ViolationRecord]]],
+            int,
+            Optional[Dict[str, int]],
+        ]
+    ] = deque()
+    # The submitted contents whose violations are not known yet, and the last known ones
+    pending: Dict[Hashable, List[List[ViolationRecord]]] = {}
+    recent: "OrderedDict[Hashable, List[ViolationRecord]]" = OrderedDict()
+
+    def unique() -> Iterator[FileTask]:
+        for task in tasks:
+            if (
+                task.changed_lines is not None
+                or task.propagated
+                or task.hierarchy is not None
+            ):
+                order.append((task, None, None, 0, None))
+                yield task
+                continue
+            start = time.perf_counter_ns()
+            try:
+                content, size = read_source(task.path)
+            except OSError:
+                # Read again where it is analyzed, which reports the error
+                order.append((task, None, None, 0, None))
+                yield task
+                continue
+            read_ns = time.perf_counter_ns() - start
+            if content is None:
+                order.append(
+                    (
+                        task,
+                        None,
+                        None,
+                        read_ns,
+                        dict(_prefiltered(size), read_ns=read_ns),
+                    )
+                )
+                continue
+            key = _content_key(content, task.path)
+            slot: Optional[List[List[ViolationRecord]]]
+            if key in recent:
+                recent.move_to_end(key)
+                slot = [recent[key]]
+            else:
+                slot = pending.get(key)
+            if slot is not None:
+                duplicate = {
+                    "files": 1,
+                    "files_deduplicated": 1,
+                    "bytes_deduplicated": size,
+                    "read_ns": read_ns,
+                }
+                order.append((task, None, slot, read_ns, duplicate))
+                continue
+            slot = pending[key] = []
+            order.append((task, key, slot, read_ns, None))
+            yield task._replace(content=content)
+
+    def resolved() -> Iterator[Tuple[FileTask, FileResult]]:
+        # The tasks before the next submitted one; duplicates follow the task they duplicate
+        while order:
+            task, _, slot, _, counters = order[0]
+            if counters is None:
+                return
+            order.popleft()
+            yield task, (slot[0] if slot else [], counters)
+
+    results = _map_files(fn, unique(), jobs, limits, lambda _, error: _diagnose(error))
+    for _, (result, counters) in results:
+        yield from resolved()
+        task, key, slot, read_ns, _ = order.popleft()
+        if key is not None:
+            assert slot is not None
+            slot.append(result)
+            del pending[key]
+            recent[key] = result
+            if len(recent) > DEDUPLICATION_SIZE:
+                recent.popitem(last=False)
+        if read_ns:
+            # The worker got the content with the task
+            counters["read_ns"] = read_ns
+        yield task, (result, counters)
+    yield from resolved()
+
+
+def _effective_jobs(paths: Iterable[T], jobs: int) -> Tuple[Iterable[T], int]:
+    # A pool is not worth starting for a handful of files. Lazy inputs are peeked at, and the
+    # peeked items are put back in front of the rest.
+    if jobs <= 1:
+        return paths, jobs
+    if not isinstance(paths, Sized):
+        iterator = iter(paths)
+        head = list(islice(iterator, CHUNK_SIZE + 1))
+        paths = head if len(head) <= CHUNK_SIZE else chain(head, iterator)
+    if isinstance(paths, Sized) and len(paths) <= CHUNK_SIZE:
+        return paths, 1
+    return paths, jobs
+
+
+def iter_results(
+    paths: Iterable[Path],
+    jobs: int = 1,
+    options: AnalysisOptions = AnalysisOptions(),
+    cache: Optional[ResultCache] = None,
+    stats: Optional[Stats] = None,
+    changed_lines: Optional[Mapping[Path, Sequence[LineRange]]] = None,
+    propagated: Optional[Mapping[Path, PropagatedExceptions]] = None,
+    hierarchies: Optional[Mapping[Path, ExceptionHierarchy]] = None,
+    limits: RunLimits = RunLimits(),
+) -> Iterator[Tuple[Path, List[Violation]]]:
+    """Validate the given Python files and yield their violations in input order.
+
+    The files that cannot be checked get a DR9xx diagnostic instead of their violations.
+
+    Args:
+        paths (Iterable[Path]): The Python files to validate, consumed lazily.
+        jobs (int): The number of worker processes. With 1, files are validated in the current process.
+        options (AnalysisOptions): The analysis options.
+        cache (Optional[ResultCache]): The result cache, if caching is enabled.
+        stats (Optional[Stats]): The run statistics to update, if any.
+        changed_lines (Optional[Mapping[Path, Sequence[LineRange]]]): If given, only the functions
+            overlapping the changed lines of each file are checked.
+        propagated (Optional[Mapping[Path, PropagatedExceptions]]): The exceptions propagated from
+            the callees of the functions of each file, see iter_summaries and docraise.propagation.
+        hierarchies (Optional[Mapping[Path, ExceptionHierarchy]]): The exception hierarchy used to
+            validate each file; base classes document their subclasses (see docraise.hierarchy).
+        limits (RunLimits): The time budget of a file and the limits of the worker processes.
+
+    Yields:
+        Tuple[Path, List[Violation]]: Each path together with the violations detected in it.
+    """
+    paths, jobs = _effective_jobs(paths, jobs)
+    tasks = (
+        FileTask(
+            path,
+            changed_lines.get(path, ()) if changed_lines is not None else None,
+            propagated.get(path) if propagated is not None else None,
+            hierarchies.get(path) if hierarchies is not None else None,
+        )
+        for path in paths
+    )
+    analyze = partial(
+        _isolated_task, options=options, cache=cache, timeout=limits.file_timeout
+    )
+
+    for task, (records, counters) in _map_deduplicated(analyze, tasks, jobs, limits):
+        if stats is not None:
+            stats.update(counters, str(task.path))
+        yield task.path, _to_violations(str(task.path), records)
+
+
+def iter_summaries(
+    paths: Iterable[Path],
+    jobs: int = 1,
+    cache: Optional[ResultCache] = None,
+    stats: Optional[Stats] = None,
+    limits: RunLimits = RunLimits(),
+) -> Iterator[Tuple[Path, ModuleSummary]]:
+    """Summarize the given Python files for the exception propagation, in input order.
+
+    The files that cannot be summarized get an empty summary; their analysis reports why.
+
+    Args:
+        paths (Iterable[Path]): The Python files to summarize, consumed lazily.
+        jobs (int): The number of worker processes. With 1, files are summarized in the current process.
+        cache (Optional[ResultCache]): The result cache, if caching is enabled.
+        stats (Optional[Stats]): The run statistics to update, if any.
+        limits (RunLimits): The time budget of a file and the limits of the worker processes.
+
+    Yields:
+        Tuple[Path, ModuleSummary]: Each path together with the summary of the module.
+    """
+    summarize = partial(_isolated_summary, cache=cache, timeout=limits.file_timeout)
+
+    paths, jobs = _effective_jobs(paths, jobs)
+    results = _map_files(
+        summarize, paths, jobs, limits, lambda _, error: _failed_summary()
+    )
+    for path, (summary, counters) in results:
+        if stats is not None:
+            stats.update(counters)
+        yield path, summary
+
+
+def cross_module_inputs(
+    summaries: Mapping[Path, ModuleSummary],
+    paths: Iterable[Path],
+    propagated: bool = False,
+    subclass_docs: bool = False,
+) -> Tuple[
+    Optional[Dict[Path, PropagatedExceptions]], Optional[Dict[Path, ExceptionHierarchy]]
+]:
+    """Compute the per-file inputs of the analysis that depend on other modules.
+
+    Args:
+        summaries (Mapping[Path, ModuleSummary]): The summaries of every module of the project.
+        paths (Iterable[Path]): The files that will be validated; they must have a summary.
+        propagated (bool): Whether to propagate the exceptions of the called functions (--propagate).
+        subclass_docs (bool): Whether base classes document their subclasses (--allow-subclass-docs).
+
+    Returns:
+        Tuple[Optional[Dict[Path, PropagatedExceptions]], Optional[Dict[Path, ExceptionHierarchy]]]: The
+            propagated exceptions and the exception hierarchy of each file, None when not enabled.
+    """
+    hierarchy = None
+    if propagated or subclass_docs:
+        hierarchy = ExceptionHierarchy.from_summaries(summaries.values())
+    # A handler catches the subclasses of what it names, whether or not they document each other
+    exceptions = propagate(summaries, hierarchy) if propagated else None
+    hierarchies = None
+    if hierarchy is not None and subclass_docs:
+        hierarchies = {
+            path: hierarchy.for_module(
+                summaries[path], exceptions.get(path) if exceptions else None
+            )
+            for path in paths
+        }
+    return exceptions, hierarchies
@@ -0,0 +1,283 @@
+"""
+This module contains the lazy parsing mode, which only parses the functions that can have violations.
+
+Large generated or vendored modules often consist of thousands of functions of which only
+a few raise or document an exception. Instead of building the syntax tree of the whole
+module, the source is split into its top-level statements and the statements of the
+top-level class bodies, and only the following ones are kept:
+1. Functions and methods whose source matches RAISES_MARKER (the raise keyword, or a
+   docstring the analyzer would parse), with their decorators.
+2. The headers of the classes that keep at least one statement.
+3. Functions, methods and other statements with an import or a marker, so the imports
+   are the same as with a full parse, including the ones inside functions.
+
+Every other line is blanked out, so the sliced source has the same line numbers and
+columns as the original and violations need no offset. The statements are found with a
+regular expression based scanner that only tracks strings, comments, brackets and line
+continuations, which is much faster than the tokenize module (written in Python) and than
+a full parse. Whenever the structure is ambiguous (unbalanced brackets, inconsistent
+indentation, a dangling decorator, a sliced source that does not parse), the caller falls
+back to a full parse, which also reports the actual syntax errors.
+
+Example:
+    To use this module, parse a module lazily and fall back to a full parse.
+
+        from docraise.slicing import parse_lazily
+
+        sliced = parse_lazily(content, "generated.py")
+        if sliced is None:
+            tree = ast.parse(content)
+        else:
+            tree = sliced.tree
+"""
+
+import ast
+import io
+import re
+import tokenize
+from bisect import bisect_left
+from typing import List, NamedTuple, Optional, Tuple, Union, cast
+
+from docraise.docstrings import RAISES_MARKER
+from docraise.prefilter import TEXT_ESCAPE
+
+# Strings, comments, bracket pairs without strings, comments or brackets inside and line continuations,
+# which can hide or span line starts and do not change the bracket depth; then the other
+# brackets (groups 1 and 2) and the start of every line that begins a statement (group 3)
+_SCANNER = re.compile(
+    r"""
+    [rRbBuUfF]{0,2}(?:
+        '''[^'\\]*(?:(?:\\.|'(?!''))[^'\\]*)*'''
+      | \"\"\"[^"\\]*(?:(?:\\.|"(?!""))[^"\\]*)*\"\"\"
+      | '[^'\\\n]*(?:\\.[^'\\\n]*)*'
+      | "[^"\\\n]*(?:\\.[^"\\\n]*)*"
+    )
+  | \#[^\n]*
+  | [(\[{][^()\[\]{}'"\#\\]*[)\]}]
+  | \\\n
+  | ([(\[{])
+  | ([)\]}])
+  | \n([ \t]*)(?=[^\s\#])
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+_OPEN, _CLOSE, _STATEMENT = 1, 2, 3
+_KEYWORD = re.compile(r"(?:async[ \t]+)?(?P<def>def)\b|class[ \t]+(?P<class>\w+)")
+_IMPORT = re.compile(r"\bimport\b")
+# RAISES_MARKER without IGNORECASE, which makes the search much slower, for lowercased text
+_LOWER_MARKER = re.compile(RAISES_MARKER.pattern)
+
+# Smaller modules are parsed in full, slicing them does not pay off
+LAZY_PARSE_MIN_SIZE = 64 * 1024
+
+
+class _Statement(NamedTuple):
+    """The start of a statement, which may span several lines."""
+
+    line: int
+    indent: str
+    offset: int
+
+
+class SlicedModule(NamedTuple):
+    """The syntax tree of the kept statements of a module."""
+
+    tree: ast.Module
+    # The names of all top-level classes, including the ones that were blanked out
+    classes: List[str]
+    # The number of non-blank lines that were blanked out
+    skipped_lines: int
+
+
+def _scan(text: str) -> Optional[List[_Statement]]:
+    """
+    Find the start of every statement of a module.
+
+    Args:
+        text (str): The source of the module.
+
+    Returns:
+        Optional[List[_Statement]]: The statements in source order, or None if the brackets do not balance.
+    """
+    statements = []
+    depth = 0
+    lines = 0
+    counted = 0
+    # The leading newline makes the first line look like every other line
+    scan = "\n" + text
+    for match in _SCANNER.finditer(scan):
+        kind = match.lastindex
+        if kind == _STATEMENT:
+            if depth == 0:
+                start = match.start()
+                lines += scan.count("\n", counted, start + 1)
+                counted = start + 1
+                statements.append(
+                    _Statement(lines, match.group(_STATEMENT), match.end() - 1)
+                )
+        elif kind == _OPEN:
+            depth += 1
+        elif kind == _CLOSE:
+            depth -= 1
+            if depth < 0:
+                return None
+    return statements if depth == 0 else None
+
+
+def _group(
+    text: str, statements: List[_Statement], begin: int, end: int, indent: str
+) -> Optional[List[Tuple[int, int, int]]]:
+    """
+    Group the statements of a block into units; decorators belong to the definition that follows them.
+
+    Args:
+        text (str): The source of the module.
+        statements (List[_Statement]): All statements of the module.
+        begin (int): The index of the first statement of the block.
+        end (int): The index after the last statement of the block.
+        indent (str): The indentation of the block.
+
+    Returns:
+        Optional[List[Tuple[int, int, int]]]: The index of the first statement of each unit, of its
+            keyword statement (after the decorators) and after its last statement, or None if the
+            indentation is inconsistent or a decorator is dangling.
+    """
+    units: List[Tuple[int, int]] = []
+    decorated = None
+    for i in range(begin, end):
+        statement = statements[i]
+        if statement.indent != indent:
+            if len(statement.indent) <= len(indent) or not statement.indent.startswith(
+                indent
+            ):
+                return None
+            continue
+        if text.startswith("@", statement.offset):
+            if decorated is None:
+                decorated = i
+            continue
+        units.append((i if decorated is None else decorated, i))
+        decorated = None
+    if decorated is not None:
+        return None
+
+    ends = [first for first, _ in units[1:]] + [end]
+    return [
+        (first, keyword, unit_end) for (first, keyword), unit_end in zip(units, ends)
+    ]
+
+
+def slice_module(text: str) -> Optional[Tuple[str, List[str], int]]:
+    """
+    Blank out the statements of a module that cannot have violations.
+
+    Args:
+        text (str): The source of the module, with \\n line endings.
+
+    Returns:
+        Optional[Tuple[str, List[str], int]]: The sliced source, the names of the top-level classes
+            and the number of non-blank lines blanked out, or None if the structure is ambiguous.
+    """
+    statements = _scan(text)
+    if statements is None:
+        return None
+    lines = text.split("\n")
+
+    def bounds(first: int, end: int) -> Tuple[int, int, int, int]:
+        # First and last line (1-based, inclusive) and offsets of the statements[first:end]
+        last_line = statements[end].line - 1 if end < len(statements) else len(lines)
+        end_offset = statements[end].offset if end < len(statements) else len(text)
+        return statements[first].line, last_line, statements[first].offset, end_offset
+
+    # Markers are rare, so the whole text is searched once instead of every unit
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        found = _LOWER_MARKER.finditer(lowered)
+    else:
+        # Some characters lowercase to several, the offsets would not match
+        found = RAISES_MARKER.finditer(text)
+    # An import anywhere, even inside a function, is part of the symbol table
+    markers = sorted(
+        [m.start() for m in found]
+        + [m.start() for m in TEXT_ESCAPE.finditer(text)]
+        + [m.start() for m in _IMPORT.finditer(text)]
+    )
+
+    def needed(start: int, end: int) -> bool:
+        i = bisect_left(markers, start)
+        return i < len(markers) and markers[i] < end
+
+    top = _group(text, statements, 0, len(statements), "")
+    if top is None:
+        return None
+
+    kept: List[Tuple[int, int]] = []
+    classes = []
+    for first, keyword, end in top:
+        first_line, last_line, start, stop = bounds(first, end)
+        match = _KEYWORD.match(text, statements[keyword].offset)
+        if match is None or match.group("def") is not None:
+            if needed(start, stop):
+                kept.append((first_line, last_line))
+            continue
+
+        classes.append(match.group("class"))
+        body = keyword + 1
+        if body == end or not needed(start, stop):
+            continue
+        members = _group(text, statements, body, end, statements[body].indent)
+        if members is None:
+            return None
+        kept_members = []
+        for member_first, _, member_end in members:
+            member_first_line, member_last_line, member_start, member_stop = bounds(
+                member_first, member_end
+            )
+            if needed(member_start, member_stop):
+                kept_members.append((member_first_line, member_last_line))
+        if kept_members:
+            # The header, without the decorators of the class
+            kept.append((statements[keyword].line, statements[body].line - 1))
+            kept.extend(kept_members)
+
+    keep = bytearray(len(lines))
+    for first_line, last_line in kept:
+        first_index = first_line - 1
+        keep[first_index:last_line] = b"\x01" * (last_line - first_index)
+    skipped = sum(1 for line, flag in zip(lines, keep) if not flag and line.strip())
+    source = "\n".join(line if flag else "" for line, flag in zip(lines, keep))
+    return source, classes, skipped
+
+
+def parse_lazily(content: Union[str, bytes], filename: str) -> Optional[SlicedModule]:
+    """
+    Parse only the statements of a module that can have violations.
+
+    Args:
+        content (Union[str, bytes]): The raw content of the module, or its decoded text.
+        filename (str): The filename used in syntax errors.
+
+    Returns:
+        Optional[SlicedModule]: The sliced module, or None if the module must be parsed in full.
+    """
+    if isinstance(content, str):
+        text = content
+    else:
+        try:
+            encoding, _ = tokenize.detect_encoding(io.BytesIO(content).readline)
+            text = content.decode(encoding)
+        except (LookupError, SyntaxError, UnicodeError):
+            return None
+    text = text.replace("\r\n", "\n")
+    if "\r" in text or "\f" in text:
+        return None
+
+    sliced = slice_module(text)
+    if sliced is None:
+        return None
+    source, classes, skipped = sliced
+    try:
+        tree = compile(source, filename, "exec", ast.PyCF_ONLY_AST, dont_inherit=True)
+    except SyntaxError:
+        return None
+    return SlicedModule(cast(ast.Module, tree), classes, skipped)
@@ -0,0 +1,257 @@
+"""
+This module contains the Stats class, which aggregates the counters collected during a run.
+
+Counters are plain name to integer mappings, so they are cheap to collect inside the worker
+processes and to send back to the parent process, where they are added up. Besides counts,
+they hold the time spent in every phase of the run in nanoseconds (the counters ending in
+_ns): the phases of the parent process are timed with Stats.timer and Stats.timed, and the
+phases of every file (reading, parsing, the analyzer and the docstring parsing in it) are
+timed where they run, with one monotonic clock reading per phase and file, never per node.
+
+Programs that export the counters as metrics register hooks, which are called with the
+counters of every update as they arrive, together with the file they belong to.
+
+Example:
+    To use this module, create a Stats instance and update it with the counters of each file.
+
+        from docraise.stats import Stats
+
+        stats = Stats(slowest=10, hooks=[lambda counters, filename: export(counters)])
+        stats.update({"files": 1, "functions": 12, "analysis_ns": 1500000}, "module.py")
+        print(stats.format())
+"""
+
+import heapq
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+T = TypeVar("T")
+
+# Called with the counters of every update and the name of the file they belong to, if any
+StatsHook = Callable[[Mapping[str, int], Optional[str]], None]
+
+# The number of slowest files listed by --stats, by default
+DEFAULT_SLOWEST = 10
+
+# The phases of a run in the summary, with their counters
+PHASES = [
+    ("total", "run_ns"),
+    ("discovery", "discovery_ns"),
+    ("module summaries", "summaries_ns"),
+    ("reading", "read_ns"),
+    ("parsing", "parse_ns"),
+    ("analyzer", "analyzer_ns"),
+    ("docstring parsing", "docstring_parse_ns"),
+]
+
+
+def _percent(part: int, whole: int) -> str:
+    return f"{100 * part / whole:.1f}%" if whole else "n/a"
+
+
+def _ms(ns: int) -> str:
+    return f"{ns / 1e6:.1f} ms"
+
+
+def file_time(counters: Mapping[str, int]) -> int:
+    """
+    Return the time spent on a file: reading it, parsing it and running the analyzer.
+
+    Args:
+        counters (Mapping[str, int]): The counters of the file.
+
+    Returns:
+        int: The time in nanoseconds.
+    """
+    return counters.get("read_ns", 0) + counters.get("analysis_ns", 0)
+
+
+class Stats:
+    """
+    Counters aggregated over all analyzed files.
+
+    Attributes:
+        counters: The counters by name.
+        slowest: The number of slowest files to keep track of, 0 to not track them.
+        hooks: The callbacks called with the counters of every update.
+    """
+
+    def __init__(self, slowest: int = 0, hooks: Iterable[StatsHook] = ()):
+        """
+        Initialize the stats with all counters at zero.
+
+        Args:
+            slowest (int): The number of slowest files to keep track of.
+            hooks (Iterable[StatsHook]): The callbacks called with the counters of every update.
+        """
+        self.counters: Counter = Counter()
+        self.slowest = slowest
+        self.hooks: List[StatsHook] = list(hooks)
+        # A min-heap of (time, filename), so the fastest of the slowest files is replaced first
+        self._slowest: List[Tuple[int, str]] = []
+
+    def update(
+        self, counters: Mapping[str, int], filename: Optional[str] = None
+    ) -> None:
+        """
+        Add the counters of one file (or one worker) to the totals.
+
+        Args:
+            counters (Mapping[str, int]): The counters to add.
+            filename (Optional[str]): The file the counters belong to, if any.
+        """
+        self.counters.update(counters)
+        if filename is not None and self.slowest > 0:
+            entry = (file_time(counters), filename)
+            if len(self._slowest) < self.slowest:
+                heapq.heappush(self._slowest, entry)
+            elif entry > self._slowest[0]:
+                heapq.heapreplace(self._slowest, entry)
+        for hook in self.hooks:
+            hook(counters, filename)
+
+    @contextmanager
+    def timer(self, counter: str) -> Iterator[None]:
+        """
+        Add the time spent in a block to a counter.
+
+        Args:
+            counter (str): The name of the counter, ending in _ns.
+
+        Yields:
+            None: The block is timed.
+        """
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.update({counter: time.perf_counter_ns() - start})
+
+    def timed(self, iterable: Iterable[T], counter: str) -> Iterator[T]:
+        """
+        Iterate over a lazy iterable, adding the time spent producing its items to a counter.
+
+        Args:
+            iterable (Iterable[T]): The iterable, e.g. the generator of the discovered files.
+            counter (str): The name of the counter, ending in _ns.
+
+        Yields:
+            T: The items of the iterable.
+        """
+        iterator = iter(iterable)
+        elapsed = 0
+        try:
+            while True:
+                start = time.perf_counter_ns()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    elapsed += time.perf_counter_ns() - start
+                yield item
+        finally:
+            self.update({counter: elapsed})
+
+    def slowest_files(self) -> List[Tuple[str, int]]:
+        """
+        Return the slowest files, the slowest first.
+
+        Returns:
+            List[Tuple[str, int]]: The name of every file and the time spent on it in nanoseconds.
+        """
+        return [(filename, ns) for ns, filename in sorted(self._slowest, reverse=True)]
+
+    def _prefilter_savings(self) -> str:
+        # Skipped files would have been analyzed at the speed of the analyzed ones
+        c = self.counters
+        if not c["bytes_analyzed"]:
+            return "n/a"
+        saved = c["analysis_ns"] * c["bytes_prefiltered"] / c["bytes_analyzed"]
+        return f"{saved / 1e6:.0f} ms"
+
+    def format(self) -> str:
+        """
+        Format the counters as a human readable summary.
+
+        Returns:
+            str: The summary, one counter per line.
+        """
+        c = self.counters
+        docstrings = (
+            c["docstrings_skipped"] + c["docstring_cache_hits"] + c["docstrings_parsed"]
+        )
+        parse_requests = c["docstring_cache_hits"] + c["docstrings_parsed"]
+        lines = [
+            f"files: {c['files']} ({c['files_cached']} from cache)",
+            f"functions: {c['functions']}",
+            f"docstrings skipped: {c['docstrings_skipped']} ({_percent(c['docstrings_skipped'], docstrings)})",
+            f"docstring cache hits: {c['docstring_cache_hits']} "
+            f"({_percent(c['docstring_cache_hits'], parse_requests)})",
+            f"docstrings parsed: {c['docstrings_parsed']}",
+        ]
+        if c["files_prefiltered"]:
+            lines.append(
+                f"files skipped by the prefilter: {c['files_prefiltered']} "
+                f"({_percent(c['files_prefiltered'], c['files'])}), "
+                f"estimated time saved: {self._prefilter_savings()}"
+            )
+        if c["files_deduplicated"] or c["functions_memoized"]:
+            lines.append(
+                f"duplicate files: {c['files_deduplicated']} ({_percent(c['files_deduplicated'], c['files'])}), "
+                f"memoized functions: {c['functions_memoized']} ({_percent(c['functions_memoized'], c['functions'])})"
+            )
+        if c["files_sliced"] or c["slicing_fallbacks"]:
+            lines.append(
+                f"lazily parsed files: {c['files_sliced']} ({c['lines_sliced_out']} lines not parsed), "
+                f"full parse fallbacks: {c['slicing_fallbacks']}"
+            )
+        if c["summaries"] or c["summaries_cached"]:
+            summaries = c["summaries"] + c["summaries_cached"]
+            lines.append(
+                f"module summaries: {summaries} ({c['summaries_cached']} from cache)"
+            )
+        if c["files_failed"] or c["files_timed_out"] or c["summaries_failed"]:
+            lines.append(
+                f"files not checked: {c['files_failed'] + c['files_timed_out']} "
+                f"({c['files_timed_out']} timed out), failed module summaries: {c['summaries_failed']}"
+            )
+        if c["raises"]:
+            lines.append(f"raise statements: {c['raises']}")
+        phases = [f"{name} {_ms(c[counter])}" for name, counter in PHASES if c[counter]]
+        if phases:
+            # The phases of the files add up the time of every worker process
+            lines.append(f"time: {', '.join(phases)}")
+        slowest = self.slowest_files()
+        if slowest:
+            lines.append("slowest files:")
+            lines.extend(f"  {_ms(ns):>10}  {filename}" for filename, ns in slowest)
+        return "\n".join(lines)
+
+    def to_json(self) -> Dict[str, Any]:
+        """
+        Return the counters and the slowest files as a JSON serializable dictionary.
+
+        Returns:
+            Dict[str, Any]: The counters by name and the slowest files with their time in nanoseconds.
+        """
+        return {
+            "counters": dict(sorted(self.counters.items())),
+            "slowest_files": [
+                {"filename": filename, "ns": ns}
+                for filename, ns in self.slowest_files()
+            ],
+        }
@@ -0,0 +1,269 @@
+"""
+This module contains the SymbolTable class, which resolves exception names to qualified names.
+
+A symbol table is built once per module from its import statements and module-level
+classes. Raised exceptions, handler types and the exception names of docstrings are all
+resolved through it, so `raise json.JSONDecodeError`, `from json import JSONDecodeError`
+and a docstring documenting `json.JSONDecodeError` agree on "json.JSONDecodeError", while
+a class defined in the module stays distinct from it. Resolving a name is a single
+dictionary lookup of its first component, whatever the number of imports.
+
+Names whose first component is not a known symbol keep the legacy behaviour: dotted
+names are reduced to their last attribute (e.g. `exc.ValueError` -> "ValueError") and bare
+names, like builtins, are returned unchanged.
+
+Example:
+    To use this module, build the table of a module and resolve names through it.
+
+        from docraise.symbols import SymbolTable
+
+        symbols = SymbolTable.from_tree(ast.parse("import requests"))
+        symbols.resolve("requests.exceptions.HTTPError")  # "requests.exceptions.HTTPError"
+"""
+
+import ast
+import hashlib
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Type, Union
+
+# Fields that hold lists of statements (or except handlers and match cases, which hold statements)
+STATEMENT_FIELDS = ("body", "handlers", "orelse", "finalbody", "cases")
+_STATEMENT_FIELDS_BY_TYPE: Dict[Type[ast.AST], Tuple[str, ...]] = {}
+
+FunctionNode = Union[ast.FunctionDef, ast.AsyncFunctionDef]
+
+
+def module_name(path: Path) -> Tuple[str, bool]:
+    """
+    Return the dotted module name of a file, following the __init__.py files of its packages.
+
+    Args:
+        path (Path): The path to the Python file.
+
+    Returns:
+        Tuple[str, bool]: The module name and whether the file is a package (__init__.py).
+    """
+    is_package = path.name == "__init__.py"
+    parts = [] if is_package else [path.stem]
+    directory = path.parent
+    while (directory / "__init__.py").is_file():
+        parts.append(directory.name)
+        if directory.parent == directory:
+            break
+        directory = directory.parent
+    return ".".join(reversed(parts)), is_package
+
+
+def absolute_target(target: str, module: str, is_package: bool) -> str:
+    """
+    Resolve a relative import target against the importing module.
+
+    Args:
+        target (str): The import target, e.g. "..util.load".
+        module (str): The name of the importing module.
+        is_package (bool): Whether the importing module is a package.
+
+    Returns:
+        str: The absolute target.
+    """
+    level = len(target) - len(target.lstrip("."))
+    if not level:
+        return target
+    package = module if is_package else module.rpartition(".")[0]
+    for _ in range(level - 1):
+        package = package.rpartition(".")[0]
+    rest = target[level:]
+    return f"{package}.{rest}" if package and rest else package or rest
+
+
+def dotted_name(node: ast.AST) -> Optional[str]:
+    """
+    Return the dotted spelling of a name or attribute chain, e.g. "self.loader.load".
+
+    Args:
+        node (AST): The expression.
+
+    Returns:
+        Optional[str]: The dotted name, or None if the expression is not a plain chain of names.
+    """
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    return ".".join(reversed(parts))
+
+
+def statement_fields(node_type: Type[ast.AST]) -> Tuple[str, ...]:
+    """
+    Return the fields of a node type that can contain statements, in traversal order.
+
+    Args:
+        node_type (Type[ast.AST]): The type of the node.
+
+    Returns:
+        Tuple[str, ...]: The names of the fields.
+    """
+    fields = _STATEMENT_FIELDS_BY_TYPE.get(node_type)
+    if fields is None:
+        fields = tuple(f for f in node_type._fields if f in STATEMENT_FIELDS)
+        _STATEMENT_FIELDS_BY_TYPE[node_type] = fields
+    return fields
+
+
+def iter_statements(tree: ast.AST) -> Iterator[ast.AST]:
+    """
+    Yield every statement of a tree, without descending into expressions.
+
+    Args:
+        tree (AST): The root, usually an ast.Module.
+
+    Yields:
+        AST: The statements (and except handlers and match cases) in source order.
+    """
+    stack: List[ast.AST] = [tree]
+    while stack:
+        node = stack.pop()
+        if node is not tree:
+            yield node
+        for field in reversed(statement_fields(type(node))):
+            stack.extend(reversed(getattr(node, field)))
+
+
+def collect_imports(tree: ast.AST) -> Dict[str, str]:
+    """
+    Collect the names bound by the import statements of a module.
+
+    Args:
+        tree (AST): The module.
+
+    Returns:
+        Dict[str, str]: Local name -> dotted target; relative imports keep their leading dots.
+    """
+    imports = {}
+    for node in iter_statements(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                if alias.asname is not None:
+                    imports[alias.asname] = alias.name
+                else:
+                    head = alias.name.partition(".")[0]
+                    imports[head] = head
+        elif isinstance(node, ast.ImportFrom):
+            base = "." * node.level + (node.module or "")
+            for alias in node.names:
+                if alias.name != "*":
+                    separator = "" if base.endswith(".") or not base else "."
+                    imports[alias.asname or alias.name] = base + separator + alias.name
+    return imports
+
+
+class SymbolTable:
+    """
+    The qualified names of the symbols of a module.
+
+    Attributes:
+        imports: Local name -> dotted import target, as spelled (relative imports keep their dots).
+        module: The name of the module, if known.
+    """
+
+    def __init__(
+        self,
+        imports: Mapping[str, str],
+        classes: Iterable[str] = (),
+        module: Optional[str] = None,
+        is_package: bool = False,
+    ):
+        """Initialize the table from the imports and the module-level classes of a module."""
+        self.imports = dict(imports)
+        self.module = module
+
+        # Classes defined in the module are qualified with its name, if known
+        self._symbols: Dict[str, str] = {
+            name: f"{module}.{name}" if module else name for name in classes
+        }
+        for name, target in self.imports.items():
+            if module is not None:
+                target = absolute_target(target, module, is_package)
+            self._symbols[name] = target
+        self._fingerprint: Optional[bytes] = None
+
+    @classmethod
+    def from_tree(
+        cls, tree: ast.AST, module: Optional[str] = None, is_package: bool = False
+    ) -> "SymbolTable":
+        """
+        Build the symbol table of a module.
+
+        Args:
+            tree (AST): The module.
+            module (Optional[str]): The name of the module, used to qualify its classes and relative imports.
+            is_package (bool): Whether the module is a package (__init__.py).
+
+        Returns:
+            SymbolTable: The symbol table.
+        """
+        body = tree.body if isinstance(tree, ast.Module) else []
+        classes = [node.name for node in body if isinstance(node, ast.ClassDef)]
+        return cls(collect_imports(tree), classes, module, is_package)
+
+    def resolve(self, name: str) -> str:
+        """
+        Resolve a possibly dotted name to its qualified name.
+
+        Args:
+            name (str): The name as spelled in the module, e.g. "exceptions.HTTPError".
+
+        Returns:
+            str: The qualified name.
+        """
+        head, dot, rest = name.partition(".")
+        target = self._symbols.get(head)
+        if target is not None:
+            return f"{target}.{rest}" if dot else target
+        # An attribute of something unknown, e.g. an instance or a star import
+        return name.rpartition(".")[2]
+
+    def resolve_node(self, node: ast.AST) -> Optional[str]:
+        """
+        Resolve a name or attribute chain expression to its qualified name.
+
+        Args:
+            node (AST): The expression.
+
+        Returns:
+            Optional[str]: The qualified name, or None if the expression is neither a name nor an attribute.
+        """
+        if isinstance(node, ast.Name):
+            return self.resolve(node.id)
+        name = dotted_name(node)
+        if name is not None:
+            return self.resolve(name)
+        # An attribute of an arbitrary expression, e.g. get_errors().NotFound
+        return node.attr if isinstance(node, ast.Attribute) else None
+
+    def fingerprint(self) -> bytes:
+        """
+        Return a digest of the qualified name of every symbol.
+
+        Returns:
+            bytes: The digest, equal for tables that resolve every name the same way.
+        """
+        if self._fingerprint is None:
+            symbols = repr(sorted(self._symbols.items())).encode()
+            self._fingerprint = hashlib.blake2b(symbols, digest_size=16).digest()
+        return self._fingerprint
+
+    def is_unresolved(self, name: str) -> bool:
+        """
+        Check whether a resolved name is a bare name unknown to the module, e.g. a builtin.
+
+        Args:
+            name (str): A name returned by resolve.
+
+        Returns:
+            bool: True if the name is not qualified and not defined or imported by the module.
+        """
+        return "." not in name and name not in self._symbols
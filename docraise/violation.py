@@ -1,24 +1,38 @@
 """
-This module defines the ViolationCodes enum and the Violation dataclass.
+This module defines the ViolationCodes enum and the Violation named tuple.
 
 ViolationCodes is an enumeration of violation codes and their descriptions.
 The codes correspond to two types of violations:
 1. Exceptions that are raised but not documented in the function's docstring (DR001).
 2. Exceptions that are documented in the function's docstring but are not actually raised (DR002).
 
-Violation is a dataclass that encapsulates details about a detected violation,
-including the line number where the violation was detected, the violation code, and a description of the violation.
+The DR9xx codes are diagnostics of files that could not be checked, so that one broken file
+does not abort a run: the file could not be read or parsed (DR901), the analysis failed
+(DR902), it exceeded the time budget of the file (DR903) or the worker process analyzing
+it died (DR904). Their name field holds the details instead of an exception name.
+
+Violation is a named tuple that encapsulates details about a detected violation,
+including the line number where the violation was detected, the violation code, and the name of the exception.
+
+A run can report millions of violations, so a violation is kept as small as possible: it is
+a tuple of four references, the filenames and codes are interned so all the violations of a
+file share them, and the description is only rendered when it is printed. Violations are
+cheap to pickle between processes, which sends the four fields and nothing else.
 
 Example:
     To use this module, import it and create instances of the Violation class using the from_code class method.
 
         from violation import Violation, ViolationCodes
 
-        violation = Violation.from_code(10, ViolationCodes.DR001, 'MyException')
+        violation = Violation.from_code("module.py", 10, ViolationCodes.DR001, 'MyException')
+        print(violation.text)
 """
 
 import enum
-from dataclasses import dataclass
+import sys
+import traceback
+from pathlib import Path
+from typing import NamedTuple
 
 
 class ViolationCodes(enum.Enum):
@@ -26,23 +40,27 @@ class ViolationCodes(enum.Enum):
 
     DR001 = 'Exception "{name}" raised but not documented'
     DR002 = 'Exception "{name}" documented but never raised'
+    DR901 = "File could not be read or parsed: {name}"
+    DR902 = "Analysis failed: {name}"
+    DR903 = "Analysis exceeded the time budget of {name} seconds"
+    DR904 = "Worker process died while analyzing the file: {name}"
 
 
-@dataclass
-class Violation:
+class Violation(NamedTuple):
     """
-    Data class that encapsulates details about a detected violation.
+    Named tuple that encapsulates details about a detected violation.
 
     Attributes:
+        filename: The name of the file where the violation was detected.
         lineno: The line number where the violation was detected.
-        code: The violation code.
-        text: The description of the violation.
+        code: The violation code, the name of a ViolationCodes member.
+        name: The name of the exception associated with the violation.
     """
 
     filename: str
     lineno: int
     code: str
-    text: str
+    name: str
 
     @classmethod
     def from_code(
@@ -60,12 +78,49 @@ class Violation:
         Returns:
             Violation: A new Violation instance.
         """
-        return cls(
-            filename=filename,
-            lineno=lineno,
-            code=code.name,
-            text=code.value.format(name=exc_name),
-        )
+        return cls(sys.intern(filename), lineno, code.name, exc_name)
+
+    @classmethod
+    def from_failure(cls, filename: str, error: BaseException) -> "Violation":
+        """
+        Create the DR902 diagnostic of a file whose analysis raised an error.
+
+        Args:
+            filename (str): Name of the file that could not be analyzed.
+            error (BaseException): The error raised by the analysis.
+
+        Returns:
+            Violation: The diagnostic, on the first line of the file.
+        """
+        return cls.from_code(filename, 1, ViolationCodes.DR902, describe_failure(error))
+
+    @property
+    def text(self) -> str:
+        """
+        The description of the violation, rendered on every access.
+
+        Returns:
+            str: The description, e.g. 'Exception "KeyError" raised but not documented'.
+        """
+        return ViolationCodes[self.code].value.format(name=self.name)
 
     def __str__(self):
         return f"{self.filename}:{self.lineno}: \033[31m{self.code}\033[0m {self.text}"
+
+
+def describe_failure(error: BaseException) -> str:
+    """
+    Describe an error raised by the analysis of a file, for its DR902 diagnostic.
+
+    Args:
+        error (BaseException): The error raised by the analysis.
+
+    Returns:
+        str: The type and message of the error and where it was raised, for the bug report,
+            e.g. "RecursionError: maximum recursion depth exceeded (symbols.py:240)".
+    """
+    frames = traceback.extract_tb(error.__traceback__)
+    detail = f"{type(error).__name__}: {error}" if str(error) else type(error).__name__
+    if frames:
+        detail += f" ({Path(frames[-1].filename).name}:{frames[-1].lineno})"
+    return detail
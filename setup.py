@@ -1,14 +1,17 @@
 """A setuptools based setup module."""
 
 import pathlib
+import re
 
 # Always prefer setuptools over distutils
 from setuptools import find_packages, setup
 
-import docraise
-
 here = pathlib.Path(__file__).parent.resolve()
 
+# Read the version without importing docraise, whose dependencies may not be installed yet
+version_file = (here / "docraise" / "_version.py").read_text(encoding="utf-8")
+version = re.findall(r'^__version__ = "([^"]+)"', version_file, re.M)[0]
+
 # Get the long description from the README file
 long_description = (here / "README.md").read_text(encoding="utf-8")
 
@@ -17,7 +20,7 @@ long_description = (here / "README.md").read_text(encoding="utf-8")
 
 setup(
     name="docraise",  # Required
-    version=docraise.__version__,  # Required
+    version=version,  # Required
     description='Docraise is a linter that checks whether the docstrings contain valid "Raises" sections',  # Optional
     long_description=long_description,  # Optional
     long_description_content_type="text/markdown",  # Optional
@@ -49,6 +52,9 @@ setup(
         "console_scripts": [
             "docraise=docraise.main:main",
         ],
+        "flake8.extension": [
+            "DR = docraise.flake8_plugin:Plugin",
+        ],
     },
     project_urls={  # Optional
         "Source": "https://github.com/Laleee/docraise",
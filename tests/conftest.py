@@ -2,6 +2,7 @@ import ast
 
 import pytest
 
+from docraise.symbols import SymbolTable
 from tests.assets.code_samples import raised_documented, raised_not_documented, \
     not_raised_not_documented, not_raised_documented
 
@@ -28,3 +29,16 @@ def code_sample_not_raised_not_documented(request):
 def code_sample_not_raised_documented(request):
     """Fixture that provides code samples as ASTs."""
     return ast.parse(request.param[0]), request.param[1]
+
+
+@pytest.fixture
+def failing_analysis(monkeypatch):
+    """Fixture that makes the analysis fail on `raise (a or b)()`, as a bug in the analyzer would."""
+    resolve_node = SymbolTable.resolve_node
+
+    def fail_on_bool_op(self, node):
+        if isinstance(node, ast.BoolOp):
+            raise AssertionError("Unexpected expression")
+        return resolve_node(self, node)
+
+    monkeypatch.setattr(SymbolTable, "resolve_node", fail_on_bool_op)
@@ -0,0 +1,167 @@
+import ast
+import sys
+import textwrap
+
+from docraise.analyzer import Analyzer
+from tests.assets.code_samples import raised_documented, raised_not_documented, \
+    not_raised_not_documented, not_raised_documented
+
+
+class VisitorAnalyzer(Analyzer, ast.NodeVisitor):
+    """The Analyzer driven by ast.NodeVisitor, as it was before the iterative traversal."""
+
+    def _walk(self, tree):
+        self.visit(tree)
+
+    def visit_FunctionDef(self, node):
+        if self._enter_FunctionDef(node):
+            self.generic_visit(node)
+            self._leave_FunctionDef(node)
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_Raise(self, node):
+        self._enter_Raise(node)
+        self.generic_visit(node)
+
+    def visit_ExceptHandler(self, node):
+        self.generic_visit(node)
+        self._leave_ExceptHandler(node)
+
+
+MIXED_MODULE = textwrap.dedent("""
+raise ModuleError
+
+class Service:
+    def method(self):
+        '''Method.
+
+        Raises:
+            KeyError: never
+        '''
+        with open(path) as f:
+            for line in f:
+                if line:
+                    raise ValueError(line)
+                else:
+                    try:
+                        pass
+                    except (OSError, TypeError) as e:
+                        raise e
+        while True:
+            raise exc.StopError()
+
+async def coroutine():
+    raise AsyncError
+
+def outer():
+    def inner():
+        raise InnerError
+    return [lambda: x for x in range(3)]
+""")
+
+
+def test_same_violations_as_node_visitor():
+    # Arrange
+    samples = [MIXED_MODULE] + [s[0] for s in raised_not_documented.values()] \
+        + [s[0] for s in not_raised_documented.values()] \
+        + list(raised_documented.values()) + list(not_raised_not_documented.values())
+
+    for sample in samples:
+        tree = ast.parse(sample)
+
+        # Act
+        expected = VisitorAnalyzer().validate(tree)
+        violations = Analyzer().validate(tree)
+
+        # Assert
+        assert violations == expected
+
+
+def test_deeply_nested_code_does_not_recurse():
+    # Arrange
+    body = [ast.Raise(exc=ast.Name(id="ValueError", ctx=ast.Load()), cause=None)]
+    for _ in range(sys.getrecursionlimit() * 2):
+        body = [ast.If(test=ast.Constant(value=True), body=body, orelse=[])]
+    tree = ast.parse("def deep():\n    pass\n")
+    tree.body[0].body = body
+
+    # Act
+    violations = Analyzer().validate(tree)
+
+    # Assert
+    assert [(v.code, v.text) for v in violations] == [('DR001', 'Exception "ValueError" raised but not documented')]
+
+
+def test_raises_are_attributed_to_the_innermost_function():
+    # Arrange
+    tree = ast.parse(MIXED_MODULE)
+
+    # Act
+    violations = Analyzer().validate(tree)
+
+    # Assert
+    texts = {(v.lineno, v.text) for v in violations}
+    assert (23, 'Exception "AsyncError" raised but not documented') in texts
+    assert (27, 'Exception "InnerError" raised but not documented') in texts
+    assert not any("ModuleError" in text for _, text in texts)
+
+
+def test_outer_function_is_checked_after_a_nested_one():
+    # Arrange
+    tree = ast.parse(textwrap.dedent("""
+    def outer():
+        '''Outer.'''
+        def inner():
+            '''Inner.
+
+            Raises:
+                KeyError: always
+            '''
+            raise KeyError
+        raise ValueError
+    """))
+
+    # Act
+    violations = Analyzer().validate(tree)
+
+    # Assert
+    assert [(v.lineno, v.text) for v in violations] == [(2, 'Exception "ValueError" raised but not documented')]
+
+
+def test_unresolvable_calls_are_raised():
+    # Arrange
+    tree = ast.parse(textwrap.dedent("""
+    def fail(code, message):
+        '''Fail.'''
+        raise ERRORS[code](message)
+
+    def fail_either(a, b):
+        '''Fail either.'''
+        raise (a or b)()
+
+    def check():
+        '''Check.'''
+        raise ValueError
+    """))
+
+    # Act
+    violations = Analyzer().validate(tree)
+
+    # Assert
+    assert [(v.lineno, v.text) for v in violations] == [(10, 'Exception "ValueError" raised but not documented')]
+
+
+def test_reused_analyzer_starts_from_a_clean_state():
+    # Arrange
+    analyzer = Analyzer()
+    first = ast.parse("def f():\n    '''F.'''\n    raise ValueError\n")
+    second = ast.parse("raise ModuleError\n\ndef g():\n    '''G.'''\n    return 1\n")
+
+    # Act
+    analyzer.validate(first, "first.py")
+    violations = analyzer.validate(second, "second.py")
+
+    # Assert
+    assert violations == Analyzer().validate(second, "second.py") == []
+    assert analyzer.counters["functions"] == 1
@@ -0,0 +1,95 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from docraise import AnalysisOptions, analyze_many, analyze_source, iter_analyze_paths
+from docraise.runner import analyze_file
+from tests.assets.code_samples import raised_documented, raised_not_documented
+
+BAD = raised_not_documented["raise value error class"][0]
+OK = raised_documented["raise value error class"]
+
+
+def collect(sources, **kwargs):
+    async def run():
+        return [result async for result in analyze_many(sources, **kwargs)]
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("source", [BAD, BAD.encode()], ids=["text", "bytes"])
+def test_analyze_source(tmp_path, source):
+    # Arrange
+    path = tmp_path / "module.py"
+    path.write_text(BAD)
+
+    # Act
+    violations = analyze_source(source, str(path))
+
+    # Assert
+    assert violations == analyze_file(path)
+    assert [v.code for v in violations] == ["DR001"]
+
+
+def test_analyze_source_raises_syntax_errors():
+    # Act & Assert
+    with pytest.raises(SyntaxError):
+        analyze_source("def f(:\n    raise ValueError()\n", "broken.py")
+
+
+def test_iter_analyze_paths(tmp_path):
+    # Arrange
+    (tmp_path / "a.py").write_text(BAD)
+    (tmp_path / "b.py").write_text(OK)
+
+    # Act
+    results = list(iter_analyze_paths([tmp_path], options=AnalysisOptions(docstring_style="google")))
+
+    # Assert
+    assert [(path.name, [v.code for v in violations]) for path, violations in results] == [
+        ("a.py", ["DR001"]),
+        ("b.py", []),
+    ]
+
+
+def test_analyze_many_yields_every_source():
+    # Arrange
+    sources = [(f"module_{i}.py", BAD if i % 2 else OK) for i in range(10)]
+
+    # Act
+    results = collect(sources, concurrency=3, executor=ThreadPoolExecutor(2))
+
+    # Assert
+    assert sorted((filename, len(violations)) for filename, violations in results) == sorted(
+        (filename, 1 if i % 2 else 0) for i, (filename, _) in enumerate(sources)
+    )
+
+
+def test_analyze_many_consumes_sources_lazily():
+    # Arrange
+    consumed = []
+
+    def sources():
+        for i in range(20):
+            consumed.append(i)
+            yield f"module_{i}.py", BAD
+
+    async def first():
+        results = analyze_many(sources(), concurrency=4)
+        result = await results.__anext__()
+        await results.aclose()
+        return result
+
+    # Act
+    filename, violations = asyncio.run(first())
+
+    # Assert
+    assert filename.startswith("module_")
+    assert len(consumed) == 4
+
+
+def test_analyze_many_rejects_no_concurrency():
+    # Act & Assert
+    with pytest.raises(ValueError):
+        collect([("module.py", OK)], concurrency=0)
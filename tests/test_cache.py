@@ -0,0 +1,112 @@
+import os
+
+from docraise.cache import ResultCache
+from docraise.runner import analyze_file
+from tests.assets.code_samples import raised_not_documented
+
+
+def test_put_get(tmp_path):
+    # Arrange
+    cache = ResultCache(tmp_path / "cache")
+    key = cache.key(b"content")
+
+    # Act
+    missing = cache.get(key)
+    cache.put(key, [[1, "DR001", "text"]])
+
+    # Assert
+    assert missing is None
+    assert cache.get(key) == [[1, "DR001", "text"]]
+    assert not list((tmp_path / "cache").glob("*/*.tmp"))
+
+
+def test_key_depends_on_content_and_options(tmp_path):
+    # Arrange
+    cache = ResultCache(tmp_path)
+    other_options = ResultCache(tmp_path, options={"style": "google"})
+
+    # Act & Assert
+    assert cache.key(b"a") == ResultCache(tmp_path).key(b"a")
+    assert cache.key(b"a") != cache.key(b"b")
+    assert cache.key(b"a") != other_options.key(b"a")
+    assert cache.key(b"a") != cache.key(b"a", kind="other")
+
+
+def test_prune_evicts_least_recently_used(tmp_path):
+    # Arrange
+    cache = ResultCache(tmp_path, max_size=0)
+    keys = [cache.key(bytes([i])) for i in range(3)]
+    for i, key in enumerate(keys):
+        cache.put(key, ["x" * 100])
+        os.utime(cache._entry_path(key), (i, i))
+    cache.max_size = os.path.getsize(cache._entry_path(keys[0])) * 2
+
+    # Act
+    removed = cache.prune()
+
+    # Assert
+    assert removed == 1
+    assert cache.get(keys[0]) is None
+    assert cache.get(keys[1]) is not None
+    assert cache.get(keys[2]) is not None
+
+
+def test_cached_file_is_not_analyzed(tmp_path):
+    # Arrange
+    cache = ResultCache(tmp_path / "cache")
+    path = tmp_path / "sample.py"
+    path.write_text(raised_not_documented["raise value error class"][0])
+    cache.put(cache.key(path.read_bytes(), "violations:sample:False"), [[42, "DR002", "CachedError"]])
+
+    # Act
+    violations = analyze_file(path, cache=cache)
+
+    # Assert
+    assert [(v.lineno, v.code, v.name) for v in violations] == [(42, "DR002", "CachedError")]
+
+
+def test_clear(tmp_path):
+    # Arrange
+    cache = ResultCache(tmp_path / "cache")
+    key = cache.key(b"content")
+    cache.put(key, [])
+
+    # Act
+    cache.clear()
+
+    # Assert
+    assert cache.get(key) is None
+
+
+def test_clear_keeps_other_files(tmp_path):
+    # Arrange
+    cache = ResultCache(tmp_path)
+    cache.put(cache.key(b"content"), [])
+    (tmp_path / "module.py").write_text("x = 1\n")
+    (tmp_path / "daemon.sock").write_text("")
+    (tmp_path / "ab").mkdir()
+    (tmp_path / "ab" / "notes.json").write_text("{}")
+
+    # Act
+    cache.clear()
+
+    # Assert
+    assert sorted(p.name for p in tmp_path.rglob("*")) == ["ab", "daemon.sock", "module.py", "notes.json"]
+
+
+def test_get_on_read_only_cache(tmp_path, monkeypatch):
+    # Arrange
+    cache = ResultCache(tmp_path)
+    key = cache.key(b"content")
+    cache.put(key, [[1, "DR001", "text"]])
+
+    def utime(*args):
+        raise PermissionError("read-only file system")
+
+    monkeypatch.setattr(os, "utime", utime)
+
+    # Act
+    result = cache.get(key)
+
+    # Assert
+    assert result == [[1, "DR001", "text"]]
@@ -0,0 +1,47 @@
+from click.testing import CliRunner
+
+from docraise.config import find_config_file, load_config
+from docraise.main import main
+from tests.assets.code_samples import raised_not_documented
+
+
+def test_load_config(tmp_path):
+    # Arrange
+    (tmp_path / "tox.ini").write_text("[tox]\nenvlist = py311\n")
+    (tmp_path / "setup.cfg").write_text("[docraise]\ndocstring-style = google\njobs = 2\n")
+
+    # Act
+    path = find_config_file(tmp_path)
+    config = load_config(path)
+
+    # Assert
+    assert path == tmp_path / "setup.cfg"
+    assert config == {"docstring_style": "google", "jobs": "2"}
+
+
+def test_no_config_file(tmp_path):
+    # Arrange
+    (tmp_path / "setup.cfg").write_text("[flake8]\nmax-line-length = 120\n")
+
+    # Act & Assert
+    assert find_config_file(tmp_path) is None
+
+
+def test_config_file_sets_option_defaults(tmp_path):
+    # Arrange
+    config = tmp_path / "docraise.cfg"
+    config.write_text("[docraise]\ndocstring-style = invalid\n")
+    sample = tmp_path / "sample.py"
+    sample.write_text(raised_not_documented["raise value error class"][0])
+
+    # Act
+    result = CliRunner().invoke(main, ["--config", str(config), "--no-cache", str(sample)])
+    overridden = CliRunner().invoke(
+        main, ["--config", str(config), "--docstring-style", "google", "--no-cache", str(sample)]
+    )
+
+    # Assert
+    assert result.exit_code == 2
+    assert "invalid" in result.output
+    assert overridden.exit_code == 1
+    assert "DR001" in overridden.output
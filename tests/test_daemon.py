@@ -0,0 +1,138 @@
+import os
+import threading
+
+import pytest
+from click.testing import CliRunner
+
+from docraise.daemon import Daemon, DaemonError, request
+from docraise.main import main, process_paths
+from tests.assets.code_samples import raised_documented, raised_not_documented
+
+FAILING = 'def check(a, b):\n    """Check.\n\n    Raises:\n        ValueError: Never.\n    """\n    raise (a or b)()\n'
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    (tmp_path / "ok.py").write_text(raised_documented["raise value error class"])
+    (tmp_path / "bad.py").write_text(raised_not_documented["raise value error class"][0])
+    socket_path = tmp_path / "daemon.sock"
+    server = Daemon([str(tmp_path)], discover=process_paths)
+    ready = threading.Event()
+    thread = threading.Thread(target=server.serve, args=(socket_path, 0, ready))
+    thread.start()
+    ready.wait(10)
+    yield server, socket_path
+    request(socket_path, {"command": "shutdown"})
+    thread.join(10)
+
+
+def test_only_changed_files_are_reanalyzed(tmp_path, daemon):
+    # Arrange
+    _, socket_path = daemon
+    bad = tmp_path / "bad.py"
+
+    # Act
+    warm = request(socket_path, {"command": "check", "paths": [str(bad)]})
+    bad.write_text(raised_documented["raise value error class"] + "\n")
+    changed = request(socket_path, {"command": "check", "paths": [str(tmp_path)]})
+
+    # Assert
+    assert warm["reanalyzed"] == 0
+    assert [code for _, _, code, _ in warm["violations"]] == ["DR001"]
+    assert changed["reanalyzed"] == 1
+    assert changed["violations"] == []
+
+
+def test_syntax_errors_are_reported(tmp_path, daemon):
+    # Arrange
+    _, socket_path = daemon
+    broken = tmp_path / "broken.py"
+    broken.write_text("def f(:\n    raise ValueError()\n")
+
+    # Act
+    response = request(socket_path, {"command": "check", "paths": [str(broken)]})
+
+    # Assert
+    assert list(response["errors"]) == [str(broken.resolve())]
+
+
+def test_analysis_failures_are_reported(tmp_path, failing_analysis):
+    # Arrange
+    failing = tmp_path / "failing.py"
+    failing.write_text(FAILING)
+    server = Daemon([str(tmp_path)], discover=process_paths, propagate=True)
+
+    # Act
+    violations, errors, _ = server.check([str(tmp_path)])
+
+    # Assert
+    assert [(v.lineno, v.code) for v in violations] == [(1, "DR902")]
+    assert violations[0].name.startswith("AssertionError: Unexpected expression")
+    assert errors == {}
+
+
+def test_client_command(tmp_path, daemon):
+    # Arrange
+    _, socket_path = daemon
+
+    # Act
+    result = CliRunner().invoke(main, ["client", "--socket", str(socket_path), str(tmp_path / "bad.py")])
+    clean = CliRunner().invoke(main, ["client", "--socket", str(socket_path), str(tmp_path / "ok.py")])
+
+    # Assert
+    assert result.exit_code == 1
+    assert "DR001" in result.output
+    assert clean.exit_code == 0
+
+
+def test_second_daemon_is_refused(tmp_path, daemon):
+    # Arrange
+    _, socket_path = daemon
+
+    # Act & Assert
+    with pytest.raises(DaemonError):
+        Daemon([str(tmp_path)], discover=process_paths).serve(socket_path, 0)
+
+
+def test_no_daemon(tmp_path):
+    # Act
+    result = CliRunner().invoke(main, ["client", "--socket", str(tmp_path / "none.sock")])
+
+    # Assert
+    assert result.exit_code == 1
+    assert "no daemon is listening" in result.output
+
+
+def test_refresh_detects_new_and_removed_files(tmp_path):
+    # Arrange
+    (tmp_path / "a.py").write_text(raised_not_documented["raise value error class"][0])
+    server = Daemon([str(tmp_path)], discover=process_paths)
+    server.refresh()
+
+    # Act
+    (tmp_path / "b.py").write_text(raised_not_documented["raise value error class"][0])
+    os.remove(tmp_path / "a.py")
+    reanalyzed = server.refresh()
+    violations, _, _ = server.check([str(tmp_path)])
+
+    # Assert
+    assert reanalyzed == 1
+    assert [v.filename for v in violations] == [str(tmp_path / "b.py")]
+
+
+def test_callers_are_reanalyzed_when_a_callee_changes(tmp_path):
+    # Arrange
+    callee = tmp_path / "callee.py"
+    callee.write_text("def load():\n    '''Load.'''\n    raise ValueError\n")
+    caller = tmp_path / "caller.py"
+    caller.write_text("from callee import load\n\n\ndef run():\n    '''Run.'''\n    return load()\n")
+    server = Daemon([str(tmp_path)], discover=process_paths, propagate=True)
+    server.refresh()
+
+    # Act
+    callee.write_text("def load():\n    '''Load.'''\n    raise KeyError\n")
+    violations, _, reanalyzed = server.check([str(caller)])
+
+    # Assert
+    assert reanalyzed == 1
+    assert [v.text for v in violations] == ['Exception "KeyError" raised but not documented']
@@ -0,0 +1,102 @@
+from click.testing import CliRunner
+
+from docraise.discovery import iter_python_files, parse_patterns
+from docraise.main import main
+from tests.assets.code_samples import raised_not_documented
+
+
+def write(path, text=""):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    return path
+
+
+def relative(paths, root):
+    return [path.relative_to(root).as_posix() for path in paths]
+
+
+def test_default_excludes_are_pruned(tmp_path):
+    # The files of a directory come before its subdirectories
+    # Arrange
+    write(tmp_path / "app" / "core.py")
+    write(tmp_path / "app" / "__init__.py")
+    write(tmp_path / "app" / "README.md")
+    write(tmp_path / ".venv" / "lib" / "site.py")
+    write(tmp_path / "node_modules" / "tool.py")
+    write(tmp_path / "build" / "lib" / "app.py")
+    write(tmp_path / "app.egg-info" / "setup.py")
+    write(tmp_path / "setup.py")
+
+    # Act
+    files = list(iter_python_files([str(tmp_path)]))
+
+    # Assert
+    assert relative(files, tmp_path.resolve()) == ["setup.py", "app/__init__.py", "app/core.py"]
+
+
+def test_exclude_patterns(tmp_path):
+    # Arrange
+    write(tmp_path / "app" / "core.py")
+    write(tmp_path / "app" / "core_test.py")
+    write(tmp_path / "app" / "fixtures" / "data.py")
+    write(tmp_path / "build" / "generated.py")
+
+    # Act
+    extended = list(iter_python_files([str(tmp_path)], extend_exclude=["*_test.py", "app/fixtures"]))
+    replaced = list(iter_python_files([str(tmp_path)], exclude=["fixtures"]))
+
+    # Assert
+    root = tmp_path.resolve()
+    assert relative(extended, root) == ["app/core.py"]
+    assert relative(replaced, root) == ["app/core.py", "app/core_test.py", "build/generated.py"]
+
+
+def test_gitignore(tmp_path):
+    # Arrange
+    (tmp_path / ".git").mkdir()
+    write(tmp_path / ".gitignore", "# Generated\n/generated/\n*_pb2.py\n!keep_pb2.py\n")
+    write(tmp_path / "generated" / "models.py")
+    write(tmp_path / "app" / "generated" / "models.py")
+    write(tmp_path / "app" / "api_pb2.py")
+    write(tmp_path / "app" / "keep_pb2.py")
+    write(tmp_path / "app" / "local" / ".gitignore", "scratch.py\n")
+    write(tmp_path / "app" / "local" / "scratch.py")
+    write(tmp_path / "app" / "scratch.py")
+
+    # Act
+    files = list(iter_python_files([str(tmp_path / "app")]))
+    everything = list(iter_python_files([str(tmp_path / "app")], gitignore=False))
+
+    # Assert
+    root = tmp_path.resolve()
+    assert relative(files, root) == ["app/keep_pb2.py", "app/scratch.py", "app/generated/models.py"]
+    assert len(everything) == 5
+
+
+def test_overlapping_paths_are_deduplicated(tmp_path):
+    # Arrange
+    core = write(tmp_path / "app" / "core.py")
+    write(tmp_path / "app" / "utils.py")
+
+    # Act
+    files = list(iter_python_files([str(tmp_path), str(tmp_path / "app"), str(core)]))
+
+    # Assert
+    assert relative(files, tmp_path.resolve()) == ["app/core.py", "app/utils.py"]
+
+
+def test_exclude_option(tmp_path):
+    # Arrange
+    write(tmp_path / "app" / "core.py")
+    write(tmp_path / "vendor" / "lib.py", raised_not_documented["raise value error class"][0])
+
+    # Act
+    result = CliRunner().invoke(main, ["--no-cache", str(tmp_path)])
+    excluded = CliRunner().invoke(
+        main, ["--no-cache", "--extend-exclude", "vendor, *.pyi", str(tmp_path)]
+    )
+
+    # Assert
+    assert result.exit_code == 1
+    assert excluded.exit_code == 0
+    assert parse_patterns("vendor,\n  *.pyi") == ["vendor", "*.pyi"]
@@ -0,0 +1,110 @@
+import pytest
+
+from docraise.docstrings import DocstringCache
+from docraise.stats import Stats
+
+
+@pytest.mark.parametrize("docstring", [
+    None,
+    "",
+    "Add a and b.",
+    "Add a and b.\n\nArgs:\n    a: first\n    b: second\n\nReturns:\n    The sum.",
+])
+def test_docstring_without_raises_section_is_skipped(docstring):
+    # Arrange
+    cache = DocstringCache()
+
+    # Act
+    documented = cache.parse(docstring).exceptions
+
+    # Assert
+    assert documented == ()
+    assert (cache.skipped, cache.misses) == (1, 0)
+
+
+@pytest.mark.parametrize("docstring, expected", [
+    ("Divide.\n\nRaises:\n    ValueError: if b is zero", ("ValueError",)),
+    ("Divide.\n\nExceptions:\n    ValueError: if b is zero", ("ValueError",)),
+    ("Divide.\n\n:raises ValueError: if b is zero", ("ValueError",)),
+    ("Divide.\n\n@raise ValueError: if b is zero", ("ValueError",)),
+    ("Divide.\n\nRaises\n------\nValueError\n    if b is zero", ("ValueError",)),
+    ("Divide.\n\nWarns\n-----\nUserWarning\n    if b is zero", ("UserWarning",)),
+])
+def test_raises_sections_are_parsed(docstring, expected):
+    # Arrange
+    cache = DocstringCache()
+
+    # Act
+    documented = cache.parse(docstring).exceptions
+
+    # Assert
+    assert documented == expected
+    assert cache.misses == 1
+
+
+def test_repeated_docstring_is_memoized():
+    # Arrange
+    cache = DocstringCache()
+    docstring = "Divide.\n\nRaises:\n    ValueError: if b is zero"
+
+    # Act
+    first = cache.parse(docstring).exceptions
+    second = cache.parse(docstring).exceptions
+
+    # Assert
+    assert first == second == ("ValueError",)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_least_recently_used_docstring_is_evicted():
+    # Arrange
+    cache = DocstringCache(maxsize=2)
+    a, b, c = (f"{name}.\n\nRaises:\n    ValueError: error" for name in "abc")
+    cache.parse(a)
+    cache.parse(b)
+    cache.parse(a)
+
+    # Act
+    cache.parse(c)
+    cache.parse(a)
+    cache.parse(b)
+
+    # Assert
+    assert (cache.hits, cache.misses) == (2, 4)
+
+
+def test_stats_format_reports_rates():
+    # Arrange
+    stats = Stats()
+
+    # Act
+    stats.update({"files": 2, "functions": 4, "docstrings_skipped": 3, "docstrings_parsed": 1})
+    stats.update({"files": 1, "files_cached": 1, "docstring_cache_hits": 1})
+
+    # Assert
+    summary = stats.format()
+    assert "files: 3 (1 from cache)" in summary
+    assert "docstrings skipped: 3 (60.0%)" in summary
+    assert "docstring cache hits: 1 (50.0%)" in summary
+
+
+def test_module_docstring_style_is_detected():
+    # Arrange
+    import ast
+
+    from docstring_parser import DocstringStyle
+
+    from docraise.analyzer import STYLE_DETECTION_SAMPLES, Analyzer
+
+    function = "def f_{i}():\n    '''Do.\n\n    Raises:\n        ValueError: on error\n    '''\n    raise ValueError\n"
+    tree = ast.parse("".join(function.format(i=i) for i in range(STYLE_DETECTION_SAMPLES + 1)))
+    cache = DocstringCache()
+    analyzer = Analyzer(docstring_cache=cache)
+
+    # Act
+    violations = analyzer.validate(tree)
+
+    # Assert
+    assert violations == []
+    assert analyzer._module_style is DocstringStyle.GOOGLE
+    assert [style for _, style in cache._entries] == [DocstringStyle.AUTO, DocstringStyle.GOOGLE]
@@ -0,0 +1,84 @@
+import ast
+from types import SimpleNamespace
+
+import pytest
+
+from docraise.flake8_plugin import Plugin
+from docraise.runner import analyze_file
+from tests.assets.code_samples import raised_not_documented
+
+FAILING = 'def check(a, b):\n    """Check.\n\n    Raises:\n        ValueError: Never.\n    """\n    raise (a or b)()\n'
+
+
+def test_violations_in_flake8_format(tmp_path):
+    # Arrange
+    path = tmp_path / "module.py"
+    path.write_text(raised_not_documented["raise value error class"][0])
+    tree = ast.parse(path.read_text())
+
+    # Act
+    errors = list(Plugin(tree, str(path)).run())
+
+    # Assert
+    expected = [(v.lineno, 0, f"{v.code} {v.text}", Plugin) for v in analyze_file(path)]
+    assert errors == expected
+    assert errors[0][2].startswith("DR001 ")
+
+
+def test_docstring_style_option():
+    # Arrange
+    tree = ast.parse('def f():\n    """Do nothing.\n\n    Raises:\n        KeyError: never\n    """\n')
+
+    # Act
+    Plugin.parse_options(SimpleNamespace(docraise_docstring_style="rest"))
+    rest = list(Plugin(tree, "module.py").run())
+    Plugin.parse_options(SimpleNamespace(docraise_docstring_style="google"))
+    google = list(Plugin(tree, "module.py").run())
+    Plugin.parse_options(SimpleNamespace(docraise_docstring_style="auto"))
+
+    # Assert
+    assert rest == []
+    assert [message for _, _, message, _ in google] == ['DR002 Exception "KeyError" documented but never raised']
+
+
+def test_files_without_markers_are_not_traversed(monkeypatch):
+    # Arrange
+    source = "def f():\n    return 1\n"
+    monkeypatch.setattr(Plugin, "_analyzer", None)
+
+    # Act
+    errors = list(Plugin(ast.parse(source), "module.py", source.splitlines(keepends=True)).run())
+
+    # Assert
+    assert errors == []
+
+
+def test_analysis_failures_are_reported(failing_analysis):
+    # Act
+    errors = list(Plugin(ast.parse(FAILING), "module.py").run())
+
+    # Assert
+    assert [(line, message.split(" (")[0]) for line, _, message, _ in errors] == [
+        (1, "DR902 Analysis failed: AssertionError: Unexpected expression")
+    ]
+
+
+def test_flake8_reports_every_docraise_code(tmp_path, capsys, failing_analysis):
+    # Arrange
+    application = pytest.importorskip("flake8.main.application")
+    config = tmp_path / "setup.cfg"
+    # The entry point of setup.py, registered as a local plugin so docraise need not be installed
+    config.write_text("[flake8:local-plugins]\nextension =\n    DR = docraise.flake8_plugin:Plugin\n")
+    failing = tmp_path / "failing.py"
+    failing.write_text(FAILING)
+    module = tmp_path / "module.py"
+    module.write_text(raised_not_documented["raise value error class"][0])
+    app = application.Application()
+
+    # Act
+    app.run(["--config", str(config), "-j1", "--docraise-docstring-style=auto", str(failing), str(module)])
+
+    # Assert
+    output = capsys.readouterr().out
+    assert [line.split(": ")[1].split()[0] for line in output.splitlines()] == ["DR902", "DR001"]
+    assert app.result_count == 2
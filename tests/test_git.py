@@ -0,0 +1,148 @@
+import os
+import subprocess
+import textwrap
+
+import pytest
+from click.testing import CliRunner
+
+from docraise.git import GitError, changed_lines, parse_diff
+from docraise.main import main
+
+ORIGINAL = textwrap.dedent("""
+def first():
+    '''First.'''
+    raise ValueError
+
+
+def second():
+    '''Second.'''
+    return 2
+""")
+
+MODIFIED = ORIGINAL.replace("return 2", "raise KeyError")
+
+
+def git(repo, *args):
+    env = dict(os.environ, GIT_AUTHOR_NAME="test", GIT_AUTHOR_EMAIL="test@example.com",
+               GIT_COMMITTER_NAME="test", GIT_COMMITTER_EMAIL="test@example.com")
+    subprocess.run(["git", *args], cwd=repo, env=env, check=True, capture_output=True)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    git(tmp_path, "init", "-q")
+    (tmp_path / "module.py").write_text(ORIGINAL)
+    (tmp_path / "untouched.py").write_text(ORIGINAL)
+    git(tmp_path, "add", ".")
+    git(tmp_path, "commit", "-q", "-m", "initial")
+    (tmp_path / "module.py").write_text(MODIFIED)
+    return tmp_path.resolve()
+
+
+def test_parse_diff(tmp_path):
+    # Arrange
+    diff = textwrap.dedent("""\
+        diff --git a/pkg/a.py b/pkg/a.py
+        --- a/pkg/a.py
+        +++ b/pkg/a.py
+        @@ -3 +3 @@ def f():
+        @@ -10,2 +10,4 @@ def g():
+        @@ -20,3 +21,0 @@ def h():
+        diff --git a/b.py b/b.py
+        --- a/b.py
+        +++ /dev/null
+        @@ -1,2 +0,0 @@
+    """)
+
+    # Act
+    changed = parse_diff(diff, tmp_path)
+
+    # Assert
+    assert changed == {tmp_path / "pkg" / "a.py": [(3, 3), (10, 13), (21, 22)]}
+
+
+def test_parse_diff_unusual_names(tmp_path):
+    # Arrange
+    diff = (
+        "+++ b/a b.py\t\n"
+        "@@ -1 +1 @@\n"
+        '+++ "b/tab\\there\\303\\251.py"\n'
+        "@@ -2 +2 @@\n"
+    )
+
+    # Act
+    changed = parse_diff(diff, tmp_path)
+
+    # Assert
+    assert changed == {tmp_path / "a b.py": [(1, 1)], tmp_path / "tab\there\u00e9.py": [(2, 2)]}
+
+
+def test_changed_lines_ignores_the_prefix_config(repo):
+    # Arrange
+    (repo / "a b.py").write_text(ORIGINAL)
+    git(repo, "add", "a b.py")
+    git(repo, "commit", "-q", "-m", "space")
+    (repo / "a b.py").write_text(MODIFIED)
+    git(repo, "config", "diff.noprefix", "true")
+
+    # Act
+    changed = changed_lines(cwd=repo)
+
+    # Assert
+    assert changed == {repo / "module.py": [(9, 9)], repo / "a b.py": [(9, 9)]}
+
+
+def test_changed_lines(repo):
+    # Act
+    working_tree = changed_lines(cwd=repo)
+    staged_before = changed_lines(staged=True, cwd=repo)
+    git(repo, "add", "module.py")
+    staged_after = changed_lines(staged=True, cwd=repo)
+    against_head = changed_lines("HEAD", cwd=repo)
+
+    # Assert
+    assert working_tree == {repo / "module.py": [(9, 9)]}
+    assert staged_before == {}
+    assert staged_after == working_tree == against_head
+
+
+def test_unknown_ref(repo):
+    # Act & Assert
+    with pytest.raises(GitError):
+        changed_lines("does-not-exist", cwd=repo)
+
+
+def test_only_changed_functions_are_reported(repo, monkeypatch):
+    # Arrange
+    monkeypatch.chdir(repo)
+
+    # Act
+    full = CliRunner().invoke(main, ["--no-cache", "-j1", "."])
+    incremental = CliRunner().invoke(main, ["--no-cache", "-j1", "--diff-against", "HEAD"])
+
+    # Assert
+    assert full.output.count("DR001") == 3
+    assert incremental.exit_code == 1
+    assert incremental.output.splitlines() == [
+        f"{repo / 'module.py'}:7: \033[31mDR001\033[0m Exception \"KeyError\" raised but not documented"
+    ]
+
+
+def test_changes_outside_the_working_directory_are_reported(repo, monkeypatch):
+    # Arrange
+    (repo / "pkg").mkdir()
+    (repo / "pkg" / "nested.py").write_text(ORIGINAL)
+    git(repo, "add", "pkg")
+    git(repo, "commit", "-q", "-m", "nested")
+    (repo / "pkg" / "nested.py").write_text(MODIFIED)
+    (repo / "sub").mkdir()
+    monkeypatch.chdir(repo / "sub")
+
+    # Act
+    changed = changed_lines("HEAD")
+    result = CliRunner().invoke(main, ["--no-cache", "-j1", "--diff-against", "HEAD", ".."])
+
+    # Assert
+    assert changed == {repo / "module.py": [(9, 9)], repo / "pkg" / "nested.py": [(9, 9)]}
+    assert result.exit_code == 1
+    assert result.output.count("DR001") == 2
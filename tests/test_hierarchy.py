@@ -0,0 +1,160 @@
+import ast
+import textwrap
+
+from click.testing import CliRunner
+
+from docraise.analyzer import Analyzer
+from docraise.hierarchy import ExceptionHierarchy
+from docraise.main import main
+from docraise.propagation import summarize_module
+
+ERRORS = textwrap.dedent("""
+class Error(Exception):
+    pass
+
+
+class ConfigError(Error):
+    pass
+
+
+class MissingKeyError(ConfigError, KeyError):
+    pass
+""")
+
+CONFIG = textwrap.dedent("""
+from .errors import MissingKeyError
+
+
+def open_config(path):
+    '''Open.
+
+    Raises:
+        OSError: if the file cannot be read
+    '''
+    raise FileNotFoundError(path)
+
+
+def get(config, key):
+    '''Get.
+
+    Raises:
+        Error: if the key is missing
+    '''
+    raise MissingKeyError(key)
+""")
+
+
+def test_builtin_hierarchy():
+    # Arrange
+    hierarchy = ExceptionHierarchy.build({})
+
+    # Act & Assert
+    assert hierarchy.is_subclass("FileNotFoundError", "OSError")
+    assert hierarchy.is_subclass("FileNotFoundError", "Exception")
+    assert hierarchy.is_subclass("ValueError", "ValueError")
+    assert not hierarchy.is_subclass("OSError", "FileNotFoundError")
+    assert not hierarchy.is_subclass("Unknown", "Exception")
+
+
+def test_project_hierarchy():
+    # Arrange
+    summary = summarize_module(ast.parse(ERRORS))
+
+    # Act
+    hierarchy = ExceptionHierarchy.from_summaries([summary])
+
+    # Assert
+    assert summary.classes == {
+        "Error": ["Exception"],
+        "ConfigError": ["Error"],
+        "MissingKeyError": ["ConfigError", "KeyError"],
+    }
+    assert hierarchy.is_subclass("MissingKeyError", "Error")
+    assert hierarchy.is_subclass("MissingKeyError", "LookupError")
+    assert hierarchy.is_subclass("ConfigError", "BaseException")
+    assert not hierarchy.is_subclass("ConfigError", "KeyError")
+
+
+def test_cyclic_bases_are_ignored():
+    # Arrange & Act
+    hierarchy = ExceptionHierarchy.build({"A": ["B"], "B": ["A", "C"], "C": []}, builtin=False)
+
+    # Assert
+    assert hierarchy.ancestors["A"] == {"B", "C"}
+    assert hierarchy.is_subclass("B", "C")
+
+
+def test_subset_and_json_round_trip():
+    # Arrange
+    hierarchy = ExceptionHierarchy.from_summaries([summarize_module(ast.parse(ERRORS))])
+
+    # Act
+    subset = hierarchy.subset(["MissingKeyError", "Unknown", None])
+    restored = ExceptionHierarchy.from_json(subset.to_json())
+
+    # Assert
+    assert list(subset.ancestors) == ["MissingKeyError"]
+    assert restored == subset
+    assert restored.is_subclass("MissingKeyError", "Exception")
+
+
+def test_analyzer_accepts_documented_base_classes():
+    # Arrange
+    hierarchy = ExceptionHierarchy.from_summaries(
+        [summarize_module(ast.parse(ERRORS)), summarize_module(ast.parse(CONFIG))]
+    )
+    tree = ast.parse(CONFIG)
+
+    # Act
+    exact = Analyzer().validate(tree)
+    subclass_aware = Analyzer().validate(tree, hierarchy=hierarchy)
+
+    # Assert
+    assert sorted(v.code for v in exact) == ["DR001", "DR001", "DR002", "DR002"]
+    assert subclass_aware == []
+
+
+def test_allow_subclass_docs_option(tmp_path):
+    # Arrange
+    package = tmp_path / "package"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    (package / "errors.py").write_text(ERRORS)
+    (package / "config.py").write_text(CONFIG)
+    cache_dir = str(tmp_path / "cache")
+
+    # Act
+    default = CliRunner().invoke(main, ["--cache-dir", cache_dir, "-j1", str(package)])
+    allowed = CliRunner().invoke(
+        main, ["--cache-dir", cache_dir, "-j1", "--allow-subclass-docs", str(package)]
+    )
+    cached = CliRunner().invoke(
+        main, ["--cache-dir", cache_dir, "-j1", "--allow-subclass-docs", str(package)]
+    )
+
+    # Assert
+    assert default.exit_code == 1
+    assert allowed.exit_code == 0, allowed.output
+    assert cached.exit_code == 0, cached.output
+
+
+def test_allow_subclass_docs_in_nested_functions(tmp_path):
+    # Arrange
+    (tmp_path / "nested.py").write_text(textwrap.dedent("""
+    def outer(path):
+        def open_config():
+            '''Open.
+
+            Raises:
+                OSError: if the file cannot be read
+            '''
+            raise FileNotFoundError(path)
+
+        return open_config
+    """))
+
+    # Act
+    result = CliRunner().invoke(main, ["--no-cache", "-j1", "--allow-subclass-docs", str(tmp_path)])
+
+    # Assert
+    assert result.exit_code == 0, result.output
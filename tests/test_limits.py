@@ -0,0 +1,165 @@
+import multiprocessing
+import os
+import signal
+import time
+
+import pytest
+
+from docraise import runner
+from docraise.limits import FileTimeout, RunLimits, resident_memory, time_limit
+from docraise.runner import _map_files, iter_results
+from docraise.stats import Stats
+
+BROKEN = "def check(:\n    raise ValueError()\n"
+FAILING = 'def check(a, b):\n    """Check.\n\n    Raises:\n        ValueError: Never.\n    """\n    raise (a or b)()\n'
+OK = "def check():\n    raise ValueError()\n"
+
+
+def _crash_on_three(item):
+    if item == 3:
+        os._exit(1)
+    return item * 2
+
+
+def _stall_on_three(item):
+    if item == 3:
+        time.sleep(60)
+    return item * 2
+
+
+def _pid(item):
+    return os.getpid()
+
+
+def _fallback(item, error):
+    return type(error).__name__
+
+
+def test_time_limit_interrupts_the_block():
+    # Act
+    with pytest.raises(FileTimeout):
+        with time_limit(0.05):
+            time.sleep(5)
+
+    # Assert
+    assert signal.getitimer(signal.ITIMER_REAL) == (0.0, 0.0)
+
+
+def test_time_limit_restores_a_running_timer():
+    # Arrange
+    previous = signal.signal(signal.SIGALRM, lambda signum, frame: None)
+    signal.setitimer(signal.ITIMER_REAL, 30)
+
+    # Act
+    try:
+        with time_limit(1):
+            pass
+        remaining, _ = signal.getitimer(signal.ITIMER_REAL)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+    # Assert
+    assert 25 < remaining <= 30
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_errors_become_diagnostics(tmp_path, jobs, failing_analysis):
+    # Arrange
+    paths = []
+    for i, source in enumerate([BROKEN, FAILING, OK] * 4):
+        path = tmp_path / f"module_{i}.py"
+        path.write_text(source + f"\n# {i}\n")
+        paths.append(path)
+    stats = Stats()
+
+    # Act
+    results = list(iter_results(paths, jobs=jobs, stats=stats))
+
+    # Assert
+    assert [path for path, _ in results] == paths
+    assert [[v.code for v in violations] for _, violations in results[:3]] == [["DR901"], ["DR902"], ["DR001"]]
+    assert results[0][1][0].text == "File could not be read or parsed: invalid syntax"
+    assert results[1][1][0].name.startswith("AssertionError: Unexpected expression")
+    assert stats.counters["files_failed"] == 8
+
+
+def test_files_over_the_time_budget_are_reported(tmp_path, monkeypatch):
+    # Arrange
+    slow, fast = tmp_path / "slow.py", tmp_path / "fast.py"
+    slow.write_text(OK)
+    fast.write_text(OK + "\n")
+    analyze_task = runner._analyze_task
+
+    def stall(task, *args):
+        if task.path == slow:
+            time.sleep(5)
+        return analyze_task(task, *args)
+
+    monkeypatch.setattr(runner, "_analyze_task", stall)
+
+    # Act
+    results = dict(iter_results([slow, fast], limits=RunLimits(file_timeout=0.05)))
+
+    # Assert
+    assert [v.text for v in results[slow]] == ["Analysis exceeded the time budget of 0.05 seconds"]
+    assert [v.code for v in results[fast]] == ["DR001"]
+
+
+def test_dead_workers_are_replaced():
+    # Act
+    results = list(_map_files(_crash_on_three, range(20), jobs=2, fallback=_fallback))
+
+    # Assert
+    assert results == [(i, "BrokenProcessPool" if i == 3 else i * 2) for i in range(20)]
+
+
+@pytest.mark.parametrize("fn", [_crash_on_three, _stall_on_three], ids=["crash", "stall"])
+def test_broken_pools_are_joined(monkeypatch, fn):
+    # Arrange
+    monkeypatch.setattr(runner, "STALL_GRACE", 0.2)
+
+    # Act
+    results = list(_map_files(fn, range(20), jobs=2, limits=RunLimits(file_timeout=0.05), fallback=_fallback))
+
+    # Assert
+    assert len(results) == 20
+    assert multiprocessing.active_children() == []
+
+
+def test_dead_workers_abort_the_run_without_fallback():
+    # Act
+    with pytest.raises(runner.BrokenProcessPool):
+        list(_map_files(_crash_on_three, range(20), jobs=2))
+
+
+def test_stalled_workers_are_killed(monkeypatch):
+    # Arrange
+    monkeypatch.setattr(runner, "STALL_GRACE", 0.2)
+    start = time.monotonic()
+
+    # Act
+    results = list(
+        _map_files(_stall_on_three, range(10), jobs=2, limits=RunLimits(file_timeout=0.05), fallback=_fallback)
+    )
+
+    # Assert
+    assert results == [(i, "FileTimeout" if i == 3 else i * 2) for i in range(10)]
+    assert time.monotonic() - start < 30
+
+
+@pytest.mark.parametrize(
+    "limits", [RunLimits(max_files_per_worker=8), RunLimits(max_worker_memory=1)], ids=["files", "memory"]
+)
+def test_workers_are_recycled(limits):
+    # Act
+    results = list(_map_files(_pid, range(200), jobs=2, limits=limits))
+
+    # Assert
+    assert [i for i, _ in results] == list(range(200))
+    assert len({pid for _, pid in results}) > 2
+
+
+def test_resident_memory():
+    # Assert
+    assert resident_memory() > 1
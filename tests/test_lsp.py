@@ -0,0 +1,272 @@
+import io
+import json
+import os
+import textwrap
+import threading
+import time
+
+from docraise.lsp import LanguageServer, read_message, write_message
+
+URI = "file:///project/module.py"
+
+SOURCE = textwrap.dedent("""
+import json
+
+
+def load(text):
+    '''Load.'''
+    raise ValueError(text)
+
+
+class Parser:
+    def parse(self, text):
+        '''
+        Parse.
+
+        Raises:
+            KeyError: if a key is missing
+        '''
+        return json.loads(text)
+""")
+
+
+def request(id, method, params=None):
+    return {"jsonrpc": "2.0", "id": id, "method": method, "params": params or {}}
+
+
+def notification(method, params):
+    return {"jsonrpc": "2.0", "method": method, "params": params}
+
+
+def change(text, version):
+    return notification(
+        "textDocument/didChange",
+        {"textDocument": {"uri": URI, "version": version}, "contentChanges": [{"text": text}]},
+    )
+
+
+def run(server, messages):
+    reader = io.BytesIO()
+    for message in messages:
+        write_message(reader, message)
+    reader.seek(0)
+    writer = io.BytesIO()
+
+    exit_code = server.serve(reader, writer)
+
+    writer.seek(0)
+    output = []
+    while True:
+        message = read_message(writer)
+        if message is None:
+            return exit_code, output
+        output.append(message)
+
+
+def diagnostics(output):
+    return [
+        [(d["range"]["start"]["line"] + 1, d["code"]) for d in m["params"]["diagnostics"]]
+        for m in output
+        if m.get("method") == "textDocument/publishDiagnostics"
+    ]
+
+
+def test_session():
+    # Arrange
+    server = LanguageServer(debounce=0)
+    edited = SOURCE.replace("raise ValueError(text)", "return text")
+    messages = [
+        request(1, "initialize", {"capabilities": {}}),
+        notification("initialized", {}),
+        notification(
+            "textDocument/didOpen",
+            {"textDocument": {"uri": URI, "languageId": "python", "version": 1, "text": SOURCE}},
+        ),
+        change(edited, 2),
+        request(2, "textDocument/hover", {}),
+        notification("textDocument/didClose", {"textDocument": {"uri": URI}}),
+        request(3, "shutdown"),
+        notification("exit", {}),
+    ]
+
+    # Act
+    exit_code, output = run(server, messages)
+
+    # Assert
+    assert exit_code == 0
+    assert output[0]["result"]["capabilities"]["textDocumentSync"]["change"] == 1
+    assert diagnostics(output) == [[(5, "DR001"), (11, "DR002")], [(11, "DR002")], []]
+    assert output[3]["error"]["code"] == -32601
+    assert output[-1] == {"jsonrpc": "2.0", "id": 3, "result": None}
+
+
+def test_only_changed_functions_are_reanalyzed():
+    # Arrange
+    server = LanguageServer(debounce=0)
+    # Insert lines above the method so its cached violations have to move
+    moved = SOURCE.replace("    raise ValueError(text)", "    if text:\n        raise ValueError(text)")
+    messages = [
+        notification(
+            "textDocument/didOpen",
+            {"textDocument": {"uri": URI, "languageId": "python", "version": 1, "text": SOURCE}},
+        ),
+        change(moved, 2),
+        change(moved.replace("import json", "import json as j"), 3),
+    ]
+
+    # Act
+    _, output = run(server, messages)
+
+    # Assert
+    assert diagnostics(output) == [
+        [(5, "DR001"), (11, "DR002")],
+        [(5, "DR001"), (12, "DR002")],
+        [(5, "DR001"), (12, "DR002")],
+    ]
+    # Open: 2 functions, edit of load: 1 function, edit of the imports: 2 functions
+    assert server.stats.counters["functions_reanalyzed"] == 5
+    assert server.stats.counters["functions_reused"] == 1
+
+
+LOCAL_IMPORT = textwrap.dedent("""
+def load(text):
+    '''Load.'''
+    from errors import NotFound as Missing
+    return text
+
+
+def parse(text):
+    '''
+    Parse.
+
+    Raises:
+        KeyError: if a key is missing
+    '''
+    raise Missing(text)
+""")
+
+
+def messages_after(edited):
+    server = LanguageServer(debounce=0)
+    messages = [
+        notification(
+            "textDocument/didOpen",
+            {"textDocument": {"uri": URI, "languageId": "python", "version": 1, "text": LOCAL_IMPORT}},
+        ),
+        change(edited, 2),
+    ]
+    _, output = run(server, messages)
+    return [
+        [d["message"] for d in m["params"]["diagnostics"] if d["code"] == "DR001"]
+        for m in output
+        if m.get("method") == "textDocument/publishDiagnostics"
+    ]
+
+
+def test_removed_import_reanalyzes_the_other_functions():
+    # Act
+    messages = messages_after(LOCAL_IMPORT.replace("    from errors import NotFound as Missing\n", ""))
+
+    # Assert
+    assert messages == [
+        ['Exception "errors.NotFound" raised but not documented'],
+        ['Exception "Missing" raised but not documented'],
+    ]
+
+
+def test_deleted_function_reanalyzes_the_other_functions():
+    # Act
+    messages = messages_after(LOCAL_IMPORT[LOCAL_IMPORT.index("def parse"):])
+
+    # Assert
+    assert messages == [
+        ['Exception "errors.NotFound" raised but not documented'],
+        ['Exception "Missing" raised but not documented'],
+    ]
+
+
+def test_syntax_errors_keep_the_last_diagnostics():
+    # Arrange
+    server = LanguageServer(debounce=0)
+    messages = [
+        notification(
+            "textDocument/didOpen",
+            {"textDocument": {"uri": URI, "languageId": "python", "version": 1, "text": SOURCE}},
+        ),
+        change(SOURCE + "\ndef broken(:\n", 2),
+    ]
+
+    # Act
+    _, output = run(server, messages)
+
+    # Assert
+    assert len(diagnostics(output)) == 1
+
+
+def test_analysis_failures_are_reported(failing_analysis):
+    # Arrange
+    server = LanguageServer(debounce=0)
+    failing = SOURCE + "\n\ndef check(a, b):\n    raise (a or b)()\n"
+    messages = [
+        notification(
+            "textDocument/didOpen",
+            {"textDocument": {"uri": URI, "languageId": "python", "version": 1, "text": failing}},
+        ),
+        change(SOURCE, 2),
+    ]
+
+    # Act
+    _, output = run(server, messages)
+
+    # Assert
+    assert diagnostics(output) == [[(1, "DR902")], [(5, "DR001"), (11, "DR002")]]
+
+
+def test_message_framing():
+    # Arrange
+    stream = io.BytesIO()
+
+    # Act
+    write_message(stream, {"jsonrpc": "2.0", "method": "exit"})
+    stream.seek(0)
+
+    # Assert
+    body = json.dumps({"jsonrpc": "2.0", "method": "exit"}).encode()
+    assert stream.getvalue() == b"Content-Length: %d\r\n\r\n" % len(body) + body
+    assert read_message(stream) == {"jsonrpc": "2.0", "method": "exit"}
+    assert read_message(stream) is None
+
+
+def test_rapid_changes_are_debounced():
+    # Arrange
+    server = LanguageServer(debounce=0.05)
+    read_fd, write_fd = os.pipe()
+    writer = io.BytesIO()
+    with os.fdopen(read_fd, "rb") as reader, os.fdopen(write_fd, "wb") as client:
+        thread = threading.Thread(target=server.serve, args=(reader, writer))
+        thread.start()
+
+        # Act
+        write_message(
+            client,
+            notification(
+                "textDocument/didOpen",
+                {"textDocument": {"uri": URI, "languageId": "python", "version": 1, "text": SOURCE}},
+            ),
+        )
+        for version in range(2, 6):
+            write_message(client, change(SOURCE + "\n" * version, version))
+        time.sleep(0.5)
+        write_message(client, notification("exit", {}))
+        thread.join(10)
+
+    # Assert
+    writer.seek(0)
+    published = []
+    while True:
+        message = read_message(writer)
+        if message is None:
+            break
+        published.append(message)
+    # didOpen is analyzed at once, the four changes only once
+    assert len(published) == 2
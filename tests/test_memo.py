@@ -0,0 +1,88 @@
+import ast
+
+from docstring_parser import DocstringStyle
+
+from docraise.analyzer import Analyzer
+from docraise.memo import FunctionCache, function_key
+
+FUNCTION = '''
+def load(path):
+    """Load."""
+    def parse(text):
+        """Parse.
+
+        Raises:
+            KeyError: never
+        """
+        return text
+    raise ValueError(path)
+'''
+
+
+def validate(analyzer, source, filename="module.py"):
+    tree = ast.parse(source)
+    return [(v.lineno, v.code, v.text) for v in analyzer.validate(tree, filename, source=source.encode())]
+
+
+def test_repeated_function_is_replayed_at_its_line():
+    # Arrange
+    analyzer = Analyzer(docstring_style=DocstringStyle.GOOGLE, function_cache=FunctionCache())
+    source = FUNCTION + "\n\nx = 1\n" + FUNCTION
+
+    # Act
+    violations = validate(analyzer, source)
+
+    # Assert
+    assert violations == validate(Analyzer(DocstringStyle.GOOGLE, function_cache=FunctionCache(0)), source)
+    assert [lineno for lineno, _, _ in violations] == [4, 2, 18, 16]
+    assert analyzer.counters["functions_memoized"] == 1
+    assert analyzer.counters["functions"] == 4
+
+
+def test_memoized_across_modules_only_with_the_same_symbols():
+    # Arrange
+    cache = FunctionCache()
+    analyzer = Analyzer(docstring_style=DocstringStyle.GOOGLE, function_cache=cache)
+
+    # Act
+    validate(analyzer, FUNCTION, "a.py")
+    same = validate(analyzer, FUNCTION, "b.py")
+    imported = validate(analyzer, "from errors import ValueError\n" + FUNCTION, "c.py")
+
+    # Assert
+    assert cache.hits == 1
+    assert same == validate(Analyzer(docstring_style=DocstringStyle.GOOGLE), FUNCTION)
+    assert ('DR001', 'Exception "errors.ValueError" raised but not documented') in [
+        (code, text) for _, code, text in imported
+    ]
+
+
+def test_key_does_not_depend_on_the_line():
+    # Arrange
+    first = ast.parse(FUNCTION).body[0]
+    moved_source = "\n\n\n" + FUNCTION
+    moved = ast.parse(moved_source).body[0]
+
+    # Act
+    key = function_key(FUNCTION.encode().splitlines(keepends=True), first, b"context")
+    moved_key = function_key(moved_source.encode().splitlines(keepends=True), moved, b"context")
+    other_key = function_key(FUNCTION.encode().splitlines(keepends=True), first, b"other")
+
+    # Assert
+    assert key == moved_key
+    assert key != other_key
+
+
+def test_lru_eviction():
+    # Arrange
+    cache = FunctionCache(maxsize=1)
+    analyzer = Analyzer(function_cache=cache)
+    other = FUNCTION.replace("ValueError", "TypeError")
+
+    # Act
+    validate(analyzer, FUNCTION)
+    validate(analyzer, other)
+    validate(analyzer, FUNCTION)
+
+    # Assert
+    assert cache.hits == 0
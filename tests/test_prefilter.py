@@ -0,0 +1,71 @@
+import pytest
+
+from docraise import prefilter
+from docraise.prefilter import may_have_violations, parse_source, read_source
+from docraise.runner import analyze_file
+from docraise.stats import Stats
+
+
+@pytest.mark.parametrize(
+    "source, expected",
+    [
+        (b"def f():\n    return 1\n", False),
+        (b"def f():\n    try:\n        g()\n    except ValueError:\n        pass\n", False),
+        (b"def f():\n    raise ValueError()\n", True),
+        (b'def f():\n    """\n    Raises:\n        KeyError: never\n    """\n', True),
+        (b'def f():\n    """:except KeyError: never"""\n', True),
+        (b'def f():\n    """@raise KeyError: never"""\n', True),
+        (b'def f():\n    """R\\x61ises:\n        KeyError: never"""\n', True),
+        (b"# -*- coding: latin-1 -*-\ndef f():\n    return '\xe9'\n", False),
+        (b"# -*- coding: cp500 -*-\n", True),
+    ],
+    ids=["plain", "try-except", "raise", "google", "rest", "epydoc", "escape", "latin-1", "ebcdic"],
+)
+def test_may_have_violations(source, expected):
+    # Act & Assert
+    assert may_have_violations(source) is expected
+
+
+def test_prefiltered_file_is_not_parsed(tmp_path):
+    # Arrange
+    path = tmp_path / "plain.py"
+    # Not even the syntax error is noticed
+    path.write_text("def f(:\n    return 1\n")
+    stats = Stats()
+
+    # Act
+    violations = analyze_file(path, stats=stats)
+
+    # Assert
+    assert violations == []
+    assert stats.counters["files_prefiltered"] == 1
+    assert "files skipped by the prefilter: 1 (100.0%)" in stats.format()
+
+
+def test_large_files_are_mapped(tmp_path, monkeypatch):
+    # Arrange
+    monkeypatch.setattr(prefilter, "MMAP_THRESHOLD", 16)
+    plain = tmp_path / "plain.py"
+    plain.write_text("def f():\n    return 1\n" * 10)
+    raising = tmp_path / "raising.py"
+    raising.write_text("def f():\n    raise ValueError()\n" * 10)
+
+    # Act
+    skipped = read_source(plain)
+    content, size = read_source(raising)
+
+    # Assert
+    assert skipped == (None, plain.stat().st_size)
+    assert content == raising.read_bytes()
+    assert size == len(content)
+
+
+def test_parse_source_honours_the_encoding_cookie():
+    # Arrange
+    source = "# -*- coding: latin-1 -*-\nNAME = 'caf\xe9'\n".encode("latin-1")
+
+    # Act
+    tree = parse_source(source, "module.py")
+
+    # Assert
+    assert tree.body[0].value.value == "caf\xe9"
@@ -0,0 +1,200 @@
+import ast
+import textwrap
+
+from click.testing import CliRunner
+
+from docraise.analyzer import Analyzer
+from docraise.hierarchy import ExceptionHierarchy
+from docraise.main import main
+from docraise.propagation import CATCH_ALL, CallSite, ModuleSummary, _strongly_connected_components, \
+    propagate, summarize_module
+
+UTIL = textwrap.dedent("""
+def load(path):
+    '''Load.'''
+    raise FileNotFoundError(path)
+
+
+def parse(text):
+    '''Parse.'''
+    raise ValueError(text)
+""")
+
+SERVICE = textwrap.dedent("""
+from . import util
+from .util import parse
+
+
+class Service:
+    def read(self, path):
+        '''Read.
+
+        Raises:
+            FileNotFoundError: if the file is missing
+        '''
+        return util.load(path)
+
+    def run(self, path):
+        '''Run.'''
+        try:
+            text = self.read(path)
+        except FileNotFoundError:
+            return None
+        return parse(text)
+
+    def safe(self, path):
+        '''Safe.'''
+        try:
+            return self.run(path)
+        except Exception:
+            return None
+
+
+def ping(n):
+    '''Ping.'''
+    if n:
+        return pong(n - 1)
+    raise TimeoutError
+
+
+def pong(n):
+    '''Pong.'''
+    return ping(n)
+""")
+
+
+def write_package(tmp_path):
+    package = tmp_path / "pkg"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    (package / "util.py").write_text(UTIL)
+    (package / "service.py").write_text(SERVICE)
+    return package
+
+
+def test_summarize_module():
+    # Act
+    summary = summarize_module(ast.parse(SERVICE))
+
+    # Assert
+    functions = {f.name: f for f in summary.functions}
+    assert list(functions) == ["Service.read", "Service.run", "Service.safe", "ping", "pong"]
+    assert functions["Service.run"].calls == (
+        CallSite("self.read", ("FileNotFoundError",)), CallSite("parse", ()),
+    )
+    assert functions["Service.safe"].calls == (CallSite("self.run", (CATCH_ALL,)),)
+    assert functions["ping"].raises == ("TimeoutError",)
+    assert summary.imports == {"util": ".util", "parse": ".util.parse"}
+    assert summary.classes == {"Service": []}
+    assert ModuleSummary.from_json(summary.to_json()) == summary
+
+
+def test_nested_functions_are_summarized(tmp_path):
+    # Arrange
+    source = textwrap.dedent("""
+    def load(path):
+        raise FileNotFoundError(path)
+
+
+    class Loader:
+        def run(self, path):
+            def read():
+                return load(path)
+
+            if not path:
+                raise ValueError(path)
+            return read()
+    """)
+    summaries = {tmp_path / "module.py": summarize_module(ast.parse(source))}
+
+    # Act
+    propagated = propagate(summaries)
+
+    # Assert
+    functions = {f.name: f for f in summaries[tmp_path / "module.py"].functions}
+    assert list(functions) == ["load", "Loader.run.<locals>.read", "Loader.run"]
+    assert functions["Loader.run"].raises == ("ValueError",)
+    assert functions["Loader.run.<locals>.read"].calls == (CallSite("load", ()),)
+    assert propagated == {tmp_path / "module.py": {8: ("FileNotFoundError",)}}  # read: load
+
+
+def test_propagate(tmp_path):
+    # Arrange
+    package = write_package(tmp_path)
+    summaries = {path: summarize_module(ast.parse(path.read_text())) for path in package.glob("*.py")}
+
+    # Act
+    propagated = propagate(summaries)
+
+    # Assert
+    assert package / "util.py" not in propagated
+    assert propagated[package / "service.py"] == {
+        7: ("FileNotFoundError",),  # read: util.load
+        15: ("ValueError",),  # run: parse, FileNotFoundError of self.read is caught
+        38: ("TimeoutError",),  # pong: ping, through the recursion
+    }
+
+
+def test_handlers_catch_subclasses(tmp_path):
+    # Arrange
+    source = textwrap.dedent("""
+    def load(path):
+        raise FileNotFoundError(path)
+
+
+    def read(path):
+        try:
+            return load(path)
+        except OSError:
+            return None
+    """)
+    summaries = {tmp_path / "module.py": summarize_module(ast.parse(source))}
+    hierarchy = ExceptionHierarchy.from_summaries(summaries.values())
+
+    # Act
+    exact = propagate(summaries)
+    subclasses = propagate(summaries, hierarchy)
+
+    # Assert
+    assert exact == {tmp_path / "module.py": {6: ("FileNotFoundError",)}}
+    assert subclasses == {}
+
+
+def test_propagated_exceptions_are_checked():
+    # Arrange
+    tree = ast.parse(SERVICE)
+    propagated = {7: ("FileNotFoundError",), 15: ("ValueError",)}
+
+    # Act
+    violations = Analyzer().validate(tree, propagated=propagated)
+
+    # Assert
+    assert [(v.lineno, v.code, v.text) for v in violations if v.lineno < 30] == [
+        (15, "DR001", 'Exception "ValueError" raised but not documented'),
+    ]
+
+
+def test_strongly_connected_components():
+    # Arrange
+    graph = [[1], [2], [0, 3], [], [4]]
+
+    # Act
+    components = _strongly_connected_components(graph)
+
+    # Assert
+    assert sorted(map(sorted, components)) == [[0, 1, 2], [3], [4]]
+    assert components.index([3]) < [sorted(c) for c in components].index([0, 1, 2])
+
+
+def test_propagate_option(tmp_path):
+    # Arrange
+    package = write_package(tmp_path)
+
+    # Act
+    default = CliRunner().invoke(main, ["--no-cache", "-j1", str(package)])
+    propagated = CliRunner().invoke(main, ["--no-cache", "-j1", "--propagate", str(package)])
+
+    # Assert
+    assert "DR002" in default.output
+    assert "DR002" not in propagated.output
+    assert 'service.py:15: \033[31mDR001\033[0m Exception "ValueError"' in propagated.output
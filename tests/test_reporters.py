@@ -0,0 +1,126 @@
+import io
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from docraise.main import main
+from docraise.reporters import REPORTERS, GithubReporter, Reporter, JsonLinesReporter, SarifReporter, TextReporter
+from docraise.violation import Violation, ViolationCodes
+
+VIOLATIONS = [
+    Violation("module.py", 3, "DR001", "KeyError"),
+    Violation("module.py", 9, "DR002", "ValueError"),
+]
+
+
+def report(reporter_class, files, buffer_size=None):
+    stream = io.StringIO()
+    with reporter_class(stream, buffer_size) as reporter:
+        for violations in files:
+            reporter.report(violations)
+    return stream.getvalue()
+
+
+def test_text_reporter_writes_one_line_per_violation():
+    # Act
+    output = report(TextReporter, [VIOLATIONS])
+
+    # Assert
+    assert output == f"{VIOLATIONS[0]}\n{VIOLATIONS[1]}\n"
+
+
+def test_jsonl_reporter_writes_one_object_per_line():
+    # Act
+    output = report(JsonLinesReporter, [VIOLATIONS[:1], [], VIOLATIONS[1:]])
+
+    # Assert
+    assert [json.loads(line) for line in output.splitlines()] == [
+        {
+            "filename": "module.py",
+            "line": 3,
+            "code": "DR001",
+            "exception": "KeyError",
+            "message": 'Exception "KeyError" raised but not documented',
+        },
+        {
+            "filename": "module.py",
+            "line": 9,
+            "code": "DR002",
+            "exception": "ValueError",
+            "message": 'Exception "ValueError" documented but never raised',
+        },
+    ]
+
+
+@pytest.mark.parametrize("files", [[], [VIOLATIONS[:1], VIOLATIONS[1:]]], ids=["empty", "two-files"])
+def test_sarif_reporter_writes_a_valid_log(files):
+    # Act
+    log = json.loads(report(SarifReporter, files, buffer_size=1))
+
+    # Assert
+    run = log["runs"][0]
+    assert log["version"] == "2.1.0"
+    assert [rule["id"] for rule in run["tool"]["driver"]["rules"]] == [code.name for code in ViolationCodes]
+    assert [
+        (
+            result["ruleId"],
+            result["locations"][0]["physicalLocation"]["artifactLocation"]["uri"],
+            result["locations"][0]["physicalLocation"]["region"]["startLine"],
+        )
+        for result in run["results"]
+    ] == [(v.code, v.filename, v.lineno) for violations in files for v in violations]
+
+
+def test_github_reporter_escapes_workflow_commands(tmp_path, monkeypatch):
+    # Arrange
+    monkeypatch.chdir(tmp_path)
+    violation = Violation(str(tmp_path / "a,b.py"), 4, "DR001", "Error\n100%")
+
+    # Act
+    output = report(GithubReporter, [[violation]])
+
+    # Assert
+    assert output == (
+        '::error file=a%2Cb.py,line=4,title=DR001::Exception "Error%0A100%25" raised but not documented\n'
+    )
+
+
+def test_output_is_buffered():
+    # Arrange
+    stream = io.StringIO()
+    reporter = TextReporter(stream, buffer_size=1024)
+
+    # Act
+    reporter.report(VIOLATIONS)
+    buffered = stream.getvalue()
+    reporter.finish()
+
+    # Assert
+    assert buffered == ""
+    assert stream.getvalue().count("\n") == 2
+
+
+def test_reporter_without_format_cannot_be_created():
+    # Arrange
+    class IncompleteReporter(Reporter):
+        pass
+
+    # Act & Assert
+    with pytest.raises(TypeError):
+        IncompleteReporter(io.StringIO())
+
+
+@pytest.mark.parametrize("output_format", list(REPORTERS))
+def test_format_option(tmp_path, output_format):
+    # Arrange
+    (tmp_path / "module.py").write_text("def f():\n    raise KeyError()\n")
+
+    # Act
+    result = CliRunner().invoke(
+        main, ["--no-cache", "-j1", "--format", output_format, str(tmp_path)]
+    )
+
+    # Assert
+    assert result.exit_code == 1
+    assert "KeyError" in result.output
@@ -0,0 +1,146 @@
+from docraise import runner
+from docraise.runner import analyze_file, iter_results
+from docraise.stats import Stats
+from tests.assets.code_samples import raised_not_documented, not_raised_documented
+
+
+def write_samples(tmp_path):
+    samples = list(raised_not_documented.values()) + list(not_raised_documented.values())
+    paths = []
+    for i, (sample, _) in enumerate(samples):
+        path = tmp_path / f"sample_{i}.py"
+        path.write_text(sample)
+        paths.append(path)
+    return paths
+
+
+def test_analyze_file(tmp_path):
+    # Arrange
+    path = tmp_path / "sample.py"
+    path.write_text(raised_not_documented["raise value error class"][0])
+
+    # Act
+    violations = analyze_file(path)
+
+    # Assert
+    assert [(v.filename, v.code) for v in violations] == [(str(path), 'DR001')]
+
+
+def test_parallel_results_match_serial(tmp_path):
+    # Arrange
+    paths = write_samples(tmp_path)
+
+    # Act
+    serial = list(iter_results(paths, jobs=1))
+    parallel = list(iter_results(paths, jobs=4))
+
+    # Assert
+    assert [path for path, _ in parallel] == paths
+    assert parallel == serial
+
+
+def test_results_are_streamed(tmp_path):
+    # Arrange
+    paths = write_samples(tmp_path)
+
+    def lazy_paths():
+        yield paths[0]
+        raise AssertionError("The second path must not be consumed yet")
+
+    # Act
+    path, violations = next(iter_results(lazy_paths(), jobs=1))
+
+    # Assert
+    assert path == paths[0]
+    assert violations
+
+
+def test_peak_memory_does_not_grow_with_file_count(tmp_path):
+    # Arrange
+    import tracemalloc
+
+    source = raised_not_documented["raise value error class"][0] * 50
+    paths = []
+    for i in range(32):
+        path = tmp_path / f"module_{i}.py"
+        path.write_text(f"MODULE_ID = {i}\n" + source)  # distinct content, so no file is deduplicated
+        paths.append(path)
+
+    def peak(files):
+        tracemalloc.start()
+        for _ in iter_results(files, jobs=1):
+            pass
+        _, peak_size = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return peak_size
+
+    # Act
+    peak(paths[:1])  # warm up caches in the imported modules
+    small = peak(paths[:8])
+    large = peak(paths)
+
+    # Assert
+    assert large < small * 1.5
+
+
+def test_identical_files_are_analyzed_once(tmp_path):
+    # Arrange
+    source = raised_not_documented["raise value error class"][0]
+    paths = []
+    for name in ["a.py", "b.py", "c.py"]:
+        path = tmp_path / name
+        path.write_text(source)
+        paths.append(path)
+    stats = Stats()
+
+    # Act
+    results = list(iter_results(paths, jobs=1, stats=stats))
+
+    # Assert
+    assert results == [(path, analyze_file(path)) for path in paths]
+    assert stats.counters["files_deduplicated"] == 2
+    assert stats.counters["files"] == 3
+    assert "duplicate files: 2 (66.7%)" in stats.format()
+
+
+def test_only_recent_contents_are_deduplicated(tmp_path, monkeypatch):
+    # Arrange
+    monkeypatch.setattr(runner, "DEDUPLICATION_SIZE", 1)
+    first = raised_not_documented["raise value error class"][0]
+    second = raised_not_documented["raise an instance of value error"][0]
+    paths = []
+    for name, source in [("a.py", first), ("b.py", first), ("c.py", second), ("d.py", first)]:
+        path = tmp_path / name
+        path.write_text(source)
+        paths.append(path)
+    stats = Stats()
+
+    # Act
+    results = list(iter_results(paths, jobs=1, stats=stats))
+
+    # Assert
+    assert results == [(path, analyze_file(path)) for path in paths]
+    assert stats.counters["files_deduplicated"] == 1
+
+
+def test_module_dependent_copies_are_analyzed_separately(tmp_path):
+    # Arrange
+    source = "class LoadError(Exception):\n    pass\n\n\ndef load():\n    '''Load.'''\n    raise LoadError\n"
+    paths = []
+    for package in ["first", "second"]:
+        (tmp_path / package).mkdir()
+        (tmp_path / package / "__init__.py").write_text("")
+        path = tmp_path / package / "loader.py"
+        path.write_text(source)
+        paths.append(path)
+    stats = Stats()
+
+    # Act
+    results = list(iter_results(paths, jobs=2, stats=stats))
+
+    # Assert
+    assert [v.text for _, violations in results for v in violations] == [
+        'Exception "first.loader.LoadError" raised but not documented',
+        'Exception "second.loader.LoadError" raised but not documented',
+    ]
+    assert stats.counters["files_deduplicated"] == 0
@@ -0,0 +1,157 @@
+import ast
+import textwrap
+
+import pytest
+
+from docraise import runner
+from docraise.analyzer import Analyzer
+from docraise.runner import AnalysisOptions, analyze_file
+from docraise.slicing import parse_lazily, slice_module
+from docraise.stats import Stats
+from docraise.symbols import SymbolTable, collect_imports
+
+SOURCE = textwrap.dedent('''
+import json
+from errors import MissingKeyError
+
+TABLE = {
+    "key": [1, 2, 3],
+}
+
+
+def plain(a):
+    """
+Not a statement:
+def fake():
+    """
+    return (a +
+1)
+
+
+@decorator(
+    "x"
+)
+def load(text):
+    """Load."""
+    raise ValueError(text)
+
+
+class Store(Base):
+    """A store."""
+
+    size = 3
+
+    def get(self, key):
+        """Get."""
+        return self.items[key]
+
+    @property
+    def first(self):
+        """
+        First.
+
+        Raises:
+            MissingKeyError: if empty
+        """
+        return self.items[0]
+
+
+class Other:
+    def run(self):
+        return 1
+''')
+
+
+def validate(tree, symbols):
+    return [(v.lineno, v.code, v.text) for v in Analyzer().validate(tree, "module.py", symbols=symbols)]
+
+
+def test_lazy_parse_finds_the_same_violations():
+    # Arrange
+    tree = ast.parse(SOURCE)
+
+    # Act
+    sliced = parse_lazily(SOURCE.encode(), "module.py")
+
+    # Assert
+    assert sliced is not None
+    assert sliced.classes == ["Store", "Other"]
+    symbols = SymbolTable(collect_imports(sliced.tree), sliced.classes, "module")
+    assert validate(sliced.tree, symbols) == validate(tree, SymbolTable.from_tree(tree, "module"))
+    assert [getattr(node, "name", None) for node in sliced.tree.body] == [None, None, "load", "Store"]
+    assert [node.name for node in sliced.tree.body[3].body] == ["first"]
+
+
+def test_lazy_parse_keeps_imports_inside_functions(tmp_path, monkeypatch):
+    # Arrange
+    monkeypatch.setattr(runner, "LAZY_PARSE_MIN_SIZE", 0)
+    path = tmp_path / "module.py"
+    path.write_text(textwrap.dedent('''
+    def setup():
+        from errors import NotFound as Missing
+        return Missing
+
+
+    class Store:
+        def reset(self):
+            import errors.codes as codes
+            return codes
+
+        def get(self, key):
+            """Get."""
+            if key:
+                raise Missing(key)
+            raise codes.Invalid(key)
+    '''))
+
+    # Act
+    lazy = analyze_file(path, AnalysisOptions(lazy_parse=True))
+    full = analyze_file(path)
+
+    # Assert
+    assert lazy == full
+    assert [v.name for v in full] == ["errors.NotFound", "errors.codes.Invalid"]
+
+
+def test_sliced_source_keeps_line_numbers():
+    # Act
+    source, _, skipped = slice_module(SOURCE)
+
+    # Assert
+    original = SOURCE.split("\n")
+    sliced = source.split("\n")
+    assert len(sliced) == len(original)
+    assert all(line in ("", original[i]) for i, line in enumerate(sliced))
+    assert sliced[original.index("def load(text):")] == "def load(text):"
+    assert skipped == sum(1 for a, b in zip(original, sliced) if a.strip() and not b)
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "def f(:\n    raise ValueError()\n",
+        "VALUES = [1, 2\n\ndef f():\n    raise ValueError()\n",
+        "@decorator\n",
+    ],
+    ids=["syntax-error", "unbalanced", "dangling-decorator"],
+)
+def test_ambiguous_modules_fall_back(source):
+    # Act & Assert
+    assert parse_lazily(source.encode(), "module.py") is None
+
+
+def test_lazy_parse_option(tmp_path, monkeypatch):
+    # Arrange
+    monkeypatch.setattr(runner, "LAZY_PARSE_MIN_SIZE", 0)
+    path = tmp_path / "module.py"
+    path.write_text(SOURCE)
+    stats = Stats()
+
+    # Act
+    lazy = analyze_file(path, AnalysisOptions(lazy_parse=True), stats=stats)
+    full = analyze_file(path)
+
+    # Assert
+    assert lazy == full
+    assert stats.counters["files_sliced"] == 1
+    assert "lazily parsed files: 1" in stats.format()
@@ -0,0 +1,68 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from docraise.defaults import STYLE_NAMES
+from docraise.docstrings import STYLES
+
+# The modules a run that analyzes nothing must not import
+HEAVY_MODULES = {"docraise.analyzer", "docraise.runner", "docraise.api", "docstring_parser", "asyncio"}
+
+# The cumulative import time of docraise.main, in microseconds: about 45 ms, against more than
+# 100 ms when the analysis was imported up front
+IMPORT_BUDGET_US = 100_000
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _import_times(*args, cwd=None):
+    """Run python -X importtime with the arguments and return the cumulative time by module."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(ROOT), os.environ.get("PYTHONPATH")])))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args], cwd=cwd, env=env, capture_output=True, text=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, module = line.split("|")
+            if cumulative.strip().isdigit():
+                times[module.strip()] = int(cumulative)
+    return result, times
+
+
+def test_version_does_not_import_the_analysis():
+    # Act
+    result, times = _import_times("-m", "docraise", "--version")
+
+    # Assert
+    assert result.returncode == 0
+    assert "docraise.main" in times
+    assert HEAVY_MODULES.isdisjoint(times)
+
+
+def test_run_without_python_files_does_not_import_the_analysis(tmp_path):
+    # Arrange
+    (tmp_path / "README.md").write_text("# Not Python\n")
+
+    # Act
+    result, times = _import_times("-m", "docraise", "check", "--format", "sarif", ".", cwd=tmp_path)
+
+    # Assert
+    assert result.returncode == 0
+    assert '"results": [' in result.stdout
+    assert HEAVY_MODULES.isdisjoint(times)
+
+
+def test_import_time_budget():
+    # Act
+    # The best of a few runs, so a busy machine does not fail the test
+    best = min(_import_times("-c", "import docraise.main")[1]["docraise.main"] for _ in range(3))
+
+    # Assert
+    assert best < IMPORT_BUDGET_US, f"importing docraise.main took {best / 1000:.1f} ms"
+
+
+def test_style_names_match_the_styles():
+    # Assert
+    assert set(STYLE_NAMES) == set(STYLES)
@@ -0,0 +1,85 @@
+import json
+
+from click.testing import CliRunner
+
+from docraise.main import main
+from docraise.runner import iter_results
+from docraise.stats import Stats
+
+
+def test_slowest_files_and_hooks():
+    # Arrange
+    updates = []
+    stats = Stats(slowest=2, hooks=[lambda counters, filename: updates.append((filename, counters["read_ns"]))])
+
+    # Act
+    for filename, read_ns in [("a.py", 3), ("b.py", 9), ("c.py", 1), ("d.py", 5)]:
+        stats.update({"files": 1, "read_ns": read_ns, "analysis_ns": 10}, filename)
+
+    # Assert
+    assert stats.slowest_files() == [("b.py", 19), ("d.py", 15)]
+    assert updates == [("a.py", 3), ("b.py", 9), ("c.py", 1), ("d.py", 5)]
+    assert stats.to_json()["slowest_files"] == [{"filename": "b.py", "ns": 19}, {"filename": "d.py", "ns": 15}]
+    assert "slowest files:" in stats.format()
+
+
+def test_timed_iterable():
+    # Arrange
+    stats = Stats()
+
+    # Act
+    items = list(stats.timed(iter(range(3)), "discovery_ns"))
+
+    # Assert
+    assert items == [0, 1, 2]
+    assert "discovery_ns" in stats.counters
+
+
+def test_phases_and_counts_are_collected(tmp_path):
+    # Arrange
+    (tmp_path / "module.py").write_text(
+        'def f(x):\n    """\n    Check.\n\n    Raises:\n        KeyError: never\n    """\n'
+        "    if x:\n        raise ValueError()\n    raise TypeError()\n"
+    )
+    stats = Stats(slowest=1)
+
+    # Act
+    list(iter_results([tmp_path / "module.py"], stats=stats))
+
+    # Assert
+    counters = stats.counters
+    assert (counters["files"], counters["functions"], counters["raises"], counters["docstrings_parsed"]) == (1, 1, 2, 1)
+    assert all(counters[name] > 0 for name in ("read_ns", "parse_ns", "analyzer_ns", "docstring_parse_ns"))
+    assert stats.slowest_files() == [(str(tmp_path / "module.py"), counters["read_ns"] + counters["analysis_ns"])]
+
+
+def test_stats_flag_before_a_path(tmp_path):
+    # Arrange
+    (tmp_path / "module.py").write_text("def f():\n    return 1\n")
+
+    # Act
+    result = CliRunner().invoke(main, ["--no-cache", "--stats", str(tmp_path / "module.py")])
+
+    # Assert
+    assert result.exit_code == 0
+    assert "files: 1" in result.output
+
+
+def test_json_stats_and_profile(tmp_path):
+    # Arrange
+    (tmp_path / "module.py").write_text("def f():\n    return 1\n")
+    profile = tmp_path / "run.prof"
+
+    # Act
+    result = CliRunner().invoke(
+        main, ["--no-cache", "--stats", "--stats-format", "json", "--profile", str(profile), str(tmp_path / "module.py")]
+    )
+
+    # Assert
+    assert result.exit_code == 0
+    # Without violations, the output is the statistics printed to stderr
+    report = json.loads(result.output)
+    assert report["counters"]["files"] == 1
+    assert report["counters"]["run_ns"] > 0
+    assert [entry["filename"] for entry in report["slowest_files"]] == [str(tmp_path / "module.py")]
+    assert profile.stat().st_size > 0
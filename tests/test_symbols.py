@@ -0,0 +1,129 @@
+import ast
+import textwrap
+
+from docraise.analyzer import Analyzer
+from docraise.symbols import SymbolTable
+
+IMPORTS = textwrap.dedent("""
+import json
+import os.path
+import requests.exceptions as rex
+from json import JSONDecodeError as DecodeError
+from .errors import ConfigError
+from .. import base
+
+
+class LocalError(Exception):
+    pass
+""")
+
+
+def test_resolve():
+    # Arrange
+    symbols = SymbolTable.from_tree(ast.parse(IMPORTS))
+
+    # Act & Assert
+    assert symbols.resolve("json.JSONDecodeError") == "json.JSONDecodeError"
+    assert symbols.resolve("DecodeError") == "json.JSONDecodeError"
+    assert symbols.resolve("rex.HTTPError") == "requests.exceptions.HTTPError"
+    assert symbols.resolve("os.path.Error") == "os.path.Error"
+    assert symbols.resolve("ConfigError") == ".errors.ConfigError"
+    assert symbols.resolve("LocalError") == "LocalError"
+    assert symbols.resolve("ValueError") == "ValueError"
+    # Unknown roots keep the last attribute
+    assert symbols.resolve("exc.ValueError") == "ValueError"
+
+
+def test_resolve_with_module_name():
+    # Arrange
+    symbols = SymbolTable.from_tree(ast.parse(IMPORTS), "package.sub.config")
+
+    # Act & Assert
+    assert symbols.resolve("ConfigError") == "package.sub.errors.ConfigError"
+    assert symbols.resolve("base.BaseError") == "package.base.BaseError"
+    assert symbols.resolve("LocalError") == "package.sub.config.LocalError"
+    assert symbols.resolve("ValueError") == "ValueError"
+
+
+def test_qualified_names_are_told_apart():
+    # Arrange
+    source = textwrap.dedent("""
+    import json
+
+
+    class JSONDecodeError(Exception):
+        pass
+
+
+    def load(text):
+        '''
+        Load.
+
+        Raises:
+            json.JSONDecodeError: if the text is not JSON
+        '''
+        raise JSONDecodeError(text)
+
+
+    def parse(text):
+        '''
+        Parse.
+
+        Raises:
+            json.JSONDecodeError: if the text is not JSON
+        '''
+        raise json.JSONDecodeError("invalid", text, 0)
+    """)
+
+    # Act
+    violations = Analyzer().validate(ast.parse(source))
+
+    # Assert
+    assert [(v.lineno, v.code, v.text.split('"')[1]) for v in violations] == [
+        (9, "DR001", "JSONDecodeError"),
+        (9, "DR002", "json.JSONDecodeError"),
+    ]
+
+
+def test_imported_names_match_documented_spellings():
+    # Arrange
+    source = textwrap.dedent("""
+    import requests
+    from json import JSONDecodeError
+
+
+    def fetch(url):
+        '''
+        Fetch.
+
+        Raises:
+            requests.exceptions.HTTPError: if the request fails
+            JSONDecodeError: if the body is not JSON
+        '''
+        try:
+            return requests.get(url).json()
+        except (requests.exceptions.HTTPError, JSONDecodeError):
+            raise
+
+
+    def decode(text):
+        '''
+        Decode.
+
+        Raises:
+            JSONDecodeError: if the text is not JSON
+        '''
+        try:
+            return parse(text)
+        except get_errors().DecodeError as e:
+            raise e
+    """)
+
+    # Act
+    violations = Analyzer().validate(ast.parse(source))
+
+    # Assert
+    assert [(v.code, v.text.split('"')[1]) for v in violations] == [
+        ("DR001", "DecodeError"),
+        ("DR002", "json.JSONDecodeError"),
+    ]